@@ -0,0 +1,153 @@
+import json
+import os
+import time
+
+# --- Automatisches Speichern und Wiederherstellung ---
+
+# Modi für das automatische Speichern
+AUTOSAVE_OFF = 'off'            # nur Speichern per Knopf bzw. Nachfrage
+AUTOSAVE_RECOVERY = 'recovery'  # Änderungen in eine Wiederherstellungsdatei, das Projekt bleibt unverändert
+AUTOSAVE_PROJECT = 'project'    # das Projekt selbst wird gespeichert
+
+RECOVERY_DIR_NAME = ".linkmem_recovery"
+RECOVERY_SUFFIX = ".json"
+
+
+class Autosaver:
+    """Fasst Änderungen im Tk-Thread zusammen und löst daraus wenige Schreibvorgänge aus.
+
+    changed() wird bei jeder Änderung aufgerufen. Geschrieben wird, sobald
+    `delay_ms` lang nichts mehr geändert wurde, bei Dauerbetrieb spätestens
+    `max_delay_ms` nach der ersten ungesicherten Änderung. Zwischen zwei
+    Schreibvorgängen liegen mindestens `min_interval_ms`, egal wie viele
+    Änderungen eintreffen.
+
+    `save(done)` startet den Schreibvorgang (im Hintergrund) und muss done()
+    aufrufen, wenn er beendet oder fehlgeschlagen ist; bis dahin wird nicht
+    erneut geschrieben.
+    """
+
+    def __init__(self, root, save, delay_ms=2000, min_interval_ms=10000, max_delay_ms=30000):
+        self.root = root
+        self.save = save
+        self.delay = delay_ms / 1000
+        self.min_interval = min_interval_ms / 1000
+        self.max_delay = max_delay_ms / 1000
+        self.writes = 0
+        self._job = None
+        self._dirty = False
+        self._first_change = 0.0
+        self._last_change = 0.0
+        self._last_write = None
+        self._writing = False
+
+    @property
+    def pending(self):
+        return self._dirty
+
+    def changed(self):
+        now = time.monotonic()
+        if not self._dirty:
+            self._dirty = True
+            self._first_change = now
+        self._last_change = now
+        self._schedule()
+
+    def cancel(self):
+        """Verwirft anstehende Änderungen (z.B. nach dem Speichern von Hand)."""
+        self._dirty = False
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def _due(self):
+        due = min(self._last_change + self.delay, self._first_change + self.max_delay)
+        if self._last_write is not None:
+            due = max(due, self._last_write + self.min_interval)
+        return due
+
+    def _schedule(self):
+        # Bei vielen Änderungen in Folge bleibt es bei einem Timer; _fire prüft nach
+        if self._job is None and self._dirty and not self._writing:
+            wait = max(0.0, self._due() - time.monotonic())
+            self._job = self.root.after(int(wait * 1000) + 1, self._fire)
+
+    def _fire(self):
+        self._job = None
+        if not self._dirty or self._writing:
+            return
+        now = time.monotonic()
+        if self._due() > now:
+            self._schedule()
+            return
+        self._dirty = False
+        self._writing = True
+        self._last_write = now
+        self.writes += 1
+        try:
+            self.save(self._written)
+        except Exception:
+            self._writing = False
+            raise
+
+    def _written(self):
+        self._writing = False
+        self._schedule()
+
+
+class RecoveryStore:
+    """Wiederherstellungsdateien mit ungespeicherten Änderungen, eine pro Projekt.
+
+    Eine Datei enthält entweder nur die Änderungen seit dem letzten Speichern
+    ({'ops': [...]}, Journal-Operationen wie in project_journal) oder alle Links
+    ({'links': [...]}). Liegen beim Start noch Dateien hier, wurde das Programm
+    nicht ordnungsgemäß beendet.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, project_name):
+        return os.path.join(self.directory, project_name + RECOVERY_SUFFIX)
+
+    def write(self, project_name, data):
+        """Schreibt die Datei atomar (temporäre Datei, fsync, os.replace)."""
+        os.makedirs(self.directory, exist_ok=True)
+        data = dict(data, project=project_name, saved=time.time())
+        path = self.path(project_name)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def discard(self, project_name):
+        try:
+            os.remove(self.path(project_name))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def load_all(self):
+        """Alle vorhandenen Wiederherstellungen, die neueste zuerst."""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        entries = []
+        for name in names:
+            if not name.endswith(RECOVERY_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Warnung: Wiederherstellungsdatei {path} ist nicht lesbar: {e}")
+                continue
+            if isinstance(data, dict) and isinstance(data.get('project'), str) and (
+                    isinstance(data.get('ops'), list) or isinstance(data.get('links'), list)):
+                entries.append(data)
+        entries.sort(key=lambda data: data.get('saved', 0), reverse=True)
+        return entries
@@ -0,0 +1,333 @@
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from binary_format import file_format_of
+from instrumentation import span
+from link_export import EXPORT_EXTENSIONS, export_links
+from link_import import FORMAT_JSON
+from link_model import LINK_ID_KEY, LinkIndex
+from linkmem_core import OP_CLEAN, OP_EXPORT, OP_NORMALIZE, OP_REINDEX, OP_VALIDATE, has_url_scheme, normalize_url
+from project_journal import iter_project_items, journal_path_for, write_snapshot
+from project_storage import JsonDirectoryStorage
+
+# --- Wartung über viele Projektdateien ---
+# Ein Vorgang (OPERATIONS) läuft pro Projektdatei in einem eigenen Prozess
+# (ProcessPoolExecutor); die Dateien werden in Blöcken zu CHUNK_SIZE verteilt,
+# damit auch 10000 kleine Projekte alle Kerne auslasten, ohne für jede Datei
+# einen eigenen Auftrag zu verschicken. Fehler betreffen nur ihre Datei.
+# Geänderte Projekte werden atomar zurückgeschrieben (write_snapshot, dann
+# Journal entfernen), im bisherigen Dateiformat.
+
+CHUNK_SIZE = 16          # höchstens so viele Dateien pro Auftrag
+CHUNKS_PER_WORKER = 2    # so viele Aufträge pro Prozess gleichzeitig unterwegs
+
+# Zählerstände in der Reihenfolge, in der sie ausgegeben werden
+COUNTER_LABELS = (
+    ('links', "Links"),
+    ('invalid', "ungültig"),
+    ('missing_ids', "ohne ID"),
+    ('duplicate_ids', "doppelte IDs"),
+    ('without_scheme', "ohne Protokoll"),
+    ('removed', "entfernt"),
+    ('descs', "Beschreibungen ergänzt"),
+    ('ids', "IDs vergeben"),
+    ('urls', "URLs normalisiert"),
+    ('journals', "Journale verdichtet"),
+    ('changed', "Projekte geändert"),
+)
+
+
+def _count_ids(links, counts):
+    seen = set()
+    for link in links:
+        link_id = link.get(LINK_ID_KEY)
+        if not isinstance(link_id, str) or not link_id:
+            counts['missing_ids'] += 1
+        elif link_id in seen:
+            counts['duplicate_ids'] += 1
+        else:
+            seen.add(link_id)
+
+
+def _read_links(filepath, counts, key):
+    # Wie project_loader.clean_link, aber gezählt statt einzeln gemeldet
+    links = []
+    for item in iter_project_items(filepath):
+        if isinstance(item, dict) and 'url' in item:
+            links.append(item)
+        else:
+            counts[key] += 1
+    return links
+
+
+def _new_counts(*keys):
+    return dict.fromkeys(keys, 0)
+
+
+def _write_back(filepath, links):
+    write_snapshot(filepath, links, file_format_of(filepath))
+    journal_path = journal_path_for(filepath)
+    if os.path.exists(journal_path):
+        os.remove(journal_path)
+
+
+def validate_project(filepath, project_name, options):
+    """Prüft ein Projekt, ohne es zu ändern."""
+    counts = _new_counts('links', 'invalid', 'missing_ids', 'duplicate_ids', 'without_scheme')
+    links = _read_links(filepath, counts, 'invalid')
+    counts['links'] = len(links)
+    _count_ids(links, counts)
+    counts['without_scheme'] = sum(1 for link in links if not has_url_scheme(str(link['url'])))
+    return counts
+
+
+def _clean_links(filepath, counts):
+    links = _read_links(filepath, counts, 'removed')
+    for link in links:
+        if 'desc' not in link:
+            link['desc'] = link['url']
+            counts['descs'] += 1
+    counts['ids'] = LinkIndex().reset(links)
+    return links
+
+
+def _finish_cleanup(filepath, links, counts):
+    counts['links'] = len(links)
+    changed = any(counts[key] for key in ('removed', 'descs', 'ids', 'urls') if key in counts)
+    journaled = os.path.exists(journal_path_for(filepath))
+    if changed or journaled:
+        _write_back(filepath, links)
+    counts['changed'] = int(changed)
+    counts['journals'] = int(journaled)
+    return counts
+
+
+def clean_project(filepath, project_name, options):
+    """Bereinigt wie beim Laden: ungültige Elemente entfernen, Beschreibungen und IDs ergänzen."""
+    counts = _new_counts('links', 'removed', 'descs', 'ids')
+    return _finish_cleanup(filepath, _clean_links(filepath, counts), counts)
+
+
+def normalize_project(filepath, project_name, options):
+    """Wie clean_project, zusätzlich alle URLs in Normalform (siehe linkmem_core.normalize_url)."""
+    counts = _new_counts('links', 'removed', 'descs', 'ids', 'urls')
+    links = _clean_links(filepath, counts)
+    for link in links:
+        url = link['url']
+        if not isinstance(url, str):
+            continue
+        normalized = normalize_url(url)
+        if normalized != url:
+            if link['desc'] == url:
+                link['desc'] = normalized
+            link['url'] = normalized
+            counts['urls'] += 1
+    return _finish_cleanup(filepath, links, counts)
+
+
+def export_project(filepath, project_name, options):
+    """Exportiert ein Projekt nach options['directory'] im Format options['format']."""
+    file_format = options.get('format') or FORMAT_JSON
+    target = os.path.join(options['directory'], project_name + EXPORT_EXTENSIONS[file_format])
+    counts = _new_counts('links', 'invalid')
+    links = _read_links(filepath, counts, 'invalid')
+    for link in links:
+        link.setdefault('desc', link['url'])
+    tmp_path = target + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        export_links(links, f, file_format, title=project_name)
+    os.replace(tmp_path, target)
+    counts['links'] = len(links)
+    return counts
+
+
+def read_index_links(filepath, project_name, options):
+    """Liest ein Projekt für den Suchindex; eingetragen wird im aufrufenden Prozess (eine Datenbank)."""
+    counts = _new_counts('links', 'invalid')
+    links = _read_links(filepath, counts, 'invalid')
+    counts['links'] = len(links)
+    counts['index_links'] = [{'url': link['url'], 'desc': link.get('desc', link['url']),
+                              LINK_ID_KEY: link.get(LINK_ID_KEY)} for link in links]
+    return counts
+
+
+OPERATIONS = {
+    OP_VALIDATE: validate_project,
+    OP_CLEAN: clean_project,
+    OP_NORMALIZE: normalize_project,
+    OP_EXPORT: export_project,
+    OP_REINDEX: read_index_links,
+}
+
+
+def _run_chunk(operation, tasks, options):
+    """Läuft im Arbeitsprozess: [(Projekt, Datei), ...] -> [(Projekt, ok, Zähler oder Fehlermeldung), ...]."""
+    fn = OPERATIONS[operation]
+    results = []
+    for project_name, filepath in tasks:
+        try:
+            results.append((project_name, True, fn(filepath, project_name, options)))
+        except Exception as e:
+            results.append((project_name, False, f"{type(e).__name__}: {e}"))
+    return results
+
+
+def describe_totals(totals):
+    """Zählerstände als kurzer Text für Statusleiste und Kommandozeile."""
+    return ", ".join(f"{totals.get(key, 0)} {label}" for key, label in COUNTER_LABELS
+                     if totals.get(key) or key == 'links')
+
+
+class BatchRunner:
+    """Führt einen Wartungsvorgang über mehrere Projekte eines JsonDirectoryStorage aus.
+
+    Wie LinkImporter: run() läuft im Worker (z.B. über den IOScheduler) und
+    verteilt die Dateien auf `workers` Prozesse; der UI-Thread holt Nachrichten
+    mit poll() ab: ('progress', fertig, gesamt), ('failed', Projekt, Meldung),
+    ('done', Summen, Anzahl fehlgeschlagen) und ('error', exception).
+    Abbrechen verteilt keine neuen Dateien mehr, laufende werden fertig.
+    `project_names` None heißt alle Projekte; `search_index` (für OP_REINDEX)
+    ist standardmäßig der des Speichers.
+    """
+
+    def __init__(self, storage, operation, project_names=None, options=None, workers=None,
+                 chunk_size=CHUNK_SIZE, search_index=None):
+        if not isinstance(storage, JsonDirectoryStorage):
+            raise ValueError("Die Wartung arbeitet nur mit Projektdateien (Backend json).")
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unbekannter Wartungsvorgang '{operation}'.")
+        self.storage = storage
+        self.operation = operation
+        self.project_names = project_names
+        self.options = options or {}
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.search_index = search_index
+        self._messages = queue.Queue()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def poll(self, max_messages=None):
+        messages = []
+        while max_messages is None or len(messages) < max_messages:
+            try:
+                messages.append(self._messages.get_nowait())
+            except queue.Empty:
+                break
+        return messages
+
+    def run(self):
+        try:
+            with span('batch', operation=self.operation) as measure:
+                totals, failed = self._run()
+                measure.add(items=totals.get('links', 0), failed=failed)
+            self._messages.put(('done', totals, failed))
+        except Exception as e:
+            self._messages.put(('error', e))
+
+    def _chunks(self, tasks):
+        # Kleine Blöcke, solange es wenige Dateien sind, damit trotzdem alle Prozesse etwas bekommen
+        size = max(1, min(self.chunk_size, len(tasks) // (self.workers * CHUNKS_PER_WORKER)))
+        return [tasks[start:start + size] for start in range(0, len(tasks), size)]
+
+    def _run(self):
+        names = self.project_names if self.project_names is not None else self.storage.list_projects()
+        tasks = [(name, self.storage.location(name)) for name in names]
+        if self.operation == OP_EXPORT:
+            os.makedirs(self.options['directory'], exist_ok=True)
+        self._totals = {}
+        self._failed = 0
+        self._done = 0
+        self._total = len(tasks)
+        self._index = None
+        if self.operation == OP_REINDEX:
+            self._index = self.search_index or self.storage.open_search_index()
+        chunks = self._chunks(tasks)
+        if self.workers <= 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                if self._cancel.is_set():
+                    break
+                self._collect(_run_chunk(self.operation, chunk, self.options))
+        else:
+            self._run_pool(chunks)
+        if self._index is not None and self.project_names is None and not self._cancel.is_set():
+            for name in set(self._index.indexed_projects()) - set(names):
+                self._index.remove_project(name)
+        return self._totals, self._failed
+
+    def _run_pool(self, chunks):
+        # spawn statt fork: der aufrufende Prozess hat Threads (Tk, IOScheduler)
+        context = multiprocessing.get_context('spawn')
+        workers = min(self.workers, len(chunks))
+        remaining = iter(chunks)
+        # Stirbt ein Arbeitsprozess, ist der ganze Pool unbrauchbar. Die Blöcke, die
+        # gerade unterwegs waren, laufen in einem neuen Pool Projekt für Projekt
+        # einzeln weiter; stürzt ein einzeln laufendes Projekt erneut ab, gilt nur
+        # dieses als fehlgeschlagen.
+        suspects = []
+        broken = True
+        while broken:
+            broken = False
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                pending = {}  # Future -> (Block, einzeln wiederholt)
+                while True:
+                    while not broken and not self._cancel.is_set():
+                        if suspects:
+                            if pending:
+                                break
+                            chunk, isolated = [suspects.pop(0)], True
+                        elif len(pending) < workers * CHUNKS_PER_WORKER:
+                            chunk, isolated = next(remaining, None), False
+                            if chunk is None:
+                                break
+                        else:
+                            break
+                        pending[pool.submit(_run_chunk, self.operation, chunk, self.options)] = (chunk, isolated)
+                    if not pending:
+                        break
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        chunk, isolated = pending.pop(future)
+                        try:
+                            results = future.result()
+                        except BrokenProcessPool:
+                            broken = True
+                            if isolated:
+                                self._fail_chunk(chunk, "Arbeitsprozess unerwartet beendet")
+                            else:
+                                suspects.extend(chunk)
+                        except Exception as e:
+                            # z.B. ein Ergebnis, das sich nicht übertragen lässt
+                            self._fail_chunk(chunk, f"{type(e).__name__}: {e}")
+                        else:
+                            self._collect(results)
+
+    def _fail_chunk(self, chunk, message):
+        self._collect([(project_name, False, message) for project_name, _ in chunk])
+
+    def _collect(self, results):
+        for project_name, ok, result in results:
+            self._done += 1
+            if ok and self._index is not None:
+                try:
+                    self._index.index_project(project_name, result.pop('index_links'),
+                                              self.storage.modified(project_name))
+                except Exception as e:
+                    ok, result = False, f"{type(e).__name__}: {e}"
+            if not ok:
+                self._failed += 1
+                self._messages.put(('failed', project_name, result))
+                continue
+            for key, value in result.items():
+                self._totals[key] = self._totals.get(key, 0) + value
+        self._messages.put(('progress', self._done, self._total))
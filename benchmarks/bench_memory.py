@@ -0,0 +1,46 @@
+"""Speicherbedarf pro Link: dict (wie bisher) gegen LinkRecord.
+
+Aufruf aus dem Projektverzeichnis:
+    python benchmarks/bench_memory.py [--sizes 100000 1000000] [--hosts 2000]
+
+Gemessen wird mit tracemalloc, was die fertig geladene Link-Liste belegt
+(inklusive aller Strings), geteilt durch die Anzahl der Links.
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from link_model import LinkRecord  # noqa: E402
+from synthetic import generate_links  # noqa: E402
+
+
+def measure(count, host_count, convert):
+    gc.collect()
+    tracemalloc.start()
+    links = [convert(item) for item in generate_links(count, host_count)]
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del links
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--hosts', type=int, default=2000, help="Anzahl verschiedener Hosts")
+    args = parser.parse_args()
+
+    print(f"{'Links':>10}  {'dict B/Link':>12}  {'Record B/Link':>14}  {'Ersparnis':>9}")
+    for count in args.sizes:
+        before = measure(count, args.hosts, lambda item: item)
+        after = measure(count, args.hosts, LinkRecord.from_dict)
+        print(f"{count:>10}  {before / count:>12.1f}  {after / count:>14.1f}  {1 - after / before:>9.1%}")
+
+
+if __name__ == '__main__':
+    main()
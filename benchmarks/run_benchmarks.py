@@ -0,0 +1,625 @@
+"""Benchmark-Suite für Programmstart, Laden, Speichern, Anzeige, Projektübersicht, Suche und Wartung.
+
+Aufruf aus dem Projektverzeichnis:
+    python benchmarks/run_benchmarks.py [--links 1000 10000 100000] [--projects 10 100 1000]
+        [--full] [--backend json|sqlite] [--only load,ui_load_project] [--repeat 5]
+        [-o ergebnis.json] [--baseline basis.json] [--threshold 0.25]
+
+Die Kern-Benchmarks laufen ohne Oberfläche über dieselben Klassen wie die App.
+Die ui_*-Benchmarks starten LinkManagerApp mit echtem Tk; ohne Display wird
+unter Linux ein Xvfb gestartet, fehlt auch der, werden sie übersprungen.
+Die startup_*-Benchmarks starten jeweils einen neuen Prozess: startup_import
+ist die Importzeit laut `python -X importtime`, startup_first_paint und
+startup_interactive die Zeit vom Prozessstart bis zum ersten Zeichnen bzw.
+bis die Projektübersicht abgeglichen und bedienbar ist (startup_probe.py).
+Mit --baseline wird gegen eine frühere JSON-Ausgabe verglichen; ist ein Wert
+um mehr als --threshold (und --min-delta Sekunden) langsamer, endet das
+Programm mit Rückgabewert 1.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from link_filter import LinkFilter  # noqa: E402
+from link_model import LINK_ID_KEY, LinkIndex, set_link_labels  # noqa: E402
+from linkmem_core import PROJECT_DIR_NAME, load_links  # noqa: E402
+from project_journal import put_op  # noqa: E402
+from project_loader import ProjectLoader  # noqa: E402
+from project_storage import STORAGE_JSON, STORAGE_SQLITE, JsonDirectoryStorage, open_storage  # noqa: E402
+from synthetic import create_project, create_projects, project_name  # noqa: E402
+from url_index import UrlIndex  # noqa: E402
+
+DEFAULT_LINK_SIZES = [1000, 10000, 100000]
+DEFAULT_PROJECT_COUNTS = [10, 100, 1000]
+FULL_LINK_SIZES = [1000, 10000, 100000, 1000000]
+FULL_PROJECT_COUNTS = [10, 100, 1000, 10000]
+LINKS_PER_PROJECT = 50
+SEARCH_QUERIES = ("python", "rez anl", "docs wiki", "site:example.org")
+UI_TIMEOUT = 600.0
+PROBE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_probe.py")
+
+BENCHMARKS = []  # (Name, Skala 'links'/'projects', braucht Tk, Funktion)
+
+
+def benchmark(name, scale, ui=False):
+    def register(fn):
+        BENCHMARKS.append((name, scale, ui, fn))
+        return fn
+    return register
+
+
+def time_runs(run, repeat, setup=None):
+    """Führt run() `repeat`-mal aus (setup() jeweils vorher, ungemessen) und gibt die Sekunden zurück."""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+class Workspace:
+    """Temporäres Projektverzeichnis mit den synthetischen Projekten eines Laufs."""
+
+    def __init__(self, backend, repeat):
+        self.backend = backend
+        self.repeat = repeat
+        self.root_dir = tempfile.mkdtemp(prefix="linkmem-bench-")
+        self.link_dir = os.path.join(self.root_dir, "links")
+        os.makedirs(self.link_dir)
+        self.storage = open_storage(backend, self.link_dir)
+        self.journal_storage = open_storage(backend, self.link_dir, use_journal=True)
+        self._link_projects = set()
+        self._project_dirs = {}
+        self._startup_runs = {}
+        self.app = None
+        self.ui_error = None
+        self._xvfb = None
+
+    def link_project(self, size):
+        """Projekt mit `size` Links (einmal pro Lauf angelegt)."""
+        name = f"Bench {size}"
+        if name not in self._link_projects:
+            create_project(self.storage, name, size)
+            self._link_projects.add(name)
+        return name
+
+    def project_storage(self, count):
+        """Eigenes Verzeichnis mit `count` kleinen Projekten und abgeglichenem Suchindex."""
+        storage = self._project_dirs.get(count)
+        if storage is None:
+            directory = os.path.join(self.root_dir, f"projects-{count}")
+            os.makedirs(directory)
+            storage = open_storage(self.backend, directory)
+            create_projects(storage, count, LINKS_PER_PROJECT)
+            self._project_dirs[count] = storage
+        return storage
+
+    # --- Oberfläche ---
+    def display(self):
+        """Sorgt für ein Display (ggf. Xvfb); gibt den Fehlertext zurück oder None."""
+        if self._xvfb is None and self.ui_error is None:
+            self._xvfb, self.ui_error = start_virtual_display()
+        return self.ui_error
+
+    def ui_app(self):
+        """Die Tk-Anwendung (einmal pro Lauf) oder None, wenn kein Display verfügbar ist."""
+        if self.app is not None or self.display() is not None:
+            return self.app
+        os.environ['HOME'] = os.path.join(self.root_dir, "home")
+        os.makedirs(os.path.join(os.environ['HOME'], "Documents"))
+        try:
+            import tkinter as tk
+            from tkinter import messagebox
+            import linkmem_core
+            import modern_link_manager
+            linkmem_core.STORAGE_BACKEND = self.backend
+            modern_link_manager.STORAGE_BACKEND = self.backend
+            modern_link_manager.AUTOSAVE_MODE = modern_link_manager.AUTOSAVE_OFF
+            # Dialoge würden den Lauf blockieren
+            for name in ('showinfo', 'showwarning', 'showerror'):
+                setattr(messagebox, name, lambda *args, **kwargs: None)
+            for name in ('askyesno', 'askyesnocancel'):
+                setattr(messagebox, name, lambda *args, **kwargs: False)
+            root = tk.Tk()
+        except Exception as e:
+            self.ui_error = f"Tk nicht verfügbar: {e}"
+            return None
+        self.app = modern_link_manager.LinkManagerApp(root)
+        pump(root, lambda: not self.app.io.busy)
+        return self.app
+
+    def startup_home(self, count):
+        """HOME für einen frischen App-Prozess, dessen Projektverzeichnis `count` Projekte enthält."""
+        home = os.path.join(self.root_dir, f"startup-{count}")
+        if not os.path.exists(home):
+            directory = os.path.join(home, "Documents", PROJECT_DIR_NAME)
+            os.makedirs(directory)
+            storage = open_storage(self.backend, directory)
+            create_projects(storage, count, LINKS_PER_PROJECT)
+            storage.close()
+        return home
+
+    def startup_runs(self, count):
+        """Messwerte von `repeat` Programmstarts (nach einem ungemessenen, der Katalog und Index anlegt)."""
+        runs = self._startup_runs.get(count)
+        if runs is None:
+            env = dict(os.environ, HOME=self.startup_home(count))
+            env.pop('LINKMEM_TRACE', None)
+            run_startup_probe(env, self.backend)
+            runs = self._startup_runs[count] = [run_startup_probe(env, self.backend) for _ in range(self.repeat)]
+        return runs
+
+    def close(self):
+        if self.app is not None:
+            self.app.destroy()
+            self.app = None
+        for storage in [self.storage, self.journal_storage] + list(self._project_dirs.values()):
+            storage.close()
+        if self._xvfb is not None:
+            self._xvfb.terminate()
+        shutil.rmtree(self.root_dir, ignore_errors=True)
+
+
+def start_virtual_display():
+    """Startet unter Linux ohne DISPLAY einen Xvfb; gibt (Prozess, Fehlertext) zurück."""
+    if not sys.platform.startswith('linux') or os.environ.get('DISPLAY'):
+        return None, None
+    xvfb = shutil.which('Xvfb')
+    if xvfb is None:
+        return None, "kein Display und kein Xvfb gefunden"
+    display = f":{100 + os.getpid() % 400}"
+    process = subprocess.Popen([xvfb, display, '-screen', '0', '1280x1024x24', '-nolisten', 'tcp'],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(1.0)
+    if process.poll() is not None:
+        return None, f"Xvfb konnte nicht gestartet werden (Rückgabewert {process.returncode})"
+    os.environ['DISPLAY'] = display
+    return process, None
+
+
+def run_startup_probe(env, backend):
+    """Startet startup_probe.py; gibt dessen Zeitpunkte relativ zum Prozessstart zurück (Sekunden)."""
+    started = time.time()
+    process = subprocess.run([sys.executable, PROBE_SCRIPT, backend], env=env, capture_output=True,
+                             text=True, timeout=UI_TIMEOUT)
+    if process.returncode != 0:
+        raise RuntimeError(f"startup_probe.py fehlgeschlagen:\n{process.stderr}")
+    times = json.loads(process.stdout.strip().splitlines()[-1])
+    return {name: times[name] - started for name in ('imported', 'painted', 'interactive')}
+
+
+def import_time(module):
+    """Kumulierte Importzeit von `module` in einem frischen Prozess laut -X importtime (Sekunden)."""
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                             capture_output=True, text=True, timeout=UI_TIMEOUT,
+                             cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    for line in process.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module and not parts[2].startswith('  '):
+            return int(parts[1]) / 1e6
+    raise RuntimeError(f"Import von {module} fehlgeschlagen:\n{process.stderr[-2000:]}")
+
+
+def pump(root, done, timeout=UI_TIMEOUT):
+    """Verarbeitet Tk-Ereignisse (after-Callbacks, Zeichnen), bis done() wahr ist."""
+    deadline = time.perf_counter() + timeout
+    while not done():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("Zeitüberschreitung beim Warten auf die Oberfläche")
+        root.update()
+        time.sleep(0.0005)
+
+
+# --- Programmstart ---
+@benchmark('startup_import', 'projects')
+def bench_startup_import(ws, count):
+    # Unabhängig von der Projektanzahl, wird aber wie die übrigen startup_* je Größe gemeldet
+    return [import_time('modern_link_manager') for _ in range(ws.repeat)]
+
+
+@benchmark('startup_first_paint', 'projects', ui=True)
+def bench_startup_first_paint(ws, count):
+    return [run['painted'] for run in ws.startup_runs(count)]
+
+
+@benchmark('startup_interactive', 'projects', ui=True)
+def bench_startup_interactive(ws, count):
+    return [run['interactive'] for run in ws.startup_runs(count)]
+
+
+# --- Kern ---
+@benchmark('load', 'links')
+def bench_load(ws, size):
+    # Wie poll_project_loader, nur ohne Tk: streamen, indizieren, Filter und Duplikatindex füttern
+    name = ws.link_project(size)
+
+    def run():
+        loader = ProjectLoader(ws.storage, name)
+        loader.run()
+        index = LinkIndex([])
+        link_filter = LinkFilter(index)
+        url_index = UrlIndex()
+        for message in loader.poll():
+            if message[0] == 'batch':
+                index.extend(message[1])
+                link_filter.links_appended(message[1])
+                url_index.add_many(message[1])
+            elif message[0] == 'error':
+                raise message[1]
+    return time_runs(run, ws.repeat)
+
+
+@benchmark('save', 'links')
+def bench_save(ws, size):
+    # Vollständiger Stand wie beim ersten Speichern (Momentaufnahme bzw. alle Zeilen)
+    links = load_links(ws.storage, ws.link_project(size))
+    return time_runs(lambda: ws.storage.save("Bench Kopie", [dict(link) for link in links]), ws.repeat)
+
+
+@benchmark('save_ops', 'links')
+def bench_save_ops(ws, size):
+    # Inkrementelles Speichern von 100 geänderten Links (Journal bzw. SQLite-Zeilen)
+    name = ws.link_project(size)
+    links = load_links(ws.storage, name)
+    changed = random.Random(size).sample(links, min(100, len(links)))
+    ops = [put_op(dict(link, desc=f"{link['desc']} *")) for link in changed]
+    times = time_runs(lambda: ws.journal_storage.save(name, None, ops), ws.repeat)
+    ws.journal_storage.compact(name)
+    return times
+
+
+@benchmark('filter', 'links')
+def bench_filter(ws, size):
+    index = LinkIndex(load_links(ws.storage, ws.link_project(size)))
+    link_filter = LinkFilter(index)
+    link_filter.reset(index.links)
+    link_filter.index.index_pending()
+
+    def run():
+        link_filter.set_text("")
+        link_filter.visible_links()
+        link_filter.set_text("python doc")
+        link_filter.visible_links()
+    return time_runs(run, ws.repeat)
+
+
+@benchmark('filter_tags', 'links')
+def bench_filter_tags(ws, size):
+    # Tags und Sammlungen werden hier vergeben, die Projektdateien bleiben wie in den anderen Messungen
+    rnd = random.Random(size)
+    tags = [f"tag{number}" for number in range(50)]
+    collections = ["Arbeit", "Arbeit/Recherche", "Arbeit/Recherche/Alt", "Privat", "Privat/Reisen"]
+    index = LinkIndex(load_links(ws.storage, ws.link_project(size)))
+    for link in index.links:
+        set_link_labels(link, rnd.sample(tags, rnd.randint(0, 3)), rnd.choice(collections + [''] * 5))
+    link_filter = LinkFilter(index)
+    link_filter.reset(index.links)
+    link_filter.index_pending()
+
+    def run():
+        for text in ("#tag1", "#tag1|tag2 -@Privat", "@Arbeit python", ""):
+            link_filter.set_text(text)
+            link_filter.visible_links()
+            link_filter.facet_counts()
+    return time_runs(run, ws.repeat)
+
+
+@benchmark('lookup', 'links')
+def bench_lookup(ws, size):
+    # 10 000 Auswahlen: Datensatz und Position per ID
+    index = LinkIndex(load_links(ws.storage, ws.link_project(size)))
+    ids = [link[LINK_ID_KEY] for link in random.Random(size).choices(index.links, k=10000)]
+
+    def run():
+        for link_id in ids:
+            index.get(link_id)
+            index.position(link_id)
+    return time_runs(run, ws.repeat)
+
+
+@benchmark('catalog_cold', 'projects')
+def bench_catalog_cold(ws, count):
+    # Projektübersicht ohne Katalog: jede Datei wird gezählt
+    storage = ws.project_storage(count)
+    if getattr(storage, 'catalog', None) is None:
+        return None
+
+    def forget():
+        try:
+            os.remove(storage.catalog.path)
+        except FileNotFoundError:
+            pass
+        storage.catalog._entries = None
+    return time_runs(storage.list_project_infos, ws.repeat, setup=forget)
+
+
+@benchmark('catalog', 'projects')
+def bench_catalog(ws, count):
+    storage = ws.project_storage(count)
+    storage.list_project_infos()
+    return time_runs(storage.list_project_infos, ws.repeat)
+
+
+@benchmark('search', 'projects')
+def bench_search(ws, count):
+    storage = ws.project_storage(count)
+    index = storage.open_search_index()
+    index.sync_projects(storage, storage.list_project_infos())
+
+    def run():
+        for query in SEARCH_QUERIES:
+            index.search(query)
+    try:
+        return time_runs(run, ws.repeat)
+    finally:
+        if index is not storage:
+            index.close()
+
+
+@benchmark('maintain_validate', 'projects')
+def bench_maintain_validate(ws, count):
+    # Wartung über alle Projektdateien, verteilt auf alle Kerne (nur Backend json)
+    from batch_ops import OP_VALIDATE, BatchRunner
+    storage = ws.project_storage(count)
+    if not isinstance(storage, JsonDirectoryStorage):
+        return None
+    return time_runs(lambda: BatchRunner(storage, OP_VALIDATE).run(), ws.repeat)
+
+
+# --- Oberfläche ---
+@benchmark('ui_load_project', 'links', ui=True)
+def bench_ui_load_project(ws, size):
+    app = ws.ui_app()
+    name = ui_link_project(ws, app, size)
+
+    def run():
+        app.open_project(name)
+        pump(app.root, lambda: app.project_loader is None)
+    return time_runs(run, ws.repeat)
+
+
+@benchmark('ui_save_project', 'links', ui=True)
+def bench_ui_save_project(ws, size):
+    app = ws.ui_app()
+    ui_open(app, ui_link_project(ws, app, size))
+
+    def setup():
+        app.pending_ops = None # alles schreiben
+        app.mark_unsaved(True)
+
+    def run():
+        app.save_project()
+        pump(app.root, lambda: not app.io.busy)
+    return time_runs(run, ws.repeat, setup=setup)
+
+
+@benchmark('ui_update_link_list', 'links', ui=True)
+def bench_ui_update_link_list(ws, size):
+    # Erstes Zeichnen der vollständigen Liste
+    app = ws.ui_app()
+    ui_open(app, ui_link_project(ws, app, size))
+
+    def run():
+        app.update_link_list()
+        app.root.update_idletasks()
+    return time_runs(run, ws.repeat, setup=lambda: app.link_view.sync([]))
+
+
+@benchmark('ui_select_link', 'links', ui=True)
+def bench_ui_select_link(ws, size):
+    app = ws.ui_app()
+    ui_open(app, ui_link_project(ws, app, size))
+    ids = [link[LINK_ID_KEY] for link in random.Random(size).choices(app.project_data, k=100)]
+
+    def run():
+        for link_id in ids:
+            app.select_link(link_id)
+            app.root.update_idletasks()
+    return time_runs(run, ws.repeat)
+
+
+@benchmark('ui_project_list', 'projects', ui=True)
+def bench_ui_project_list(ws, count):
+    app = ws.ui_app()
+    ui_project_dir(ws, app, count)
+    filled = []
+    fill_project_list = type(app).fill_project_list
+
+    def fill(project_infos):
+        fill_project_list(app, project_infos)
+        filled.append(True)
+    app.fill_project_list = fill
+
+    def run():
+        del filled[:]
+        app.load_projects_into_list()
+        pump(app.root, lambda: filled)
+        app.root.update_idletasks()
+    try:
+        return time_runs(run, ws.repeat)
+    finally:
+        del app.fill_project_list
+        pump(app.root, lambda: not app.io.busy)
+
+
+@benchmark('ui_search', 'projects', ui=True)
+def bench_ui_search(ws, count):
+    app = ws.ui_app()
+    ui_project_dir(ws, app, count)
+    app.load_projects_into_list()
+    pump(app.root, lambda: not app.io.busy) # Suchindex abgleichen
+    shown = []
+    show_search_results = type(app).show_search_results
+
+    def show(*args):
+        show_search_results(app, *args)
+        shown.append(True)
+    app.show_search_results = show
+
+    def run():
+        for query in SEARCH_QUERIES:
+            del shown[:]
+            app.search_var.set(query)
+            app.search_all_projects()
+            pump(app.root, lambda: shown)
+    try:
+        return time_runs(run, ws.repeat)
+    finally:
+        del app.show_search_results
+        app.clear_search()
+
+
+def ui_link_project(ws, app, size):
+    name = f"Bench {size}"
+    if not app.storage.exists(name):
+        create_project(app.storage, name, size)
+    return name
+
+
+def ui_open(app, name):
+    if app.current_project_name != name or app.project_loader is not None:
+        app.open_project(name)
+        pump(app.root, lambda: app.project_loader is None)
+
+
+def ui_project_dir(ws, app, count):
+    # Die Projekte kommen zu den Bench-Projekten im Projektverzeichnis der App hinzu
+    if app.current_frame is not app.start_frame:
+        app.leave_project()
+    existing = set(app.storage.list_projects())
+    for i in range(count):
+        if project_name(i) not in existing:
+            create_project(app.storage, project_name(i), LINKS_PER_PROJECT, seed=1 + i)
+
+
+# --- Ablauf ---
+def run_suite(args):
+    link_sizes = args.links or (FULL_LINK_SIZES if args.full else DEFAULT_LINK_SIZES)
+    project_counts = args.projects or (FULL_PROJECT_COUNTS if args.full else DEFAULT_PROJECT_COUNTS)
+    only = set(args.only.split(',')) if args.only else None
+    ws = Workspace(args.backend, args.repeat)
+    results = []
+    try:
+        for name, scale, ui, fn in BENCHMARKS:
+            if only is not None and name not in only:
+                continue
+            for size in (link_sizes if scale == 'links' else project_counts):
+                result = {'name': name, 'scale': scale, 'size': size, 'backend': args.backend}
+                if ui and ws.ui_app() is None:
+                    result['skipped'] = ws.ui_error
+                else:
+                    times = fn(ws, size)
+                    if times is None:
+                        result['skipped'] = "für dieses Backend nicht anwendbar"
+                    else:
+                        result.update(runs=times, median=statistics.median(times), min=min(times))
+                results.append(result)
+                print_result(result)
+    finally:
+        ws.close()
+    return results
+
+
+def result_key(result):
+    return f"{result['name']}/{result['backend']}/{result['size']}"
+
+
+def print_result(result):
+    label = f"{result['name']} [{result['size']} {result['scale']}]"
+    if 'skipped' in result:
+        print(f"{label:<40} übersprungen: {result['skipped']}", file=sys.stderr)
+    else:
+        print(f"{label:<40} Median {result['median'] * 1000:10.2f} ms   Min {result['min'] * 1000:10.2f} ms",
+              file=sys.stderr)
+
+
+def compare(results, baseline, threshold, min_delta):
+    """Vergleicht die Bestzeiten mit einer früheren Ausgabe; gibt die Verschlechterungen zurück.
+
+    Verglichen wird das Minimum der Läufe, das schwankt weniger als der Median.
+    """
+    before = {result_key(result): result for result in baseline.get('results', []) if 'min' in result}
+    regressions = []
+    print(f"\n{'Benchmark (Minimum)':<40} {'Basis ms':>10} {'Jetzt ms':>10} {'Änderung':>9}", file=sys.stderr)
+    for result in results:
+        old = before.get(result_key(result))
+        if old is None or 'min' not in result:
+            continue
+        change = result['min'] / old['min'] - 1 if old['min'] else 0.0
+        slower = change > threshold and result['min'] - old['min'] > min_delta
+        if slower:
+            regressions.append(result_key(result))
+        print(f"{result_key(result):<40} {old['min'] * 1000:10.2f} {result['min'] * 1000:10.2f} "
+              f"{change:>+9.1%}{'  LANGSAMER' if slower else ''}", file=sys.stderr)
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--links', type=int, nargs='+', help="Projektgrößen (Links) für Laden/Speichern/Anzeige")
+    parser.add_argument('--projects', type=int, nargs='+', help="Anzahl Projektdateien für Übersicht und Suche")
+    parser.add_argument('--full', action='store_true', help="bis 1 Mio. Links und 10 000 Projekte")
+    parser.add_argument('--backend', choices=[STORAGE_JSON, STORAGE_SQLITE], default=STORAGE_JSON)
+    parser.add_argument('--only', help="nur diese Benchmarks (kommagetrennt): "
+                                       + ", ".join(name for name, _, _, _ in BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('-o', '--output', help="Ergebnisse als JSON in diese Datei ('-' für stdout)")
+    parser.add_argument('--baseline', help="frühere JSON-Ausgabe zum Vergleich")
+    parser.add_argument('--threshold', type=float, default=0.25, help="erlaubte Verlangsamung (0.25 = 25 %%)")
+    parser.add_argument('--min-delta', type=float, default=0.002,
+                        help="kleinere Unterschiede (Sekunden) zählen nie als Verschlechterung")
+    args = parser.parse_args()
+
+    results = run_suite(args)
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'revision': git_revision(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'backend': args.backend,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    if args.output == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_delta)
+        if regressions:
+            print(f"\n{len(regressions)} Benchmark(s) langsamer als die Basis: {', '.join(regressions)}",
+                  file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
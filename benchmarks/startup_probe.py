@@ -0,0 +1,48 @@
+"""Ein Programmstart mit Zeitmessung; wird von run_benchmarks.py als eigener Prozess gestartet.
+
+    python benchmarks/startup_probe.py [json|sqlite]
+
+Das Projektverzeichnis kommt wie bei der App aus HOME. Ausgegeben wird eine
+JSON-Zeile mit Zeitpunkten (time.time(), vergleichbar mit dem startenden
+Prozess): Module importiert, Fenster zum ersten Mal gezeichnet und bedienbar
+(Projektliste mit dem Verzeichnis abgeglichen, Caches im Hintergrund geladen).
+"""
+import json
+import os
+import sys
+import time
+
+TIMEOUT = 600.0
+
+
+def main():
+    imports_started = time.time()
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import tkinter as tk
+    import linkmem_core
+    import modern_link_manager
+    if len(sys.argv) > 1:
+        linkmem_core.STORAGE_BACKEND = sys.argv[1]
+        modern_link_manager.STORAGE_BACKEND = sys.argv[1]
+    imported = time.time()
+
+    root = tk.Tk()
+    app = modern_link_manager.LinkManagerApp(root)
+    root.update()
+    painted = time.time()
+    rows = len(app.project_tree.get_children())
+
+    deadline = time.perf_counter() + TIMEOUT
+    while app.link_check_cache is None or app.io.busy:
+        if time.perf_counter() > deadline:
+            raise TimeoutError("Zeitüberschreitung beim Warten auf die Oberfläche")
+        root.update()
+        time.sleep(0.0005)
+    interactive = time.time()
+    app.destroy()
+    print(json.dumps({'imports_started': imports_started, 'imported': imported, 'painted': painted,
+                      'interactive': interactive, 'rows_at_paint': rows}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""Synthetische Projekte für die Benchmarks (reproduzierbar über `seed`)."""
+import random
+
+WORDS = ("python", "linux", "rezept", "anleitung", "news", "docs", "forum", "video",
+         "release", "blog", "wiki", "projekt", "api", "referenz", "tutorial", "archiv")
+
+
+def generate_links(count, host_count=2000, seed=1, with_ids=True):
+    """Liefert frische dicts wie aus json.load (jeder String ein eigenes Objekt).
+
+    Etwa 40 % der Links haben keine eigene Beschreibung (desc == URL), wie nach
+    einem Import von URL-Listen.
+    """
+    rnd = random.Random(seed)
+    hosts = [f"www.{rnd.choice(WORDS)}{i}.example.org" for i in range(max(1, host_count))]
+    for i in range(count):
+        scheme = "https://" if rnd.random() < 0.8 else "http://"
+        path = "/".join(rnd.choice(WORDS) for _ in range(rnd.randint(1, 4)))
+        url = f"{scheme}{rnd.choice(hosts)}/{path}?id={i}"
+        if rnd.random() < 0.4:
+            desc = "".join([url[:1], url[1:]])
+        else:
+            desc = " ".join(rnd.choice(WORDS).capitalize() for _ in range(rnd.randint(2, 6)))
+        link = {'url': url, 'desc': desc}
+        if with_ids:
+            link['id'] = f"{rnd.getrandbits(64):016x}"
+        yield link
+
+
+def project_name(index):
+    return f"Projekt {index:05d}"
+
+
+def create_project(storage, name, link_count, seed=1):
+    """Legt ein Projekt mit `link_count` Links an und gibt seinen Namen zurück."""
+    storage.save(name, links=list(generate_links(link_count, seed=seed)))
+    return name
+
+
+def create_projects(storage, project_count, links_per_project=50, seed=1):
+    """Viele kleine Projekte (Projektübersicht, Katalog, projektübergreifende Suche)."""
+    return [create_project(storage, project_name(i), links_per_project, seed=seed + i)
+            for i in range(project_count)]
@@ -0,0 +1,261 @@
+import bisect
+import json
+import mmap
+import os
+import struct
+import zlib
+
+# --- Binäres Projektformat ---
+# Alternative zur JSON-Momentaufnahme (json.dump mit Einrückung): gleicher Inhalt,
+# aber ohne Leerraum, optional komprimiert und mit Index, sodass Linkanzahl und
+# beliebige Zeilenbereiche per mmap gelesen werden, ohne die Datei zu dekodieren.
+#
+#   Kopf (32 Bytes)  MAGIC, Version, Kompression, Anzahl Elemente, Anzahl Links, Index-Offset
+#   Blöcke           je etwa BLOCK_BYTES an Datensätzen, einzeln komprimiert
+#   Index            pro Block: Offset, erste Zeile, gespeicherte Größe, Anzahl Datensätze
+#
+# Ein Datensatz ist ein Element der JSON-Liste (kompaktes UTF-8-JSON) mit
+# vorangestellter Länge (uint32). Die Umwandlung in beide Richtungen ist
+# verlustfrei, auch für Felder, die Linkmem selbst nicht kennt.
+# Alle Zahlen little endian.
+
+MAGIC = b'LMPB'
+VERSION = 1
+HEADER = struct.Struct('<4sBBHQQQ')
+INDEX_ENTRY = struct.Struct('<QQII')
+RECORD_LENGTH = struct.Struct('<I')
+BLOCK_BYTES = 64 * 1024
+
+COMPRESSION_NONE = 0
+COMPRESSION_GZIP = 1
+COMPRESSION_ZSTD = 2
+
+# Dateiformate der Momentaufnahme (siehe project_journal.write_snapshot)
+FILE_FORMAT_JSON = 'json'
+FILE_FORMAT_BINARY = 'binary'
+FILE_FORMAT_GZIP = 'binary-gzip'
+FILE_FORMAT_ZSTD = 'binary-zstd'
+FILE_FORMAT_COMPRESSION = {
+    FILE_FORMAT_BINARY: COMPRESSION_NONE,
+    FILE_FORMAT_GZIP: COMPRESSION_GZIP,
+    FILE_FORMAT_ZSTD: COMPRESSION_ZSTD,
+}
+FILE_FORMATS = (FILE_FORMAT_JSON,) + tuple(FILE_FORMAT_COMPRESSION)
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("zstd-Kompression braucht das Paket 'zstandard' (pip install zstandard).") from None
+    return zstandard
+
+
+def _compress(data, compression):
+    if compression == COMPRESSION_GZIP:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip-Rahmen
+        return compressor.compress(data) + compressor.flush()
+    if compression == COMPRESSION_ZSTD:
+        return _zstd().ZstdCompressor(level=3).compress(data)
+    return data
+
+
+def _decompress(data, compression):
+    if compression == COMPRESSION_GZIP:
+        return zlib.decompress(data, 31)
+    if compression == COMPRESSION_ZSTD:
+        # Die Blockgröße steht im zstd-Rahmen (write_content_size)
+        return _zstd().ZstdDecompressor().decompress(data)
+    return data
+
+
+def is_binary_project(filepath):
+    """True, wenn die Datei im binären Format vorliegt (erkannt am Dateianfang)."""
+    try:
+        with open(filepath, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def file_format_of(filepath):
+    """FILE_FORMAT_* einer vorhandenen Momentaufnahme."""
+    if not is_binary_project(filepath):
+        return FILE_FORMAT_JSON
+    with BinaryProjectReader(filepath) as reader:
+        for file_format, compression in FILE_FORMAT_COMPRESSION.items():
+            if compression == reader.compression:
+                return file_format
+    raise ValueError(f"Unbekannte Kompression in {filepath}")
+
+
+def write_binary_project(f, items, compression=COMPRESSION_NONE, block_bytes=BLOCK_BYTES):
+    """Schreibt `items` (beliebige JSON-Werte, auch als Generator) in die binär geöffnete Datei f.
+
+    Gibt die Anzahl geschriebener Bytes zurück. f muss seekable sein, der Kopf
+    wird am Ende mit Anzahl und Index-Offset nachgetragen.
+    """
+    if compression != COMPRESSION_NONE:
+        _compress(b'', compression)  # fehlt zstandard, vor dem Schreiben scheitern
+    f.write(HEADER.pack(MAGIC, VERSION, compression, 0, 0, 0, 0))
+    offset = HEADER.size
+    index = []
+    block = []
+    block_size = 0
+    block_first = 0
+    record_count = 0
+    link_count = 0
+
+    def flush_block():
+        nonlocal offset
+        data = _compress(b''.join(block), compression)
+        f.write(data)
+        index.append(INDEX_ENTRY.pack(offset, block_first, len(data), len(block) // 2))
+        offset += len(data)
+
+    for item in items:
+        record = json.dumps(item, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        block.append(RECORD_LENGTH.pack(len(record)))
+        block.append(record)
+        block_size += RECORD_LENGTH.size + len(record)
+        record_count += 1
+        if isinstance(item, dict) and 'url' in item:
+            link_count += 1
+        if block_size >= block_bytes:
+            flush_block()
+            block = []
+            block_size = 0
+            block_first = record_count
+    if block:
+        flush_block()
+    index_offset = offset
+    f.write(b''.join(index))
+    end = f.tell()
+    f.seek(0)
+    f.write(HEADER.pack(MAGIC, VERSION, compression, 0, record_count, link_count, index_offset))
+    f.seek(end)
+    return end
+
+
+class BinaryProjectReader:
+    """Liest eine binäre Momentaufnahme über mmap.
+
+    Kopf und Index werden beim Öffnen gelesen; Elemente werden erst beim Zugriff
+    und nur für die betroffenen Blöcke dekodiert. Als Kontextmanager benutzen
+    oder close() aufrufen (unter Windows verhindert ein offenes mmap os.replace).
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self._file = open(filepath, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._read_header()
+        except (ValueError, struct.error) as e:
+            self.close()
+            raise ValueError(f"Beschädigte Projektdatei {filepath}: {e}") from None
+        except BaseException:
+            self.close()
+            raise
+
+    def _read_header(self):
+        if len(self._map) < HEADER.size:
+            raise ValueError("Datei zu kurz")
+        magic, version, compression, _, records, links, index_offset = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError("kein binäres Projekt")
+        if version != VERSION:
+            raise ValueError(f"Version {version} wird nicht unterstützt")
+        if compression not in (COMPRESSION_NONE, COMPRESSION_GZIP, COMPRESSION_ZSTD):
+            raise ValueError(f"unbekannte Kompression {compression}")
+        index_size = len(self._map) - index_offset
+        if index_offset < HEADER.size or index_size < 0 or index_size % INDEX_ENTRY.size:
+            raise ValueError("Index fehlt oder ist unvollständig (Schreiben abgebrochen?)")
+        self.compression = compression
+        self.record_count = records
+        self.link_count = links
+        self.size = len(self._map)
+        self._index = list(INDEX_ENTRY.iter_unpack(self._map[index_offset:]))
+        self._firsts = [entry[1] for entry in self._index]
+
+    def __len__(self):
+        return self.record_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def _block(self, number):
+        offset, _, stored, count = self._index[number]
+        data = self._map[offset:offset + stored]
+        if self.compression != COMPRESSION_NONE:
+            data = _decompress(data, self.compression)
+        return data, count
+
+    @staticmethod
+    def _records(data, count, skip=0, limit=None):
+        # Übersprungene Datensätze kosten nur das Lesen ihrer Länge; die übrigen
+        # werden als ein JSON-Array dekodiert (ein loads-Aufruf pro Block)
+        pos = 0
+        unpack = RECORD_LENGTH.unpack_from
+        width = RECORD_LENGTH.size
+        stop = count if limit is None else min(count, skip + limit)
+        parts = []
+        for number in range(stop):
+            length = unpack(data, pos)[0]
+            pos += width
+            if number >= skip:
+                parts.append(data[pos:pos + length])
+            pos += length
+        return json.loads(b'[' + b','.join(parts) + b']')
+
+    def iter_items(self, on_progress=None):
+        """Alle Elemente in Reihenfolge; `on_progress(bytes)` nach jedem Block."""
+        for number, entry in enumerate(self._index):
+            data, count = self._block(number)
+            try:
+                items = self._records(data, count)
+            except (ValueError, struct.error) as e:
+                raise ValueError(f"Beschädigter Block {number} in {self.filepath}: {e}") from None
+            yield from items
+            if on_progress is not None:
+                on_progress(entry[0] + entry[2])
+
+    def read_range(self, start, stop=None):
+        """Elemente [start:stop] als Liste; dekodiert nur die Blöcke, in denen sie liegen."""
+        start, stop, _ = slice(start, stop).indices(self.record_count)
+        items = []
+        if start >= stop:
+            return items
+        number = bisect.bisect_right(self._firsts, start) - 1
+        while number < len(self._index) and len(items) < stop - start:
+            first = self._firsts[number]
+            data, count = self._block(number)
+            skip = max(0, start - first)
+            items.extend(self._records(data, count, skip, stop - start - len(items)))
+            number += 1
+        return items
+
+
+def convert_project_file(filepath, file_format):
+    """Schreibt eine Momentaufnahme verlustfrei im Format `file_format` neu (atomar).
+
+    Gibt (altes Format, Bytes vorher, Bytes nachher) zurück. Ein Journal neben der
+    Datei bleibt unverändert gültig, es wird beim Laden weiterhin angewendet.
+    """
+    from project_journal import iter_snapshot_items, write_snapshot
+    old_format = file_format_of(filepath)
+    old_size = os.path.getsize(filepath)
+    if old_format == file_format:
+        return old_format, old_size, old_size
+    write_snapshot(filepath, iter_snapshot_items(filepath), file_format)
+    return old_format, old_size, os.path.getsize(filepath)
@@ -0,0 +1,293 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+# --- Messpunkte (optional) ---
+# Ausgeschaltet kostet span() nur einen Funktionsaufruf und liefert ein
+# Dummy-Objekt. Eingeschaltet (enable() oder Umgebungsvariable LINKMEM_TRACE)
+# werden Dauer, Anzahl Einträge und Bytes je Vorgang gesammelt; die Ereignisse
+# lassen sich als Chrome-Trace (chrome://tracing, Perfetto) exportieren.
+#
+#   with span('load', project=name) as s:
+#       ...
+#       s.add(items=count, bytes=size)
+#
+# annotate() ergänzt den innersten offenen Messpunkt des aktuellen Threads,
+# z.B. tief im Speichercode, ohne den Messpunkt durchreichen zu müssen.
+
+TRACE_ENV_VAR = "LINKMEM_TRACE"
+MAX_EVENTS = 100000          # ältere Ereignisse fallen aus dem Ringpuffer
+STALL_THRESHOLD_MS = 250     # so lange darf der Tk-Thread höchstens blockieren
+STALL_HEARTBEAT_MS = 50
+
+_tracer = None
+_local = threading.local()
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def add(self, items=0, bytes=0, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    __slots__ = ('tracer', 'name', 'args', 'items', 'bytes', 'start')
+
+    def __init__(self, tracer, name, items, bytes, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.items = items
+        self.bytes = bytes
+
+    def add(self, items=0, bytes=0, **args):
+        self.items += items
+        self.bytes += bytes
+        if args:
+            self.args.update(args)
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        _local.stack.pop()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.record(self.name, self.start, end - self.start, self.items, self.bytes, self.args)
+        return False
+
+
+class Tracer:
+    """Sammelt Messpunkte aller Threads in einem Ringpuffer und summiert sie je Name."""
+
+    def __init__(self, max_events=MAX_EVENTS):
+        self.epoch = time.perf_counter()
+        self.events = deque(maxlen=max_events)  # (Name, Start, Dauer, Einträge, Bytes, Args, Thread-ID)
+        self.totals = {}  # Name -> [Anzahl, Sekunden, längste, Einträge, Bytes]
+        self.thread_names = {}
+        self.stalls = 0
+        self.longest_stall = 0.0
+        self.generation = 0  # zählt abgeschlossene Ereignisse (für Live-Anzeigen)
+        self._lock = threading.Lock()
+
+    def record(self, name, start, duration, items=0, bytes=0, args=None):
+        thread = threading.current_thread()
+        with self._lock:
+            self.events.append((name, start, duration, items, bytes, args or None, thread.ident))
+            self.thread_names[thread.ident] = thread.name
+            total = self.totals.get(name)
+            if total is None:
+                total = self.totals[name] = [0, 0.0, 0.0, 0, 0]
+            total[0] += 1
+            total[1] += duration
+            total[2] = max(total[2], duration)
+            total[3] += items
+            total[4] += bytes
+            self.generation += 1
+
+    def record_stall(self, start, duration, stack=None):
+        with self._lock:
+            self.stalls += 1
+            self.longest_stall = max(self.longest_stall, duration)
+        self.record('stall', start, duration, args={'stack': stack} if stack else None)
+
+    def summary(self, limit=3):
+        """Kurzfassung der letzten Vorgänge für die Statusleiste (ohne die io.*-Aufträge)."""
+        with self._lock:
+            recent = list(self.events)[-200:]
+            stalls, longest = self.stalls, self.longest_stall
+        parts = []
+        seen = set()
+        for name, start, duration, items, size, args, tid in reversed(recent):
+            if name in seen or name == 'stall' or name.startswith('io.'):
+                continue
+            seen.add(name)
+            parts.append(describe(name, duration, items, size))
+            if len(parts) >= limit:
+                break
+        if stalls:
+            parts.append(f"{stalls} Hänger (max. {format_duration(longest)})")
+        return " · ".join(parts)
+
+    def report(self):
+        """Tabelle aller Summen, die teuersten Vorgänge zuerst."""
+        with self._lock:
+            totals = sorted(self.totals.items(), key=lambda entry: entry[1][1], reverse=True)
+        lines = [f"{'Vorgang':<28} {'Anzahl':>7} {'gesamt':>10} {'max':>10} {'Einträge':>10} {'Bytes':>10}"]
+        for name, (count, seconds, longest, items, size) in totals:
+            lines.append(f"{name:<28} {count:>7} {format_duration(seconds):>10} {format_duration(longest):>10} "
+                         f"{items or '':>10} {format_bytes(size) if size else '':>10}")
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """Ereignisse im Trace-Event-Format (Chrome, Perfetto, speedscope)."""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self.events)
+            thread_names = dict(self.thread_names)
+        trace = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                 for tid, name in thread_names.items()]
+        for name, start, duration, items, size, args, tid in events:
+            event_args = dict(args) if args else {}
+            if items:
+                event_args['items'] = items
+            if size:
+                event_args['bytes'] = size
+            trace.append({'name': name, 'cat': name.split('.')[0], 'ph': 'X', 'pid': pid, 'tid': tid,
+                          'ts': round((start - self.epoch) * 1e6, 1), 'dur': round(duration * 1e6, 1),
+                          'args': event_args})
+        return {'traceEvents': trace, 'displayTimeUnit': 'ms'}
+
+    def export(self, path):
+        """Schreibt chrome_trace() atomar nach `path`."""
+        data = self.chrome_trace()
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+        return len(data['traceEvents'])
+
+
+class StallMonitor:
+    """Meldet, wenn der Tk-Thread länger als `threshold_ms` keine Ereignisse verarbeitet.
+
+    Ein root.after-Herzschlag setzt einen Zeitstempel; ein Wächter-Thread merkt,
+    wenn er ausbleibt, und hält einmal pro Hänger den Stack des Tk-Threads fest.
+    Sobald der Herzschlag wieder kommt, wird der Hänger mit Dauer und Stack
+    als 'stall' aufgezeichnet.
+    """
+
+    def __init__(self, root, tracer, threshold_ms=STALL_THRESHOLD_MS, heartbeat_ms=STALL_HEARTBEAT_MS):
+        self.root = root
+        self.tracer = tracer
+        self.threshold = threshold_ms / 1000
+        self.heartbeat_ms = heartbeat_ms
+        self._main_ident = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._stack = None
+        self._job = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._job = self.root.after(self.heartbeat_ms, self._beat)
+        self._thread = threading.Thread(target=self._watch, name="StallMonitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._job is not None:
+            try:
+                self.root.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
+
+    def _beat(self):
+        now = time.perf_counter()
+        # Erwartet: nach heartbeat_ms; alles darüber hinaus war der Tk-Thread beschäftigt
+        blocked = now - self._last_beat - self.heartbeat_ms / 1000
+        if blocked > self.threshold:
+            self.tracer.record_stall(now - blocked, blocked, self._stack)
+        self._stack = None
+        self._last_beat = now
+        self._job = self.root.after(self.heartbeat_ms, self._beat)
+
+    def _watch(self):
+        while not self._stop.wait(self.threshold / 2):
+            if self._stack is None and time.perf_counter() - self._last_beat > self.threshold:
+                frame = sys._current_frames().get(self._main_ident)
+                if frame is not None:
+                    import traceback # nur im Wächter-Thread, spart Zeit beim Programmstart
+                    self._stack = [line.rstrip() for line in traceback.format_stack(frame)[-12:]]
+
+
+def enable(max_events=MAX_EVENTS):
+    """Schaltet die Messpunkte ein (idempotent) und gibt den Tracer zurück."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(max_events)
+    return _tracer
+
+
+def disable():
+    global _tracer
+    _tracer = None
+
+
+def enabled():
+    return _tracer is not None
+
+
+def tracer():
+    return _tracer
+
+
+def enable_from_environment():
+    """Schaltet ein, wenn LINKMEM_TRACE gesetzt ist; gibt den Wert (z.B. den Exportpfad) oder None zurück."""
+    value = os.environ.get(TRACE_ENV_VAR)
+    if not value or value == '0':
+        return None
+    enable()
+    return value
+
+
+def span(name, items=0, bytes=0, **args):
+    """Messpunkt als Kontextmanager; ausgeschaltet ein Dummy ohne Wirkung."""
+    if _tracer is None:
+        return _NULL_SPAN
+    return Span(_tracer, name, items, bytes, args)
+
+
+def annotate(items=0, bytes=0, **args):
+    """Ergänzt den innersten offenen Messpunkt des aktuellen Threads."""
+    if _tracer is None:
+        return
+    stack = getattr(_local, 'stack', None)
+    if stack:
+        stack[-1].add(items, bytes, **args)
+
+
+def format_duration(seconds):
+    if seconds < 0.001:
+        return "<1 ms"
+    if seconds < 1:
+        return f"{seconds * 1000:.0f} ms"
+    return f"{seconds:.2f} s"
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def describe(name, duration, items=0, size=0):
+    text = f"{name} {format_duration(duration)}"
+    if items:
+        text += f", {items} Einträge"
+    if size:
+        text += f", {format_bytes(size)}"
+    return text
@@ -0,0 +1,173 @@
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from instrumentation import span
+
+# --- Hintergrund-I/O ---
+
+# Koaleszier-Modi für submit()
+SHARE = 'share'    # identische Anfrage steht schon an -> Ergebnis teilen (Lesen, Auflisten)
+LATEST = 'latest'  # wartende Anfrage derselben Art wird durch die neueste ersetzt (Speichern)
+
+
+class _Job:
+    __slots__ = ('key', 'fn', 'args', 'mode', 'future', 'callbacks')
+
+    def __init__(self, key, fn, args, mode):
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.mode = mode
+        self.future = Future()
+        self.callbacks = []
+
+
+class IOScheduler:
+    """Führt Dateizugriffe in einem Thread-Pool aus und meldet die Ergebnisse im Tk-Thread.
+
+    Aufträge mit demselben Schlüssel (i.d.R. der Dateipfad) laufen strikt
+    nacheinander in Auftragsreihenfolge, so dass z.B. ein Laden immer nach einem
+    vorher angestoßenen Speichern derselben Datei stattfindet. Doppelte Anfragen
+    werden zusammengefasst (siehe SHARE/LATEST). Die Callbacks on_done/on_error
+    werden über root.after im Tk-Thread aufgerufen; ohne root direkt im Worker.
+    """
+
+    def __init__(self, root=None, max_workers=4, poll_ms=15):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="linkmem-io")
+        self._lock = threading.Lock()
+        self._queues = {}       # Schlüssel -> [laufender Auftrag, wartende Aufträge...]
+        self._undelivered = {}  # Schlüssel -> Anzahl Aufträge, deren Callbacks noch ausstehen
+        self._finished = queue.Queue()
+        self._deliver_lock = threading.Lock()
+        self._idle_callbacks = []
+        self._polling = False
+
+    @property
+    def busy(self):
+        return bool(self._undelivered)
+
+    def is_busy(self, key):
+        return key in self._undelivered
+
+    def submit(self, key, fn, *args, on_done=None, on_error=None, mode=SHARE):
+        """Stellt fn(*args) für `key` in die Warteschlange und gibt ein Future zurück."""
+        with self._lock:
+            jobs = self._queues.get(key)
+            if jobs:
+                last = jobs[-1]
+                if mode == SHARE and last.mode == SHARE and last.fn == fn and last.args == args:
+                    last.callbacks.append((on_done, on_error))
+                    return last.future
+                if mode == LATEST and len(jobs) > 1 and last.mode == LATEST and last.fn == fn:
+                    # Noch nicht gestartet: nur der neueste Stand wird geschrieben
+                    last.args = args
+                    last.callbacks.append((on_done, on_error))
+                    return last.future
+            job = _Job(key, fn, args, mode)
+            job.callbacks.append((on_done, on_error))
+            self._undelivered[key] = self._undelivered.get(key, 0) + 1
+            if jobs:
+                jobs.append(job)
+            else:
+                self._queues[key] = [job]
+                self._executor.submit(self._run, job)
+        self._ensure_polling()
+        return job.future
+
+    def when_idle(self, callback, key=None):
+        """Ruft callback auf, sobald keine Aufträge (für `key` bzw. insgesamt) mehr offen sind."""
+        if not self._is_idle(key):
+            self._idle_callbacks.append((key, callback))
+            self._ensure_polling()
+        else:
+            callback()
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait)
+
+    def _is_idle(self, key):
+        if key is None:
+            return not self._undelivered
+        return key not in self._undelivered
+
+    def _run(self, job):
+        result = error = None
+        try:
+            with span('io.' + getattr(job.fn, '__qualname__', 'job').replace('<locals>.', ''), key=job.key):
+                result = job.fn(*job.args)
+        except Exception as e:
+            error = e
+        # Erst aus der Warteschlange nehmen, dann melden: sonst könnte submit()
+        # noch Callbacks an einen bereits ausgelieferten Auftrag hängen.
+        with self._lock:
+            jobs = self._queues[job.key]
+            jobs.pop(0)
+            if jobs:
+                self._executor.submit(self._run, jobs[0])
+            else:
+                del self._queues[job.key]
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(result)
+        self._finished.put((job, result, error))
+        if self.root is None:
+            self._deliver()
+
+    def _ensure_polling(self):
+        if self.root is not None and not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        try:
+            self._deliver()
+        finally:
+            if self._undelivered or self._idle_callbacks:
+                self.root.after(self.poll_ms, self._poll)
+            else:
+                self._polling = False
+
+    def _deliver(self):
+        with self._deliver_lock:
+            self._deliver_finished()
+
+    def _deliver_finished(self):
+        while True:
+            try:
+                job, result, error = self._finished.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                count = self._undelivered[job.key] - 1
+                if count:
+                    self._undelivered[job.key] = count
+                else:
+                    del self._undelivered[job.key]
+            for on_done, on_error in job.callbacks:
+                # Ein fehlerhafter Callback darf die Zustellung nicht anhalten (sonst kommt nichts mehr an)
+                try:
+                    if error is not None:
+                        if on_error is not None:
+                            on_error(error)
+                        else:
+                            print(f"Fehler bei Hintergrund-I/O ({job.key}): {error}")
+                    elif on_done is not None:
+                        on_done(result)
+                except Exception as e:
+                    print(f"Fehler beim Verarbeiten von Hintergrund-I/O ({job.key}): {type(e).__name__}: {e}")
+
+        if self._idle_callbacks:
+            waiting = self._idle_callbacks
+            self._idle_callbacks = []
+            for key, callback in waiting:
+                if self._is_idle(key):
+                    try:
+                        callback()
+                    except Exception as e:
+                        print(f"Fehler in when_idle-Callback ({key}): {type(e).__name__}: {e}")
+                else:
+                    self._idle_callbacks.append((key, callback))
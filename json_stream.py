@@ -0,0 +1,78 @@
+import codecs
+import json
+import re
+
+# --- Streamendes Lesen von JSON-Arrays ---
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_NUMBER_CHARS = frozenset('0123456789.eE+-')
+
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_json_array(stream, chunk_size=CHUNK_SIZE, on_progress=None):
+    """Liefert die Elemente eines JSON-Arrays einzeln, ohne die Datei komplett zu lesen.
+
+    `stream` ist eine binär geöffnete Datei. `on_progress(bytes_read)` wird nach
+    jedem gelesenen Block aufgerufen.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    buf = ''
+    pos = 0
+    eof = False
+    bytes_read = 0
+    state = 'start'
+
+    def refill():
+        nonlocal buf, pos, eof, bytes_read
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+            buf = buf[pos:] + text_decoder.decode(b'', final=True)
+        else:
+            bytes_read += len(chunk)
+            buf = buf[pos:] + text_decoder.decode(chunk)
+            if on_progress:
+                on_progress(bytes_read)
+        pos = 0
+
+    while True:
+        pos = _WHITESPACE.match(buf, pos).end()
+        if pos >= len(buf):
+            if eof:
+                if state == 'start':
+                    raise json.JSONDecodeError("Expecting value", buf, pos)
+                raise json.JSONDecodeError("Unterminated array", buf, pos)
+            refill()
+            continue
+
+        if state == 'start':
+            if buf[pos] != '[':
+                raise ValueError("Datei enthält keine gültige Link-Liste (kein JSON-Array).")
+            pos += 1
+            state = 'first'
+        elif state == 'sep':
+            char = buf[pos]
+            pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos - 1)
+            state = 'value'
+        else:
+            if state == 'first' and buf[pos] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                refill() # Element geht über das Blockende hinaus
+                continue
+            if not eof and (end >= len(buf) or buf[end] in _NUMBER_CHARS):
+                refill() # z.B. eine Zahl, die im nächsten Block weitergeht
+                continue
+            pos = end
+            state = 'sep'
+            yield item
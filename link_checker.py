@@ -0,0 +1,446 @@
+import asyncio
+import collections
+import json
+import os
+import queue
+import socket
+import ssl
+import threading
+import time
+from urllib.parse import quote, urljoin, urlsplit
+
+# --- Linkprüfung ---
+# HEAD-Anfragen (lehnt der Server HEAD ab: GET) über asyncio mit einem eigenen, schlanken
+# HTTP/1.1-Client: Verbindungen werden pro Host offen gehalten und
+# wiederverwendet, pro Host laufen höchstens MAX_PER_HOST Anfragen gleichzeitig.
+# Ergebnisse landen in einem Cache mit Ablaufzeit (LinkCheckCache), so dass
+# ein erneuter Lauf nur abgelaufene Einträge neu prüft.
+
+CHECK_CACHE_NAME = ".linkmem_linkcheck"
+DEFAULT_TIMEOUT = 10.0
+MAX_CONNECTIONS = 32
+MAX_PER_HOST = 4
+MAX_RETRIES = 2
+RETRY_BACKOFF = 0.5        # s, verdoppelt sich mit jedem Versuch
+MAX_RETRY_AFTER = 30.0     # längere Retry-After-Angaben werden gekürzt
+MAX_REDIRECTS = 5
+MAX_DRAIN_BYTES = 64 * 1024
+OK_TTL = 7 * 24 * 3600     # erreichbare Links eine Woche nicht neu prüfen
+ERROR_TTL = 24 * 3600      # fehlerhafte nach einem Tag erneut versuchen
+USER_AGENT = "Linkmem-Linkpruefung/1.0"
+
+REDIRECT_STATUSES = frozenset((301, 302, 303, 307, 308))
+RETRY_STATUSES = frozenset((429, 502, 503, 504))
+HEAD_REJECTED_STATUSES = frozenset((400, 403, 405, 501))
+CHECKED_SCHEMES = ('http', 'https')
+
+# status: HTTP-Status der letzten Antwort (None bei Fehlern), redirect: Ziel
+# nach Weiterleitungen (None ohne), latency: Sekunden, error: Fehlertext,
+# checked: Zeitpunkt der Prüfung (time.time())
+LinkStatus = collections.namedtuple('LinkStatus', ['status', 'redirect', 'latency', 'error', 'checked'])
+
+UNSUPPORTED = "nicht prüfbar"
+
+
+def is_broken(result):
+    if result is None or result.error == UNSUPPORTED:
+        return False
+    return result.status is None or result.status >= 400
+
+
+def status_label(result):
+    """Kurzer Text für die Statusspalte."""
+    if result is None:
+        return ""
+    if result.error == UNSUPPORTED:
+        return "–"
+    if result.status is None:
+        return result.error or "Fehler"
+    if result.redirect:
+        return f"{result.status} (umgeleitet)"
+    return str(result.status)
+
+
+class LinkCheckCache:
+    """Prüfergebnisse pro URL mit Ablaufzeit, gespeichert als JSON im Projektverzeichnis.
+
+    get() liefert nur gültige Einträge, peek() auch abgelaufene (zur Anzeige).
+    """
+
+    def __init__(self, path, ok_ttl=OK_TTL, error_ttl=ERROR_TTL):
+        self.path = path
+        self.ok_ttl = ok_ttl
+        self.error_ttl = error_ttl
+        self._lock = threading.Lock()
+        self._entries = {}  # URL -> LinkStatus
+        self._dirty = False
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            raw = {}
+        entries = {}
+        if isinstance(raw, dict):
+            for url, values in raw.items():
+                if isinstance(values, list) and len(values) == len(LinkStatus._fields):
+                    entries[url] = LinkStatus(*values)
+        with self._lock:
+            entries.update(self._entries)  # während des Ladens eingetragene Ergebnisse behalten
+            self._entries = entries
+        return len(entries)
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.time()
+            # Lange abgelaufene Einträge nicht ewig mitschleppen
+            data = {url: list(result) for url, result in self._entries.items()
+                    if now - result.checked < 4 * self._ttl(result)}
+            self._dirty = False
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warnung: Ergebnisse der Linkprüfung konnten nicht gespeichert werden: {e}")
+
+    def _ttl(self, result):
+        return self.error_ttl if is_broken(result) else self.ok_ttl
+
+    def peek(self, url):
+        return self._entries.get(url)
+
+    def get(self, url, now=None):
+        result = self._entries.get(url)
+        if result is None:
+            return None
+        if (now if now is not None else time.time()) - result.checked >= self._ttl(result):
+            return None
+        return result
+
+    def put(self, url, result):
+        with self._lock:
+            self._entries[url] = result
+            self._dirty = True
+
+
+class _Response:
+    __slots__ = ('status', 'headers', 'reusable')
+
+    def __init__(self, status, headers, reusable):
+        self.status = status
+        self.headers = headers
+        self.reusable = reusable
+
+
+class ConnectionPool:
+    """Offene Keep-Alive-Verbindungen pro (Schema, Host, Port) und Begrenzung pro Host."""
+
+    def __init__(self, per_host=MAX_PER_HOST, ssl_context=None):
+        self.per_host = per_host
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self._idle = {}    # Schlüssel -> [(reader, writer)]
+        self._slots = {}   # Host -> asyncio.Semaphore
+
+    def host_slot(self, host):
+        slot = self._slots.get(host)
+        if slot is None:
+            slot = self._slots[host] = asyncio.Semaphore(self.per_host)
+        return slot
+
+    async def connect(self, scheme, host, port, timeout):
+        """Gibt (reader, writer, wiederverwendet) zurück."""
+        idle = self._idle.get((scheme, host, port))
+        while idle:
+            reader, writer = idle.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return reader, writer, True
+            writer.close()
+        ssl_context = self.ssl_context if scheme == 'https' else None
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=ssl_context, server_hostname=host if ssl_context else None),
+            timeout)
+        return reader, writer, False
+
+    def release(self, scheme, host, port, reader, writer, reusable):
+        if reusable and not writer.is_closing():
+            self._idle.setdefault((scheme, host, port), []).append((reader, writer))
+        else:
+            writer.close()
+
+    def close(self):
+        for connections in self._idle.values():
+            for reader, writer in connections:
+                writer.close()
+        self._idle = {}
+
+
+def _request_target(parts):
+    # Nicht-ASCII-Zeichen in Pfad/Query kodieren, bereits kodierte (%xx) bleiben
+    target = quote(parts.path or '/', safe="/%:@!$&'()*+,;=-._~")
+    if parts.query:
+        target += '?' + quote(parts.query, safe="/%:@!$&'()*+,;=-._~?")
+    return target
+
+
+async def _read_response(reader, method, timeout):
+    status_line = await asyncio.wait_for(reader.readline(), timeout)
+    if not status_line:
+        raise ConnectionResetError("Verbindung vom Server geschlossen")
+    parts = status_line.decode('latin-1').split(None, 2)
+    if len(parts) < 2 or not parts[0].startswith('HTTP/'):
+        raise ValueError(f"Ungültige Antwort: {status_line[:80]!r}")
+    status = int(parts[1])
+    headers = {}
+    while True:
+        line = await asyncio.wait_for(reader.readline(), timeout)
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    reusable = parts[0] == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+    if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+        return _Response(status, headers, reusable)
+    # GET: kleinen Rumpf lesen, damit die Verbindung weiterverwendet werden kann
+    length = headers.get('content-length')
+    if reusable and length is not None and length.isdigit() and int(length) <= MAX_DRAIN_BYTES \
+            and 'chunked' not in headers.get('transfer-encoding', '').lower():
+        await asyncio.wait_for(reader.readexactly(int(length)), timeout)
+        return _Response(status, headers, True)
+    return _Response(status, headers, False)
+
+
+class LinkChecker:
+    """Prüft viele URLs nebenläufig (asyncio) und schreibt die Ergebnisse in einen LinkCheckCache.
+
+    Wie LinkImporter: run() läuft im Worker (eigene Event-Loop), der UI-Thread
+    holt Nachrichten mit poll() ab: ('result', url, LinkStatus),
+    ('progress', erledigt, gesamt), ('done', geprüft, aus_cache, fehlerhaft)
+    und ('error', exception). `urls` darf ein Generator sein, er wird erst im
+    Worker gelesen. Mit `force` werden auch noch gültige Einträge neu geprüft.
+    """
+
+    def __init__(self, urls, cache, force=False, timeout=DEFAULT_TIMEOUT, max_connections=MAX_CONNECTIONS,
+                 per_host=MAX_PER_HOST, retries=MAX_RETRIES, backoff=RETRY_BACKOFF, ssl_context=None):
+        self.urls = urls
+        self.cache = cache
+        self.force = force
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.ssl_context = ssl_context
+        self._messages = queue.Queue()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def poll(self, max_messages=None):
+        messages = []
+        while max_messages is None or len(messages) < max_messages:
+            try:
+                messages.append(self._messages.get_nowait())
+            except queue.Empty:
+                break
+        return messages
+
+    def run(self):
+        try:
+            self._messages.put(('done',) + asyncio.run(self._check_all()))
+        except Exception as e:
+            self._messages.put(('error', e))
+        finally:
+            self.cache.save()
+
+    # --- Ablauf ---
+    async def _check_all(self):
+        urls = list(dict.fromkeys(url.strip() for url in self.urls if url and url.strip()))
+        now = time.time()
+        todo = []
+        from_cache = broken = 0
+        for url in urls:
+            result = None if self.force else self.cache.get(url, now)
+            if result is None:
+                todo.append(url)
+            else:
+                from_cache += 1
+                broken += is_broken(result)
+        total = len(urls)
+        self._messages.put(('progress', from_cache, total))
+
+        pool = ConnectionPool(self.per_host, self.ssl_context)
+        pending = asyncio.Queue()
+        for url in _interleave_hosts(todo):
+            pending.put_nowait(url)
+        done = from_cache
+        checked = 0
+
+        async def worker():
+            nonlocal done, checked, broken
+            while not self._cancel.is_set():
+                try:
+                    url = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                result = await self.check_url(pool, url)
+                self.cache.put(url, result)
+                self._messages.put(('result', url, result))
+                done += 1
+                checked += 1
+                broken += is_broken(result)
+                if done % 50 == 0:
+                    self._messages.put(('progress', done, total))
+
+        async def watch_cancel(workers):
+            while not all(task.done() for task in workers):
+                if self._cancel.is_set():
+                    for task in workers:
+                        task.cancel()
+                    return
+                await asyncio.sleep(0.1)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(self.max_connections, len(todo)))]
+        try:
+            await asyncio.gather(watch_cancel(workers), *workers, return_exceptions=True)
+        finally:
+            pool.close()
+        return checked, from_cache, broken
+
+    async def check_url(self, pool, url):
+        """Prüft eine URL inkl. Weiterleitungen und Wiederholungen; gibt einen LinkStatus zurück."""
+        started = time.perf_counter()
+        try:
+            parts = urlsplit(url)
+        except ValueError as e:
+            return LinkStatus(None, None, 0.0, f"Ungültige URL ({e})", time.time())
+        if parts.scheme.lower() not in CHECKED_SCHEMES:
+            return LinkStatus(None, None, 0.0, UNSUPPORTED, time.time())
+        current = url
+        status = None
+        error = None
+        for _ in range(MAX_REDIRECTS + 1):
+            status, headers, error = await self._fetch_with_retries(pool, current)
+            if status not in REDIRECT_STATUSES or 'location' not in headers:
+                break
+            current = urljoin(current, headers['location'])
+            if urlsplit(current).scheme.lower() not in CHECKED_SCHEMES:
+                break
+        else:
+            error = "Zu viele Weiterleitungen"
+            status = None
+        redirect = current if current != url else None
+        return LinkStatus(status, redirect, round(time.perf_counter() - started, 3), error, time.time())
+
+    async def _fetch_with_retries(self, pool, url):
+        """Gibt (Status, Header, Fehlertext) zurück; wiederholt bei Netzfehlern und 429/5xx."""
+        error = None
+        for attempt in range(self.retries + 1):
+            delay = self.backoff * (2 ** attempt)
+            try:
+                response = await self._fetch(pool, url, 'HEAD')
+                if response.status in HEAD_REJECTED_STATUSES:
+                    # Manche Server beantworten HEAD nicht (richtig)
+                    response = await self._fetch(pool, url, 'GET')
+            except asyncio.TimeoutError:
+                error = "Zeitüberschreitung"
+            except ssl.SSLError as e:
+                return None, {}, f"SSL-Fehler ({e.reason or e})"
+            except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+                error = _describe_error(e)
+            else:
+                if response.status not in RETRY_STATUSES or attempt == self.retries:
+                    return response.status, response.headers, None
+                retry_after = response.headers.get('retry-after', '')
+                if retry_after.isdigit():
+                    delay = min(float(retry_after), MAX_RETRY_AFTER)
+                error = None
+            if attempt < self.retries:
+                await asyncio.sleep(delay)
+        return None, {}, error
+
+    async def _fetch(self, pool, url, method):
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        host = parts.hostname
+        if not host:
+            raise ValueError("Kein Host in der URL")
+        port = parts.port or (443 if scheme == 'https' else 80)
+        host_header = host.encode('idna').decode('ascii')
+        if parts.port:
+            host_header += f":{parts.port}"
+        request = (f"{method} {_request_target(parts)} HTTP/1.1\r\n"
+                   f"Host: {host_header}\r\n"
+                   f"User-Agent: {USER_AGENT}\r\n"
+                   "Accept: */*\r\n"
+                   "Connection: keep-alive\r\n\r\n").encode('ascii')
+        async with pool.host_slot(host):
+            reader, writer, reused = await pool.connect(scheme, host, port, self.timeout)
+            try:
+                writer.write(request)
+                await asyncio.wait_for(writer.drain(), self.timeout)
+                response = await _read_response(reader, method, self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if not reused:
+                    raise
+                # Der Server hat die ruhende Verbindung inzwischen geschlossen: einmal neu verbinden
+                reader, writer, _ = await pool.connect(scheme, host, port, self.timeout)
+                try:
+                    writer.write(request)
+                    await asyncio.wait_for(writer.drain(), self.timeout)
+                    response = await _read_response(reader, method, self.timeout)
+                except BaseException:
+                    writer.close()
+                    raise
+            except BaseException:
+                writer.close()
+                raise
+            pool.release(scheme, host, port, reader, writer, response.reusable)
+        return response
+
+
+def _describe_error(error):
+    if isinstance(error, socket.gaierror):
+        return "Host nicht gefunden"
+    if isinstance(error, ConnectionRefusedError):
+        return "Verbindung abgelehnt"
+    if isinstance(error, (ConnectionError, asyncio.IncompleteReadError)):
+        return "Verbindung abgebrochen"
+    return str(error) or type(error).__name__
+
+
+def _interleave_hosts(urls):
+    """Sortiert URLs reihum nach Host, damit nicht alle Worker auf denselben Host warten."""
+    by_host = collections.OrderedDict()
+    for url in urls:
+        try:
+            host = urlsplit(url).hostname or ''
+        except ValueError:
+            host = ''
+        by_host.setdefault(host, collections.deque()).append(url)
+    queues = list(by_host.values())
+    while queues:
+        for q in queues:
+            yield q.popleft()
+        queues = [q for q in queues if q]
+
+
+def check_links(urls, cache, **options):
+    """Prüft `urls` im aufrufenden Thread; gibt {url: LinkStatus} für alle URLs zurück (auch aus dem Cache)."""
+    urls = [url.strip() for url in urls if url and url.strip()]
+    checker = LinkChecker(urls, cache, **options)
+    checker.run()
+    for message in checker.poll():
+        if message[0] == 'error':
+            raise message[1]
+    return {url: cache.peek(url) for url in urls}
@@ -0,0 +1,76 @@
+import csv
+import html
+import json
+import os
+
+from link_import import FORMAT_BOOKMARKS, FORMAT_CSV, FORMAT_JSON, FORMAT_URL_LIST
+
+# --- Export ---
+# Gegenstück zu link_import: schreibt Links Eintrag für Eintrag in eine
+# Textdatei, die Links können also direkt aus storage.iter_links kommen.
+
+EXPORT_EXTENSIONS = {
+    FORMAT_BOOKMARKS: '.html',
+    FORMAT_URL_LIST: '.txt',
+    FORMAT_CSV: '.csv',
+    FORMAT_JSON: '.json',
+}
+
+
+def export_format_for(filepath, default=FORMAT_JSON):
+    """Exportformat anhand der Dateiendung."""
+    extension = os.path.splitext(filepath)[1].lower()
+    if extension == '.htm':
+        return FORMAT_BOOKMARKS
+    for file_format, known in EXPORT_EXTENSIONS.items():
+        if extension == known:
+            return file_format
+    return default
+
+
+def _write_json(links, out, title):
+    # Wie eine Projektdatei (write_snapshot), aber ohne die ganze Liste im Speicher
+    out.write('[')
+    empty = True
+    for link in links:
+        out.write('\n    ' if empty else ',\n    ')
+        out.write(json.dumps(link, ensure_ascii=False))
+        empty = False
+    out.write(']\n' if empty else '\n]\n')
+
+
+def _write_url_list(links, out, title):
+    for link in links:
+        out.write(f"{link['url']}\n")
+
+
+def _write_csv(links, out, title):
+    writer = csv.writer(out, lineterminator='\n')
+    writer.writerow(['url', 'desc'])
+    for link in links:
+        writer.writerow([link['url'], link.get('desc', '')])
+
+
+def _write_bookmarks(links, out, title):
+    # Netscape-Format, das alle Browser importieren; das Projekt wird ein Ordner
+    out.write('<!DOCTYPE NETSCAPE-Bookmark-file-1>\n'
+              '<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">\n'
+              '<TITLE>Bookmarks</TITLE>\n<H1>Bookmarks</H1>\n<DL><p>\n')
+    out.write(f'    <DT><H3>{html.escape(title)}</H3>\n    <DL><p>\n')
+    for link in links:
+        out.write(f'        <DT><A HREF="{html.escape(link["url"])}">'
+                  f'{html.escape(str(link.get("desc", "")), quote=False)}</A>\n')
+    out.write('    </DL><p>\n</DL><p>\n')
+
+
+WRITERS = {
+    FORMAT_BOOKMARKS: _write_bookmarks,
+    FORMAT_URL_LIST: _write_url_list,
+    FORMAT_CSV: _write_csv,
+    FORMAT_JSON: _write_json,
+}
+
+
+def export_links(links, out, file_format=FORMAT_JSON, title=""):
+    """Schreibt `links` im Format `file_format` in die Textdatei `out`; `title` benennt den Lesezeichenordner."""
+    WRITERS[file_format](links, out, title)
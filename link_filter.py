@@ -0,0 +1,359 @@
+import bisect
+import itertools
+import re
+import time
+
+from link_model import LINK_ID_KEY
+from tag_index import TagIndex, label_keys, parse_label_query, query_matches
+
+# --- Live-Filter der Projektseite ---
+# Ein Suchbegriff passt, wenn ein Wort aus Beschreibung oder URL mit ihm beginnt;
+# alle Begriffe müssen passen. Die Wörter liegen sortiert vor, so dass ein
+# Präfix einem zusammenhängenden Bereich entspricht (bisect statt Durchsuchen).
+# Bedingungen an Tags und Sammlungen (#tag, -#tag, @Sammlung, siehe tag_index)
+# werden vorab über Bitmaps ausgewertet und schränken die Kandidaten ein.
+
+_WORD_RE = re.compile(r"\w+")
+# Umfasst ein Präfix mehr als 1/SCAN_RATIO so viele Wörter wie es Kandidaten gibt,
+# werden die Kandidaten direkt geprüft statt Trefferlisten zu vereinigen
+SCAN_RATIO = 8
+# Größe der Arbeitsschritte, zwischen denen compute() die Kontrolle abgibt
+STEP_SIZE = 4096
+
+
+def link_words(link):
+    """Die Wörter eines Links als ' wort1 wort2 ...' (für Präfixtests per Teilstring)."""
+    text = f"{link.get('desc', '')} {link.get('url', '')}".lower()
+    return ' ' + ' '.join(set(_WORD_RE.findall(text)))
+
+
+def filter_terms(text):
+    return tuple(_WORD_RE.findall(text.lower()))
+
+
+def _matches_all(words, terms):
+    return all(' ' + term in words for term in terms)
+
+
+def filter_predicate(text):
+    """Filtertext (Suchbegriffe und Tag-Bedingungen) als Test für einzelne Links, ohne Index."""
+    label_query, rest = parse_label_query(text)
+    terms = filter_terms(rest)
+    return lambda link: query_matches(label_query, label_keys(link)) and _matches_all(link_words(link), terms)
+
+
+def _chunks(iterable):
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, STEP_SIZE))
+        if not chunk:
+            return
+        yield chunk
+
+
+class LinkFilterIndex:
+    """Wortpräfix-Index über die Links eines Projekts (Link-IDs als Treffer).
+
+    Neue Links landen zunächst in einer Warteliste und werden mit
+    index_pending() blockweise oder spätestens bei der ersten Abfrage indiziert.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._words = []        # sortierte Liste aller vorkommenden Wörter
+        self._postings = {}     # Wort -> set(Link-IDs)
+        self._link_words = {}   # Link-ID -> Wörter beim Indizieren (siehe link_words)
+        self._pending = {}      # Link-ID -> Link, noch nicht indiziert
+
+    def __len__(self):
+        return len(self._link_words) + len(self._pending)
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def add(self, link):
+        self._pending[link[LINK_ID_KEY]] = link
+
+    def update(self, link):
+        link_id = link[LINK_ID_KEY]
+        if link_id not in self._pending:
+            self._unindex(link_id)
+        self._pending[link_id] = link
+
+    def remove(self, link_id):
+        if self._pending.pop(link_id, None) is None:
+            self._unindex(link_id)
+
+    def index_pending(self, deadline=None):
+        """Indiziert wartende Links (bis `deadline`, perf_counter); True, wenn nichts mehr wartet."""
+        if not self._pending:
+            return True
+        new_words = []
+        postings = self._postings
+        pending = self._pending
+        count = 0
+        while pending:
+            link_id, link = pending.popitem()
+            words = link_words(link)
+            self._link_words[link_id] = words
+            for word in words.split():
+                ids = postings.get(word)
+                if ids is None:
+                    postings[word] = {link_id}
+                    new_words.append(word)
+                else:
+                    ids.add(link_id)
+            count += 1
+            if deadline is not None and count % 256 == 0 and time.perf_counter() >= deadline:
+                break
+        if len(new_words) > 64:
+            self._words = sorted(postings)
+        else:
+            for word in new_words:
+                bisect.insort(self._words, word)
+        return not pending
+
+    def _unindex(self, link_id):
+        words = self._link_words.pop(link_id, '')
+        for word in words.split():
+            ids = self._postings[word]
+            ids.discard(link_id)
+            if not ids:
+                del self._postings[word]
+                i = bisect.bisect_left(self._words, word)
+                del self._words[i]
+
+    def refine(self, term, candidates=None):
+        """Generator: Link-IDs aus `candidates` (None = alle) mit einem Wort, das mit `term` beginnt.
+
+        Gibt zwischendurch die Kontrolle ab (yield), das Ergebnis ist der
+        Rückgabewert (`ids = yield from index.refine(...)`). Deckt der Präfix
+        nur wenige Wörter ab, werden deren Trefferlisten vereinigt; sonst (z.B.
+        ein einzelner Buchstabe) werden die Wörter der Kandidaten geprüft.
+        """
+        while not self.index_pending(time.perf_counter() + 0.005):
+            yield
+        words = self._words
+        postings = self._postings
+        i = bisect.bisect_left(words, term)
+        end = bisect.bisect_left(words, term + '\uffff', i)
+        link_words = self._link_words
+        if end - i > (len(link_words) if candidates is None else len(candidates)) // SCAN_RATIO:
+            needle = ' ' + term
+            result = set()
+            if candidates is None:
+                for chunk in _chunks(link_words.items()):
+                    result.update([link_id for link_id, text in chunk if needle in text])
+                    yield
+            else:
+                for chunk in _chunks(candidates):
+                    result.update([link_id for link_id in chunk if needle in link_words[link_id]])
+                    yield
+            return result
+        result = set()
+        for n, word in enumerate(words[i:end], 1):
+            if candidates is None:
+                result |= postings[word]
+            else:
+                result |= candidates.intersection(postings[word])
+            if n % 256 == 0:
+                yield
+        return result
+
+
+class LinkFilter:
+    """Aktueller Filter einer Link-Liste mit Verlauf der letzten Verfeinerungen.
+
+    Wird ein Begriff nur verlängert oder kommt einer hinzu, wird ausgehend vom
+    vorherigen Ergebnis geschnitten statt neu über alle Links zu suchen; beim
+    Löschen von Zeichen wird auf ein gemerktes Zwischenergebnis zurückgegriffen.
+    Einzelne Änderungen (link_added/link_changed/link_removed) werden in die
+    gemerkten Ergebnisse eingepflegt, ohne sie neu zu berechnen.
+    Die gemerkten Ergebnisse gelten für die aktuelle Tag-Abfrage (label_query).
+    """
+
+    def __init__(self, link_index):
+        self.link_index = link_index
+        self.index = LinkFilterIndex()
+        self.labels = TagIndex()
+        self.terms = ()
+        self.label_query = ()
+        self._steps = []   # [(Begriffe, Treffer-IDs, Links in Listenreihenfolge)]
+        self._result_bitmap = None
+
+    @property
+    def active(self):
+        return bool(self.terms or self.label_query)
+
+    def reset(self, links):
+        self.index.reset()
+        self.labels.reset()
+        self.terms = ()
+        self.label_query = ()
+        self._steps = []
+        self.links_appended(links)
+
+    def set_text(self, text):
+        label_query, rest = parse_label_query(text)
+        if label_query != self.label_query:
+            self.label_query = label_query
+            self._steps = []
+        self.terms = filter_terms(rest)
+        self._result_bitmap = None
+
+    def index_pending(self, deadline=None):
+        """Baut Wort- und Tag-Index weiter auf (bis `deadline`); True, wenn beide fertig sind."""
+        return self.index.index_pending(deadline) and self.labels.index_pending(deadline)
+
+    # --- Pflege ---
+    def links_appended(self, links):
+        """Viele neue Links (z.B. beim Laden): gemerkte Ergebnisse werden verworfen."""
+        for link in links:
+            self.index.add(link)
+            self.labels.add(link)
+        self._steps = []
+        self._result_bitmap = None
+
+    def link_added(self, link):
+        self.index.add(link)
+        self.labels.add(link)
+        if self.link_index.links[-1] is not link:
+            self.labels.ordered = False # Slots folgen nicht mehr der Listenreihenfolge
+        self._patch(link)
+
+    def link_changed(self, link):
+        self.index.update(link)
+        self.labels.update(link)
+        self._patch(link)
+
+    def link_removed(self, link):
+        # Vor LinkIndex.remove aufrufen, solange die Positionen noch stimmen
+        link_id = link[LINK_ID_KEY]
+        self.index.remove(link_id)
+        self.labels.remove(link_id)
+        self._result_bitmap = None
+        for terms, ids, links in self._steps:
+            if link_id in ids:
+                ids.discard(link_id)
+                del links[self._find(links, link)]
+
+    def _patch(self, link):
+        link_id = link[LINK_ID_KEY]
+        words = link_words(link)
+        labeled = query_matches(self.label_query, label_keys(link))
+        self._result_bitmap = None
+        for terms, ids, links in self._steps:
+            matched = labeled and _matches_all(words, terms)
+            if matched and link_id not in ids:
+                ids.add(link_id)
+                links.insert(self._insertion_point(links, link_id), link)
+            elif not matched and link_id in ids:
+                ids.discard(link_id)
+                del links[self._find(links, link)]
+
+    def _insertion_point(self, links, link_id):
+        position = self.link_index.position
+        target = position(link_id)
+        lo, hi = 0, len(links)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if position(links[mid][LINK_ID_KEY]) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _find(self, links, link):
+        i = self._insertion_point(links, link[LINK_ID_KEY])
+        if i < len(links) and links[i] is link:
+            return i
+        return next(i for i, other in enumerate(links) if other is link)
+
+    # --- Berechnung ---
+    def compute(self):
+        """Generator, der die gefilterte Liste in kleinen Schritten berechnet.
+
+        Der Rückgabewert ist die Link-Liste in Projektreihenfolge (bzw. alle
+        Links ohne Filter). Zwischen zwei Schritten dürfen die Links nicht
+        geändert werden; nach einer Änderung compute() neu starten.
+        """
+        terms = self.terms
+        if not self.active:
+            self._steps = []
+            return self.link_index.links
+        steps = self._steps
+        while steps and not self._refines(steps[-1][0], terms):
+            steps.pop()
+        if steps and steps[-1][0] == terms:
+            return steps[-1][2]
+        if steps:
+            base_terms, ids, base_links = steps[-1]
+        else:
+            base_terms, ids, base_links = (), None, None
+            if self.label_query:
+                while not self.labels.index_pending(time.perf_counter() + 0.005):
+                    yield
+                label_ids = self.labels.ids(self.labels.match(self.label_query))
+                if not terms and self.labels.ordered:
+                    # Slots in Listenreihenfolge: weder sortieren noch die Liste durchlaufen
+                    get = self.link_index.get
+                    links = []
+                    for chunk in _chunks(label_ids):
+                        links.extend([get(link_id) for link_id in chunk])
+                        yield
+                    steps.append((terms, set(label_ids), links))
+                    return links
+                ids = set(label_ids)
+        for i, term in enumerate(terms):
+            if i < len(base_terms) and term == base_terms[i]:
+                continue
+            ids = yield from self.index.refine(term, ids)
+        if base_links is None:
+            base_links = self.link_index.links
+            if len(ids) * SCAN_RATIO < len(base_links):
+                # Wenige Treffer: nach Position sortieren statt die ganze Liste zu durchlaufen
+                position = self.link_index.position
+                get = self.link_index.get
+                links = [get(link_id) for link_id in sorted(ids, key=position)]
+                steps.append((terms, ids, links))
+                return links
+        links = []
+        for chunk in _chunks(base_links):
+            links.extend([link for link in chunk if link[LINK_ID_KEY] in ids])
+            yield
+        steps.append((terms, ids, links))
+        return links
+
+    def facet_counts(self):
+        """{Schlüssel: Anzahl} der Tags und Sammlungen (siehe tag_index) in der aktuell gefilterten Liste.
+
+        Setzt voraus, dass compute() für den aktuellen Filter fertig ist.
+        """
+        labels = self.labels
+        if not self.active:
+            return labels.facets()
+        if self._result_bitmap is None:
+            if self.terms and self._steps and self._steps[-1][0] == self.terms:
+                self._result_bitmap = labels.bitmap_of(self._steps[-1][1])
+            else:
+                self._result_bitmap = labels.match(self.label_query)
+        return labels.facets(self._result_bitmap)
+
+    def visible_links(self):
+        """Die gefilterte Liste in einem Zug berechnet (compute() ohne Unterbrechung)."""
+        job = self.compute()
+        while True:
+            try:
+                next(job)
+            except StopIteration as done:
+                return done.value
+
+    @staticmethod
+    def _refines(base, terms):
+        # `terms` schränkt `base` weiter ein: gleiche Begriffe verlängert, evtl. weitere dazu
+        if len(base) > len(terms):
+            return False
+        return all(terms[i].startswith(term) for i, term in enumerate(base))
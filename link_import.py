@@ -0,0 +1,307 @@
+import csv
+import io
+import os
+import queue
+import threading
+from html.parser import HTMLParser
+
+from instrumentation import span
+from json_stream import iter_json_array
+from link_model import LINK_ID_KEY, new_link_id
+from project_journal import put_op
+from url_index import canonical_url, url_hash
+
+# --- Massenimport ---
+# Jede Quelle wird als Generator gelesen, der (Ordnerpfad, URL, Beschreibung)
+# liefert; daraus werden blockweise Journal-Operationen für den Projektspeicher.
+# Im Speicher liegen nur der aktuelle Leseblock, ein Schreibblock pro Projekt und
+# die URL-Hashes (8 Byte) der bereits vorhandenen Links.
+
+FORMAT_BOOKMARKS = 'bookmarks'   # Netscape-Lesezeichen-HTML (Export aller Browser)
+FORMAT_URL_LIST = 'urls'         # eine URL pro Zeile
+FORMAT_CSV = 'csv'
+FORMAT_JSON = 'json'             # Linkmem-Projektdatei
+
+READ_CHUNK_SIZE = 64 * 1024
+IMPORT_BATCH_SIZE = 2000
+PROGRESS_EVERY = 5000
+FOLDER_SEPARATOR = " - "
+
+_CSV_URL_COLUMNS = ('url', 'link', 'href', 'address')
+_CSV_DESC_COLUMNS = ('desc', 'description', 'title', 'name')
+_CSV_FOLDER_COLUMNS = ('project', 'folder', 'category')
+
+
+class _CountingReader(io.RawIOBase):
+    """Zählt die gelesenen Bytes einer Binärdatei für die Fortschrittsanzeige."""
+
+    def __init__(self, raw, on_progress=None):
+        self.raw = raw
+        self.bytes_read = 0
+        self.on_progress = on_progress
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.raw.read(len(buffer))
+        buffer[:len(data)] = data
+        self.bytes_read += len(data)
+        if self.on_progress is not None:
+            self.on_progress(self.bytes_read)
+        return len(data)
+
+
+def _text_stream(binary, on_progress):
+    reader = io.BufferedReader(_CountingReader(binary, on_progress), READ_CHUNK_SIZE)
+    return io.TextIOWrapper(reader, encoding='utf-8-sig', errors='replace', newline='')
+
+
+def detect_format(filepath):
+    """Bestimmt das Format anhand der Endung, sonst anhand des Dateianfangs."""
+    extension = os.path.splitext(filepath)[1].lower()
+    if extension in ('.html', '.htm'):
+        return FORMAT_BOOKMARKS
+    if extension == '.csv':
+        return FORMAT_CSV
+    if extension == '.json':
+        return FORMAT_JSON
+    with open(filepath, 'rb') as f:
+        head = f.read(1024).lstrip(b'\xef\xbb\xbf \t\r\n').lower()
+    if head.startswith((b'<!doctype netscape', b'<html', b'<dl', b'<meta')):
+        return FORMAT_BOOKMARKS
+    if head.startswith(b'['):
+        return FORMAT_JSON
+    return FORMAT_URL_LIST
+
+
+class _BookmarkParser(HTMLParser):
+    """Sammelt Lesezeichen aus Netscape-HTML; Ordner (<H3>) gelten bis zum zugehörigen </DL>."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.folders = []        # Ordnernamen der offenen <DL>-Ebenen (None = ohne Ordner)
+        self.pending_folder = None
+        self.found = []          # (Ordnerpfad, URL, Titel), wird vom Generator geleert
+        self._text = None
+        self._href = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'h3':
+            self._text = []
+        elif tag == 'a':
+            self._href = dict(attrs).get('href') or ''
+            self._text = []
+        elif tag == 'dl':
+            self.folders.append(self.pending_folder)
+            self.pending_folder = None
+
+    def handle_endtag(self, tag):
+        if tag == 'h3' and self._text is not None:
+            self.pending_folder = ''.join(self._text).strip()
+            self._text = None
+        elif tag == 'a' and self._href is not None:
+            title = ''.join(self._text or ()).strip()
+            path = tuple(folder for folder in self.folders if folder)
+            self.found.append((path, self._href, title))
+            self._href = None
+            self._text = None
+        elif tag == 'dl' and self.folders:
+            self.folders.pop()
+
+    def handle_data(self, data):
+        if self._text is not None:
+            self._text.append(data)
+
+
+def iter_bookmarks(binary, on_progress=None):
+    parser = _BookmarkParser()
+    text = _text_stream(binary, on_progress)
+    while True:
+        chunk = text.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        parser.feed(chunk)
+        yield from parser.found
+        parser.found = []
+    parser.close()
+    yield from parser.found
+
+
+def iter_url_list(binary, on_progress=None):
+    for line in _text_stream(binary, on_progress):
+        url = line.strip()
+        if url and not url.startswith('#'):
+            yield (), url, ''
+
+
+def _find_column(header, names):
+    for name in names:
+        if name in header:
+            return header.index(name)
+    return None
+
+
+def iter_csv(binary, on_progress=None):
+    """CSV mit Kopfzeile (Spalten url/title/folder o.ä.) oder ohne (URL, Beschreibung[, Projekt])."""
+    reader = csv.reader(_text_stream(binary, on_progress))
+    url_col, desc_col, folder_col = 0, 1, 2
+    for number, row in enumerate(reader):
+        if not row:
+            continue
+        if number == 0:
+            header = [cell.strip().lower() for cell in row]
+            found = _find_column(header, _CSV_URL_COLUMNS)
+            if found is not None:
+                url_col = found
+                desc_col = _find_column(header, _CSV_DESC_COLUMNS)
+                folder_col = _find_column(header, _CSV_FOLDER_COLUMNS)
+                continue
+        url = row[url_col].strip() if url_col < len(row) else ''
+        desc = row[desc_col].strip() if desc_col is not None and desc_col < len(row) else ''
+        folder = row[folder_col].strip() if folder_col is not None and folder_col < len(row) else ''
+        if url:
+            yield ((folder,) if folder else ()), url, desc
+
+
+def iter_linkmem_json(binary, on_progress=None):
+    for item in iter_json_array(binary, on_progress=on_progress):
+        if isinstance(item, dict) and item.get('url'):
+            yield (), str(item['url']), str(item.get('desc', ''))
+
+
+PARSERS = {
+    FORMAT_BOOKMARKS: iter_bookmarks,
+    FORMAT_URL_LIST: iter_url_list,
+    FORMAT_CSV: iter_csv,
+    FORMAT_JSON: iter_linkmem_json,
+}
+
+
+def folder_project_name(folder_path):
+    """Projektname für einen Lesezeichenordner ("Ordner - Unterordner"), als Dateiname bereinigt."""
+    from linkmem_core import sanitize_filename  # linkmem_core importiert dieses Modul
+    return sanitize_filename(FOLDER_SEPARATOR.join(folder_path))
+
+
+class _Target:
+    """Zielprojekt eines Imports: vorhandene URL-Hashes und der aktuelle Schreibblock."""
+
+    __slots__ = ('name', 'seen', 'batch', 'imported', 'needs_compaction')
+
+    def __init__(self, name):
+        self.name = name
+        self.seen = set()
+        self.batch = []
+        self.imported = 0
+        self.needs_compaction = False
+
+
+class LinkImporter:
+    """Importiert eine Datei im Hintergrund in ein oder mehrere Projekte.
+
+    Wie ProjectLoader: run() läuft im Worker (z.B. über den IOScheduler), der
+    UI-Thread holt Nachrichten mit poll() ab: ('progress', bytes, total, links),
+    ('done', {Projekt: importiert}, duplikate, ungültig) und ('error', exception).
+    Blöcke werden als Journal-Operationen über storage.save geschrieben und
+    JSON-Projekte ohne Journal-Modus am Ende einmal verdichtet.
+    `project_name_for(folder_path)` bildet Ordner auf Projektnamen ab.
+    """
+
+    def __init__(self, storage, filepath, default_project, file_format=None,
+                 project_name_for=None, batch_size=IMPORT_BATCH_SIZE):
+        self.storage = storage
+        self.filepath = filepath
+        self.default_project = default_project
+        self.file_format = file_format
+        self.project_name_for = project_name_for or folder_project_name
+        self.batch_size = batch_size
+        self.projects = set()  # Projekte, in die gerade importiert wird
+        self._messages = queue.Queue()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def poll(self, max_messages=None):
+        messages = []
+        while max_messages is None or len(messages) < max_messages:
+            try:
+                messages.append(self._messages.get_nowait())
+            except queue.Empty:
+                break
+        return messages
+
+    def run(self):
+        try:
+            with span('parse', file=os.path.basename(self.filepath)) as measure:
+                result = self._import()
+                measure.add(items=sum(result[0].values()), bytes=os.path.getsize(self.filepath),
+                            duplicates=result[1], invalid=result[2])
+            self._messages.put(('done',) + result)
+        except Exception as e:
+            self._messages.put(('error', e))
+
+    def _target(self, targets, folder_path):
+        name = self.project_name_for(folder_path) if folder_path else self.default_project
+        target = targets.get(name)
+        if target is None:
+            target = targets[name] = _Target(name)
+            self.projects.add(name)
+            if self.storage.exists(name):
+                # Vorhandene Links einmal durchlaufen, nur ihre URL-Hashes bleiben im Speicher
+                for item in self.storage.iter_links(name):
+                    if isinstance(item, dict) and 'url' in item:
+                        target.seen.add(url_hash(canonical_url(str(item['url']))))
+            else:
+                self.storage.save(name, links=[])
+        return target
+
+    def _flush(self, target):
+        if target.batch:
+            if self.storage.save(target.name, None, [put_op(link) for link in target.batch]):
+                target.needs_compaction = True
+            target.imported += len(target.batch)
+            target.batch = []
+
+    def _import(self):
+        file_format = self.file_format or detect_format(self.filepath)
+        total = os.path.getsize(self.filepath)
+        targets = {}
+        duplicates = invalid = count = 0
+        bytes_read = 0
+
+        def on_progress(done):
+            nonlocal bytes_read
+            bytes_read = done
+
+        with open(self.filepath, 'rb') as f:
+            for number, (folder_path, url, desc) in enumerate(PARSERS[file_format](f, on_progress), 1):
+                if self._cancel.is_set():
+                    break
+                url = url.strip()
+                if not url or url.lower().startswith(('javascript:', 'place:', 'data:')):
+                    invalid += 1
+                    continue
+                target = self._target(targets, folder_path)
+                digest = url_hash(canonical_url(url))
+                if digest in target.seen:
+                    duplicates += 1
+                    continue
+                target.seen.add(digest)
+                target.batch.append({'url': url, 'desc': desc or url, LINK_ID_KEY: new_link_id()})
+                count += 1
+                if len(target.batch) >= self.batch_size:
+                    self._flush(target)
+                if number % PROGRESS_EVERY == 0:
+                    self._messages.put(('progress', bytes_read, total, count))
+        # Auch bei Abbruch: was gelesen wurde, wird noch geschrieben
+        for target in targets.values():
+            self._flush(target)
+            if target.needs_compaction or not self.storage.incremental:
+                self.storage.compact(target.name)
+        return {target.name: target.imported for target in targets.values()}, duplicates, invalid
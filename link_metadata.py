@@ -0,0 +1,450 @@
+import codecs
+import collections
+import hashlib
+import json
+import os
+import queue
+import re
+import struct
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+
+# --- Seitentitel und Favicons ---
+# Von einer Seite wird nur der <head> gelesen (höchstens MAX_HEAD_BYTES), daraus
+# Titel und Favicon-Verweis. Ergebnisse liegen in einem inhaltsadressierten
+# Plattencache (MetadataCache) mit LRU-Verdrängung, der von allen Projekten
+# geteilt wird: eine URL oder ein Favicon wird nur einmal aus dem Netz geholt.
+
+METADATA_CACHE_NAME = ".linkmem_metadata"
+MAX_CACHE_BYTES = 32 * 1024 * 1024
+MAX_HEAD_BYTES = 128 * 1024
+MAX_ICON_BYTES = 256 * 1024
+READ_CHUNK_SIZE = 8 * 1024
+FETCH_TIMEOUT = 8.0
+FETCH_WORKERS = 8
+FAILED_RETRY_AFTER = 24 * 3600  # fehlgeschlagene Abrufe frühestens nach einem Tag wiederholen
+BATCH_INTERVAL = 0.5            # s zwischen zwei 'batch'-Nachrichten an die Oberfläche
+USER_AGENT = "Mozilla/5.0 (compatible; Linkmem-Metadaten/1.0)"
+
+_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([A-Za-z0-9_\-]+)""", re.I)
+_SNIFF_BYTES = 2048
+_ICON_RELS = ('icon', 'shortcut icon', 'apple-touch-icon', 'apple-touch-icon-precomposed')
+
+# title: Seitentitel oder None, icon: Inhalts-Hash des Favicons im Cache oder None
+PageMetadata = collections.namedtuple('PageMetadata', ['title', 'icon'])
+
+
+def needs_metadata(link):
+    """Link ohne eigene Beschreibung (nur die URL) oder ohne Favicon."""
+    return link.get('desc') in ('', link.get('url')) or not link.get('icon')
+
+
+def metadata_changes(link, metadata):
+    """Änderungen an einem Link: Titel nur statt fehlender Beschreibung, Favicon-Hash unter 'icon'."""
+    changes = {}
+    if metadata.title and link.get('desc') in ('', link.get('url')):
+        changes['desc'] = metadata.title
+    if metadata.icon and link.get('icon') != metadata.icon:
+        changes['icon'] = metadata.icon
+    return changes
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class MetadataCache:
+    """Inhaltsadressierter Plattencache mit Größengrenze und LRU-Verdrängung.
+
+    objects/ab/<sha256>  Favicon-Daten, adressiert über ihren Inhalt
+    keys/ab/<sha256>     Eintrag zu einem Schlüssel (URL): kleines JSON mit
+                         Titel, Favicon-Hash und Abrufzeit
+    Jeder Zugriff setzt die Änderungszeit der Datei (LRU-Reihenfolge).
+    Überschreitet die Gesamtgröße `max_bytes`, werden die am längsten nicht
+    benutzten Dateien gelöscht, bis wieder 10 % Luft sind.
+    """
+
+    def __init__(self, directory, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None  # wird beim ersten Schreiben per Verzeichnisscan bestimmt
+
+    def _path(self, kind, digest):
+        return os.path.join(self.directory, kind, digest[:2], digest)
+
+    @staticmethod
+    def _touch(path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _read(self, path):
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        self._touch(path)
+        return data
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        with self._lock:
+            try:
+                old_size = os.path.getsize(path)
+            except OSError:
+                old_size = 0
+            os.replace(tmp_path, path)
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data) - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _files(self):
+        for kind in ('objects', 'keys'):
+            root = os.path.join(self.directory, kind)
+            if not os.path.isdir(root):
+                continue
+            for prefix in os.scandir(root):
+                if prefix.is_dir():
+                    for entry in os.scandir(prefix.path):
+                        if not entry.name.endswith('.tmp'):
+                            yield entry
+
+    def _scan_size(self):
+        return sum(entry.stat().st_size for entry in self._files())
+
+    def _evict(self):
+        files = sorted((entry.stat().st_mtime_ns, entry.stat().st_size, entry.path) for entry in self._files())
+        size = sum(file_size for _, file_size, _ in files)
+        target = self.max_bytes * 0.9
+        for _, file_size, path in files:
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= file_size
+        self._size = size
+
+    # --- Einträge ---
+    def get(self, key):
+        """Eintrag (dict) zu einem Schlüssel oder None."""
+        data = self._read(self._path('keys', content_hash(key.encode('utf-8'))))
+        if data is None:
+            return None
+        try:
+            return json.loads(data.decode('utf-8'))
+        except ValueError:
+            return None
+
+    def put(self, key, entry):
+        self._write(self._path('keys', content_hash(key.encode('utf-8'))),
+                    json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+
+    # --- Inhalte ---
+    def get_object(self, digest):
+        return self._read(self._path('objects', digest))
+
+    def put_object(self, data):
+        """Legt Daten ab und gibt ihren Hash zurück; gleiche Inhalte werden nur einmal gespeichert."""
+        digest = content_hash(data)
+        path = self._path('objects', digest)
+        if os.path.exists(path):
+            self._touch(path)
+        else:
+            self._write(path, data)
+        return digest
+
+
+class _HeadParser(HTMLParser):
+    """Liest Titel und Favicon-Verweise bis zum Ende des <head>."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = None
+        self.og_title = None
+        self.icons = []  # (rel, href)
+        self.done = False
+        self._title_parts = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'title' and self.title is None:
+            self._title_parts = []
+        elif tag == 'link':
+            attrs = dict(attrs)
+            rel = (attrs.get('rel') or '').lower().strip()
+            if rel in _ICON_RELS and attrs.get('href'):
+                self.icons.append((rel, attrs['href']))
+        elif tag == 'meta':
+            attrs = dict(attrs)
+            if (attrs.get('property') or '').lower() == 'og:title' and attrs.get('content'):
+                self.og_title = attrs['content']
+        elif tag == 'body':
+            self.done = True
+
+    def handle_endtag(self, tag):
+        if tag == 'title' and self._title_parts is not None:
+            self.title = ' '.join(''.join(self._title_parts).split())
+            self._title_parts = None
+        elif tag == 'head':
+            self.done = True
+
+    def handle_data(self, data):
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+
+    def icon_href(self):
+        # Normale Favicons bevorzugen, Apple-Touch-Icons sind groß
+        for wanted in ('icon', 'shortcut icon'):
+            for rel, href in self.icons:
+                if rel == wanted:
+                    return href
+        return self.icons[0][1] if self.icons else None
+
+
+def _open(url, timeout, accept):
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT, 'Accept': accept})
+    return urllib.request.urlopen(request, timeout=timeout)
+
+
+def read_head(url, timeout=FETCH_TIMEOUT):
+    """Liest nur den Kopf einer HTML-Seite; gibt (Titel, Favicon-URL, endgültige URL) zurück."""
+    with _open(url, timeout, 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.1') as response:
+        final_url = response.geturl()
+        content_type = response.headers.get('Content-Type', '')
+        if 'html' not in content_type.lower():
+            return None, None, final_url
+        charset = response.headers.get_content_charset()
+        parser = _HeadParser()
+        decoder = _decoder(charset) if charset else None
+        buffered = b''
+        total = 0
+        while not parser.done and total < MAX_HEAD_BYTES:
+            chunk = response.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            total += len(chunk)
+            if decoder is None:
+                # Ohne Angabe im Header: <meta charset> am Dateianfang abwarten
+                buffered += chunk
+                if len(buffered) < _SNIFF_BYTES and _CHARSET_RE.search(buffered) is None:
+                    continue
+                decoder = _decoder(_sniff_charset(buffered))
+                chunk, buffered = buffered, b''
+            parser.feed(decoder.decode(chunk))
+        if buffered:
+            parser.feed(_decoder(_sniff_charset(buffered)).decode(buffered))
+    title = parser.title or parser.og_title
+    href = parser.icon_href()
+    return title or None, urljoin(final_url, href) if href else None, final_url
+
+
+def _sniff_charset(data):
+    match = _CHARSET_RE.search(data[:_SNIFF_BYTES])
+    return match.group(1).decode('ascii') if match else 'utf-8'
+
+
+def _decoder(charset):
+    try:
+        return codecs.getincrementaldecoder(charset)(errors='replace')
+    except LookupError:
+        return codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+
+def read_icon(icon_url, timeout=FETCH_TIMEOUT):
+    """Lädt ein Favicon (höchstens MAX_ICON_BYTES); None, wenn es kein Bild ist."""
+    with _open(icon_url, timeout, 'image/*') as response:
+        data = response.read(MAX_ICON_BYTES + 1)
+    if len(data) > MAX_ICON_BYTES or image_format(data) is None:
+        return None
+    return data
+
+
+def image_format(data):
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if data.startswith((b'GIF87a', b'GIF89a')):
+        return 'gif'
+    if data.startswith(b'\x00\x00\x01\x00'):
+        return 'ico'
+    if data.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    return None
+
+
+def tk_icon_data(data):
+    """Für Tk darstellbare Bilddaten (PNG/GIF) eines Favicons oder None.
+
+    Aus ICO-Dateien wird das kleinste eingebettete PNG genommen (üblich seit
+    Windows Vista); klassische BMP-Icons kann Tk ohne Zusatzpakete nicht zeigen.
+    """
+    kind = image_format(data)
+    if kind in ('png', 'gif'):
+        return data
+    if kind != 'ico' or len(data) < 6:
+        return None
+    count = struct.unpack_from('<H', data, 4)[0]
+    best = None
+    for i in range(count):
+        offset = 6 + 16 * i
+        if offset + 16 > len(data):
+            break
+        width, = struct.unpack_from('<B', data, offset)
+        size, start = struct.unpack_from('<II', data, offset + 8)
+        image = data[start:start + size]
+        if image_format(image) == 'png' and (best is None or (width or 256) < best[0]):
+            best = (width or 256, image)
+    return best[1] if best else None
+
+
+class MetadataFetcher:
+    """Holt Titel und Favicon einer URL über den Cache (thread-sicher, für den Worker-Pool)."""
+
+    def __init__(self, cache, timeout=FETCH_TIMEOUT, fetch_icons=True):
+        self.cache = cache
+        self.timeout = timeout
+        self.fetch_icons = fetch_icons
+        self._lock = threading.Lock()
+        self._inflight = {}  # Icon-URL -> Event, solange ein Worker sie lädt
+
+    def lookup(self, url):
+        """Gibt (PageMetadata oder None, aus_cache) zurück; None, wenn nichts zu holen war."""
+        entry = self.cache.get(url)
+        if entry is not None and (not entry.get('failed') or time.time() - entry['fetched'] < FAILED_RETRY_AFTER):
+            if entry.get('failed'):
+                return None, True
+            return PageMetadata(entry.get('title'), entry.get('icon')), True
+        if urlsplit(url).scheme.lower() not in ('http', 'https'):
+            return None, False
+        try:
+            title, icon_url, final_url = read_head(url, self.timeout)
+        except Exception as e:
+            # Netzwerk-/Protokollfehler: merken, damit nicht jeder Lauf erneut wartet
+            self.cache.put(url, {'failed': str(e)[:200], 'fetched': time.time()})
+            return None, False
+        icon = None
+        if self.fetch_icons:
+            origin = urlsplit(final_url)
+            icon = self._icon(icon_url or f"{origin.scheme}://{origin.netloc}/favicon.ico")
+        self.cache.put(url, {'title': title, 'icon': icon, 'fetched': time.time()})
+        return PageMetadata(title, icon), False
+
+    def _icon(self, icon_url):
+        # Favicons werden pro Icon-URL gemerkt, ein Host lädt seins also nur einmal
+        key = 'icon:' + icon_url
+        while True:
+            entry = self.cache.get(key)
+            if entry is not None and (entry.get('icon') or time.time() - entry['fetched'] < FAILED_RETRY_AFTER):
+                return entry.get('icon')
+            # Seiten desselben Hosts teilen sich ein Favicon: nur ein Worker lädt es, die anderen warten
+            with self._lock:
+                loading = self._inflight.get(icon_url)
+                if loading is None:
+                    loading = self._inflight[icon_url] = threading.Event()
+                    break
+            if not loading.wait(self.timeout * 2):
+                return None
+        try:
+            try:
+                data = read_icon(icon_url, self.timeout)
+            except Exception:
+                data = None
+            icon = self.cache.put_object(data) if data else None
+            self.cache.put(key, {'icon': icon, 'fetched': time.time()})
+        finally:
+            with self._lock:
+                del self._inflight[icon_url]
+            loading.set()
+        return icon
+
+
+class MetadataEnricher:
+    """Holt Metadaten für viele Links in einem Thread-Pool.
+
+    Wie LinkImporter: run() läuft im Worker, der UI-Thread holt Nachrichten
+    mit poll() ab: ('batch', [(Link-ID, URL, PageMetadata)]) gesammelt alle
+    BATCH_INTERVAL Sekunden, ('progress', erledigt, gesamt),
+    ('done', gefunden, aus_cache, fehlgeschlagen) und ('error', exception).
+    `links` ist eine Liste von (Link-ID, URL).
+    """
+
+    def __init__(self, links, cache, workers=FETCH_WORKERS, timeout=FETCH_TIMEOUT, fetch_icons=True):
+        self.links = links
+        self.fetcher = MetadataFetcher(cache, timeout, fetch_icons)
+        self.workers = workers
+        self._messages = queue.Queue()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def poll(self, max_messages=None):
+        messages = []
+        while max_messages is None or len(messages) < max_messages:
+            try:
+                messages.append(self._messages.get_nowait())
+            except queue.Empty:
+                break
+        return messages
+
+    def run(self):
+        try:
+            self._messages.put(('done',) + self._enrich())
+        except Exception as e:
+            self._messages.put(('error', e))
+
+    def _lookup(self, url):
+        if self._cancel.is_set():
+            return None  # abgebrochen: noch wartende Aufträge enden sofort
+        return self.fetcher.lookup(url)
+
+    def _enrich(self):
+        by_url = collections.OrderedDict()
+        for link_id, url in self.links:
+            by_url.setdefault(url, []).append(link_id)
+        total = len(by_url)
+        found = from_cache = failed = done = 0
+        batch = []
+        last_sent = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="linkmem-meta") as pool:
+            futures = {pool.submit(self._lookup, url): url for url in by_url}
+            for future in as_completed(futures):
+                url = futures[future]
+                result = future.result()
+                done += 1
+                if result is None:
+                    continue
+                metadata, cached = result
+                from_cache += cached
+                if metadata is None or (metadata.title is None and metadata.icon is None):
+                    failed += not cached
+                else:
+                    found += 1
+                    batch.extend((link_id, url, metadata) for link_id in by_url[url])
+                now = time.monotonic()
+                if now - last_sent >= BATCH_INTERVAL or done == total:
+                    if batch:
+                        self._messages.put(('batch', batch))
+                        batch = []
+                    self._messages.put(('progress', done, total))
+                    last_sent = now
+        if batch:
+            self._messages.put(('batch', batch))
+        return found, from_cache, failed
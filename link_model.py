@@ -0,0 +1,339 @@
+import os
+import re
+import sys
+from functools import lru_cache
+
+# --- Link-Datensätze ---
+
+LINK_ID_KEY = 'id'
+# Optionale Ordnung innerhalb eines Projekts: Tags als Liste ('tags': ["python", "doku"])
+# und eine verschachtelte Sammlung als Pfad ('collection': "Arbeit/Recherche").
+# Beides steht nur bei Links, die es haben, und wird wie jeder Zusatzschlüssel gespeichert.
+TAGS_KEY = 'tags'
+COLLECTION_KEY = 'collection'
+COLLECTION_SEPARATOR = '/'
+
+_DESC_IS_URL = object() # Beschreibung == URL (häufigster Fall), wird nicht doppelt gespeichert
+
+
+def new_link_id():
+    """Erzeugt eine neue, projektweit eindeutige Link-ID."""
+    return os.urandom(8).hex()
+
+
+def _split_url(url):
+    # "https://example.com/a?b" -> ("https://", "example.com", "/a?b"); Schema und
+    # Host wiederholen sich in einem Projekt ständig und werden internalisiert.
+    start = url.find('://') + 3 if isinstance(url, str) else 2
+    if start < 3 or start > 20:
+        return '', '', url
+    end = len(url)
+    for sep in '/?#':
+        i = url.find(sep, start, end)
+        if i >= 0:
+            end = i
+    return sys.intern(url[:start]), sys.intern(url[start:end]), url[end:]
+
+
+class LinkRecord:
+    """Speichersparender Link-Datensatz mit der Schnittstelle eines dict.
+
+    Statt eines dict pro Link (mehrere hundert Byte bei großen Projekten) hält
+    der Datensatz feste Slots: URL als internalisiertes Schema und Host plus
+    Rest, die Beschreibung nur, wenn sie von der URL abweicht, und die ID.
+    Weitere Schlüssel (z.B. 'icon') landen in einem kleinen Zusatz-dict.
+    dict(record) liefert wieder die gewohnte Form für JSON und Journal.
+    """
+
+    __slots__ = ('_scheme', '_host', '_rest', '_desc', 'id', 'extra')
+
+    def __init__(self, url, desc=_DESC_IS_URL, link_id=None, extra=None):
+        self._scheme, self._host, self._rest = _split_url(url)
+        self._desc = desc if desc is _DESC_IS_URL or desc != url else _DESC_IS_URL
+        self.id = link_id
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, item):
+        """Datensatz aus einem geladenen dict (benötigt 'url')."""
+        extra = None
+        # Nur dann ein dict bauen, wenn es außer url, desc und id noch etwas gibt
+        if len(item) > 1 + ('desc' in item) + (LINK_ID_KEY in item):
+            extra = {k: v for k, v in item.items() if k not in ('url', 'desc', LINK_ID_KEY)}
+        return cls(item['url'], item.get('desc', _DESC_IS_URL), item.get(LINK_ID_KEY), extra)
+
+    @property
+    def url(self):
+        if not self._scheme:
+            return self._rest
+        return self._scheme + self._host + self._rest
+
+    @property
+    def host(self):
+        return self._host
+
+    @property
+    def desc(self):
+        return self.url if self._desc is _DESC_IS_URL else self._desc
+
+    def __getitem__(self, key):
+        if key == 'url':
+            return self.url
+        if key == 'desc':
+            return self.desc
+        if key == LINK_ID_KEY:
+            if self.id is None:
+                raise KeyError(key)
+            return self.id
+        if self.extra is None:
+            raise KeyError(key)
+        return self.extra[key]
+
+    def get(self, key, default=None):
+        if self.extra is None and key not in ('url', 'desc', LINK_ID_KEY):
+            return default # häufigster Fall (z.B. Tags bei Links ohne Tags), ohne KeyError
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        if key == 'url':
+            desc = self.desc
+            self._scheme, self._host, self._rest = _split_url(value)
+            self._desc = _DESC_IS_URL if desc == value else desc
+        elif key == 'desc':
+            self._desc = _DESC_IS_URL if value == self.url else value
+        elif key == LINK_ID_KEY:
+            self.id = value
+        elif self.extra is None:
+            self.extra = {key: value}
+        else:
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key in ('url', 'desc'):
+            raise KeyError(key)
+        if key == LINK_ID_KEY and self.id is not None:
+            self.id = None
+        elif self.extra is not None and key in self.extra:
+            del self.extra[key]
+            if not self.extra:
+                self.extra = None
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        if key in ('url', 'desc'):
+            return True
+        if key == LINK_ID_KEY:
+            return self.id is not None
+        return self.extra is not None and key in self.extra
+
+    def keys(self):
+        keys = ['url', 'desc']
+        if self.id is not None:
+            keys.append(LINK_ID_KEY)
+        if self.extra:
+            keys.extend(self.extra)
+        return keys
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return 2 + (self.id is not None) + (len(self.extra) if self.extra else 0)
+
+    def update(self, changes=(), **kwargs):
+        for key, value in dict(changes, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"LinkRecord({self.to_dict()!r})"
+
+
+@lru_cache(maxsize=4096)
+def normalize_tag(tag):
+    """Einheitliche Schreibweise eines Tags: klein, ohne führendes '#', Leerraum als '-'."""
+    return re.sub(r"\s+", "-", tag.strip().lstrip('#').strip().lower())
+
+
+def parse_tags(text):
+    """Tags aus einer Eingabe wie "Python, Doku" (doppelte und leere entfallen)."""
+    tags = []
+    for tag in text.split(','):
+        tag = normalize_tag(tag)
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def parse_collection(text):
+    """Sammlungspfad aus einer Eingabe wie " Arbeit / Recherche " ('' = keine Sammlung)."""
+    parts = (part.strip() for part in text.split(COLLECTION_SEPARATOR))
+    return COLLECTION_SEPARATOR.join(part for part in parts if part)
+
+
+def normalize_tags(tags):
+    """Gespeicherte Tags als Tupel normalisierter Tags (auch für von Hand bearbeitete Dateien, z.B. als Text)."""
+    if not tags:
+        return ()
+    if isinstance(tags, str):
+        return tuple(parse_tags(tags))
+    if not isinstance(tags, list):
+        return ()
+    result = []
+    for tag in tags:
+        if isinstance(tag, str):
+            tag = normalize_tag(tag)
+            if tag and tag not in result:
+                result.append(tag)
+    return tuple(result)
+
+
+def link_tags(link):
+    return normalize_tags(link.get(TAGS_KEY))
+
+
+def link_collection(link):
+    collection = link.get(COLLECTION_KEY)
+    return parse_collection(collection) if isinstance(collection, str) else ''
+
+
+def set_link_labels(link, tags, collection):
+    """Setzt Tags und Sammlung eines Links; leere Werte entfernen den Schlüssel."""
+    for key, value in ((TAGS_KEY, list(tags)), (COLLECTION_KEY, collection)):
+        if value:
+            link[key] = value
+        elif key in link:
+            del link[key]
+
+
+def compact_link(link):
+    """Wandelt einen Link (dict) in einen LinkRecord um; Datensätze bleiben unverändert."""
+    return link if isinstance(link, LinkRecord) else LinkRecord.from_dict(link)
+
+
+class LinkIndex:
+    """Hält die Link-Liste eines Projekts zusammen mit einer id -> Datensatz/Position-Zuordnung.
+
+    Jeder Datensatz bekommt eine persistente ID unter dem Schlüssel 'id', die mit
+    dem Projekt gespeichert wird. Nachschlagen per ID kostet O(1). Positionen
+    werden in einem Dict gepflegt; nach Einfügen/Löschen in der Mitte wird es erst
+    bei der nächsten Abfrage ab der Änderungsstelle nachgeführt.
+    """
+
+    def __init__(self, links=None):
+        self.reset(links if links is not None else [])
+
+    def reset(self, links):
+        """Übernimmt eine neue Link-Liste und vergibt fehlende oder doppelte IDs.
+
+        Gibt die Anzahl neu vergebener IDs zurück.
+        """
+        self.links = links
+        self._by_id = {}
+        self._pos = {}
+        assigned = 0
+        by_id = self._by_id
+        for link in links:
+            link_id = link.get(LINK_ID_KEY)
+            if not isinstance(link_id, str) or not link_id or link_id in by_id:
+                link_id = self._unused_id()
+                link[LINK_ID_KEY] = link_id
+                assigned += 1
+            by_id[link_id] = link
+        self._valid_upto = 0 # Positionen erst bei der ersten Abfrage aufbauen
+        return assigned
+
+    def __len__(self):
+        return len(self.links)
+
+    def __contains__(self, link_id):
+        return link_id in self._by_id
+
+    def _unused_id(self):
+        link_id = new_link_id()
+        while link_id in self._by_id:
+            link_id = new_link_id()
+        return link_id
+
+    def get(self, link_id):
+        """Datensatz zu einer ID oder None."""
+        return self._by_id.get(link_id)
+
+    def position(self, link_id):
+        """Aktuelle Position eines Links in der Liste oder -1."""
+        if link_id not in self._by_id:
+            return -1
+        pos = self._pos.get(link_id)
+        if pos is not None and pos < self._valid_upto:
+            return pos
+        self._reindex()
+        return self._pos[link_id]
+
+    def _reindex(self):
+        links = self.links
+        for i in range(self._valid_upto, len(links)):
+            self._pos[links[i][LINK_ID_KEY]] = i
+        self._valid_upto = len(links)
+
+    def append(self, link):
+        """Hängt einen Link an und gibt seine ID zurück."""
+        return self.insert(len(self.links), link)
+
+    def insert(self, index, link):
+        link_id = link.get(LINK_ID_KEY)
+        if not isinstance(link_id, str) or not link_id or link_id in self._by_id:
+            link_id = self._unused_id()
+            link[LINK_ID_KEY] = link_id
+        index = max(0, min(index, len(self.links)))
+        self.links.insert(index, link)
+        self._by_id[link_id] = link
+        if index == len(self.links) - 1 and self._valid_upto == index:
+            self._pos[link_id] = index
+            self._valid_upto += 1
+        else:
+            self._valid_upto = min(self._valid_upto, index)
+        return link_id
+
+    def extend(self, links):
+        """Hängt mehrere Links an (z.B. einen Block beim Laden).
+
+        Gibt die Anzahl neu vergebener IDs zurück.
+        """
+        assigned = 0
+        for link in links:
+            link_id = link.get(LINK_ID_KEY)
+            if self.insert(len(self.links), link) != link_id:
+                assigned += 1
+        return assigned
+
+    def update(self, link_id, changes):
+        """Ändert einen Datensatz an Ort und Stelle (die ID bleibt erhalten)."""
+        link = self._by_id[link_id]
+        changes = {k: v for k, v in changes.items() if k != LINK_ID_KEY}
+        link.update(changes)
+        return link
+
+    def remove(self, link_id):
+        """Entfernt einen Link und gibt den Datensatz zurück."""
+        pos = self.position(link_id)
+        if pos < 0:
+            raise KeyError(link_id)
+        link = self.links.pop(pos)
+        del self._by_id[link_id]
+        self._pos.pop(link_id, None)
+        self._valid_upto = min(self._valid_upto, pos)
+        return link
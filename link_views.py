@@ -0,0 +1,390 @@
+import tkinter as tk
+from tkinter import ttk
+
+from link_model import LINK_ID_KEY
+
+# --- Darstellung der Link-Liste ---
+
+STRIPE_TAGS = ('evenrow', 'oddrow')
+
+
+def link_id_row_key(link):
+    """Zeilen-ID = persistente Link-ID (siehe link_model.LinkIndex)."""
+    return link[LINK_ID_KEY]
+
+
+def link_row_values(link):
+    """Die Spaltenwerte einer Link-Zeile (Beschreibung, URL)."""
+    return (link.get('desc', ''), link.get('url', ''))
+
+
+class LinkListView:
+    """Rendert eine Link-Liste inkrementell in ein ttk.Treeview.
+
+    Jede Zeile bekommt eine stabile iid. sync() vergleicht die neue Liste mit dem
+    zuletzt gerenderten Stand und schickt nur die nötigen insert/item/move/delete-
+    Aufrufe an Tk, statt alle Zeilen zu löschen und neu einzufügen.
+    `row_image(link)` liefert optional ein Bild für die Baumspalte (#0).
+    """
+
+    def __init__(self, tree, row_key=link_id_row_key, row_values=link_row_values, row_image=None):
+        self.tree = tree
+        self.row_key = row_key
+        self.row_values = row_values
+        self.row_image = row_image
+        self._keys = []    # iids in Anzeigereihenfolge
+        self._values = {}  # iid -> zuletzt gerenderte Werte
+        self._images = {}  # iid -> zuletzt gesetztes Bild (nur mit row_image)
+        self._tags = {}    # iid -> zuletzt gesetzter Streifen-Tag
+        self._first_parity = 0
+        # Tags nur einmal konfigurieren, nicht bei jedem Update
+        self.tree.tag_configure('evenrow', background='#f0f0f0')
+        self.tree.tag_configure('oddrow', background='#ffffff')
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def keys(self):
+        return list(self._keys)
+
+    def clear(self):
+        if self._keys:
+            self.tree.delete(*self._keys)
+        self._keys = []
+        self._values = {}
+        self._images = {}
+        self._tags = {}
+        self._first_parity = 0
+
+    def sync(self, links, first_index=0):
+        """Gleicht das Treeview mit `links` ab.
+
+        `first_index` ist die absolute Position der ersten Zeile und bestimmt die
+        Streifen-Parität (wird von der virtuellen Ansicht genutzt).
+        """
+        new_keys = [self.row_key(link) for link in links]
+        old_keys = self._keys
+        n_old, n_new = len(old_keys), len(new_keys)
+
+        # Gemeinsamen Anfang und gemeinsames Ende überspringen
+        start = 0
+        limit = min(n_old, n_new)
+        while start < limit and old_keys[start] == new_keys[start]:
+            start += 1
+        end_old, end_new = n_old, n_new
+        while end_old > start and end_new > start and old_keys[end_old - 1] == new_keys[end_new - 1]:
+            end_old -= 1
+            end_new -= 1
+
+        if start != end_old or start != end_new:
+            self._apply_window(links, new_keys, start, end_old, end_new, first_index)
+
+        # Werte nur dort setzen, wo sich etwas geändert hat
+        for key, link in zip(new_keys, links):
+            values = self.row_values(link)
+            if self._values.get(key) != values:
+                self._values[key] = values
+                self.tree.item(key, values=values)
+        if self.row_image is not None:
+            for key, link in zip(new_keys, links):
+                image = self.row_image(link)
+                if self._images.get(key) != image:
+                    self._images[key] = image
+                    self.tree.item(key, image=image)
+
+        # Streifen nur für Zeilen anpassen, deren Parität sich verschoben hat
+        restripe_from = start if n_old != n_new or start != end_old else n_new
+        if first_index % 2 != self._first_parity:
+            restripe_from = 0
+        self._first_parity = first_index % 2
+        for i in range(restripe_from, n_new):
+            key = new_keys[i]
+            tag = STRIPE_TAGS[(first_index + i) % 2]
+            if self._tags.get(key) != tag:
+                self._tags[key] = tag
+                self.tree.item(key, tags=(tag,))
+
+        self._keys = new_keys
+
+    def _apply_window(self, links, new_keys, start, end_old, end_new, first_index):
+        old_mid = self._keys[start:end_old]
+        new_mid = new_keys[start:end_new]
+        new_mid_set = set(new_mid)
+
+        removed = [key for key in old_mid if key not in new_mid_set]
+        if removed:
+            self.tree.delete(*removed)
+            for key in removed:
+                del self._values[key]
+                del self._tags[key]
+                self._images.pop(key, None)
+
+        current = [key for key in old_mid if key in new_mid_set]
+        for offset, key in enumerate(new_mid):
+            if offset < len(current) and current[offset] == key:
+                continue
+            index = start + offset
+            if key in self._values:
+                self.tree.move(key, '', index)
+                current.remove(key)
+            else:
+                values = self.row_values(links[index])
+                tag = STRIPE_TAGS[(first_index + index) % 2]
+                if self.row_image is not None:
+                    image = self.row_image(links[index])
+                    self.tree.insert('', index, iid=key, values=values, tags=(tag,), image=image)
+                    self._images[key] = image
+                else:
+                    self.tree.insert('', index, iid=key, values=values, tags=(tag,))
+                self._values[key] = values
+                self._tags[key] = tag
+            current.insert(offset, key)
+
+    # --- Auswahl ---
+    def focus(self):
+        return self.tree.focus()
+
+    def select(self, key, index=None):
+        if key in self._values:
+            self.tree.focus(key)
+            self.tree.selection_set(key)
+            self.tree.see(key)
+
+
+class VirtualLinkList:
+    """Virtuelle Link-Liste: nur die sichtbaren Zeilen existieren als Tk-Items.
+
+    Die Scrollposition (`offset`) wird hier verwaltet, nicht vom Treeview. Die
+    Scrollbar, das Mausrad und die Pfeiltasten werden auf das Fenster
+    links[offset:offset + visible_rows] umgelenkt, das mit LinkListView
+    inkrementell gerendert wird.
+    """
+
+    DEFAULT_ROW_HEIGHT = 20
+    HEADING_HEIGHT = 24
+
+    def __init__(self, tree, scrollbar, row_key=link_id_row_key, row_values=link_row_values, row_image=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_key = row_key
+        self.window = LinkListView(tree, row_key, row_values, row_image)
+        self.links = []
+        self.offset = 0
+        self.visible_rows = 1
+        self.active = False
+        self._selected = ''
+        self._selected_index = -1
+        self._key_positions = None  # wird bei Bedarf aus self.links aufgebaut
+
+        tree.bind("<Configure>", self._on_configure, add='+')
+        tree.bind("<<TreeviewSelect>>", self._on_select, add='+')
+        tree.bind("<MouseWheel>", self._on_wheel, add='+')
+        tree.bind("<Button-4>", self._on_wheel, add='+')
+        tree.bind("<Button-5>", self._on_wheel, add='+')
+        for keysym in ("Up", "Down", "Prior", "Next", "Home", "End"):
+            tree.bind(f"<{keysym}>", self._on_key, add='+')
+
+    def __len__(self):
+        return len(self.links)
+
+    # --- Aktivieren / Deaktivieren ---
+    def activate(self):
+        if self.active:
+            return
+        self.active = True
+        self.tree.configure(yscrollcommand='')
+        self.scrollbar.configure(command=self._on_scrollbar)
+        self._update_visible_rows()
+
+    def deactivate(self):
+        if not self.active:
+            return
+        self.active = False
+        self.window.clear()
+        self.links = []
+        self._key_positions = None
+        self.offset = 0
+        self._selected = ''
+        self._selected_index = -1
+        self.scrollbar.configure(command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.scrollbar.set)
+
+    # --- Daten ---
+    def sync(self, links):
+        self.links = links
+        self._key_positions = None
+        index = self._selected_index
+        if self._selected and not (0 <= index < len(links) and self.row_key(links[index]) == self._selected):
+            self._selected_index = -1 # Position hat sich verschoben, wird bei Bedarf neu bestimmt
+        self._render()
+
+    def index_of(self, key):
+        """Position eines Schlüssels in der gesamten Liste (Index wird gecacht)."""
+        if self._key_positions is None:
+            row_key = self.row_key
+            self._key_positions = {row_key(link): i for i, link in enumerate(self.links)}
+        return self._key_positions.get(key, -1)
+
+    def _render(self):
+        total = len(self.links)
+        self.offset = max(0, min(self.offset, total - self.visible_rows))
+        end = min(total, self.offset + self.visible_rows)
+        self.window.sync(self.links[self.offset:end], first_index=self.offset)
+        if self._selected and self._selected in self.window:
+            self.tree.selection_set(self._selected)
+            self.tree.focus(self._selected)
+        elif self.tree.selection():
+            self.tree.selection_set(())
+        self.tree.yview_moveto(0)
+        if total:
+            self.scrollbar.set(self.offset / total, end / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll_to(self, offset):
+        offset = max(0, min(int(offset), len(self.links) - self.visible_rows))
+        if offset != self.offset:
+            self.offset = offset
+            self._render()
+
+    def _update_visible_rows(self):
+        try:
+            row_height = int(ttk.Style(self.tree).lookup("Treeview", "rowheight") or 0)
+        except (ValueError, tk.TclError):
+            row_height = 0
+        row_height = row_height or self.DEFAULT_ROW_HEIGHT
+        height = self.tree.winfo_height()
+        self.visible_rows = max(1, (height - self.HEADING_HEIGHT) // row_height)
+
+    # --- Auswahl ---
+    def focus(self):
+        # Ein gelöschter Link darf nicht ausgewählt bleiben
+        if self._selected and self._current_index() < 0:
+            self._selected = ''
+        return self._selected
+
+    def select(self, key, index=None):
+        if index is None or index < 0:
+            index = self.index_of(key)
+        if index < 0:
+            return
+        self._select_index(index)
+
+    def _select_index(self, index):
+        if not self.links:
+            return
+        index = max(0, min(index, len(self.links) - 1))
+        self._selected = self.row_key(self.links[index])
+        self._selected_index = index
+        if index < self.offset:
+            self.offset = index
+        elif index >= self.offset + self.visible_rows:
+            self.offset = index - self.visible_rows + 1
+        self._render()
+
+    def _current_index(self):
+        if not self._selected:
+            return -1
+        if self._selected_index < 0:
+            self._selected_index = self.index_of(self._selected)
+        return self._selected_index
+
+    # --- Ereignisse ---
+    def _on_configure(self, event=None):
+        if not self.active:
+            return None
+        rows = self.visible_rows
+        self._update_visible_rows()
+        if rows != self.visible_rows:
+            self._render()
+        return None
+
+    def _on_select(self, event=None):
+        if not self.active:
+            return None
+        key = self.tree.focus()
+        if key and key != self._selected and key in self.window:
+            self._selected = key
+            self._selected_index = self.offset + self.window.keys().index(key)
+        return None
+
+    def _on_scrollbar(self, *args):
+        if not args:
+            return
+        if args[0] == 'moveto':
+            self.scroll_to(float(args[1]) * len(self.links))
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if args[2] == 'pages':
+                step *= self.visible_rows
+            self.scroll_to(self.offset + step)
+
+    def _on_wheel(self, event):
+        if not self.active:
+            return None
+        if event.num == 4:
+            step = -3
+        elif event.num == 5:
+            step = 3
+        else:
+            step = -3 if event.delta > 0 else 3
+        self.scroll_to(self.offset + step)
+        return "break"
+
+    def _on_key(self, event):
+        if not self.active or not self.links:
+            return None
+        current = self._current_index()
+        page = max(1, self.visible_rows - 1)
+        target = {
+            "Up": current - 1,
+            "Down": current + 1,
+            "Prior": current - page,
+            "Next": current + page,
+            "Home": 0,
+            "End": len(self.links) - 1,
+        }[event.keysym]
+        if current < 0 and event.keysym in ("Up", "Down"):
+            target = self.offset
+        self._select_index(target)
+        return "break"
+
+
+class AdaptiveLinkList:
+    """Wählt zwischen vollständiger und virtueller Darstellung anhand der Listengröße.
+
+    Bis `threshold` Links wird jede Zeile als Tk-Item angelegt (LinkListView),
+    darüber werden nur die sichtbaren Zeilen materialisiert (VirtualLinkList).
+    Beide teilen sich dasselbe Treeview und dieselbe Scrollbar.
+    """
+
+    def __init__(self, tree, scrollbar, threshold, row_key=link_id_row_key, row_values=link_row_values,
+                 row_image=None):
+        self.threshold = threshold
+        self.full = LinkListView(tree, row_key, row_values, row_image)
+        self.virtual = VirtualLinkList(tree, scrollbar, row_key, row_values, row_image)
+
+    @property
+    def is_virtual(self):
+        return self.virtual.active
+
+    def _active_view(self):
+        return self.virtual if self.virtual.active else self.full
+
+    def sync(self, links):
+        want_virtual = len(links) > self.threshold
+        if want_virtual and not self.virtual.active:
+            self.full.clear()
+            self.virtual.activate()
+        elif not want_virtual and self.virtual.active:
+            self.virtual.deactivate()
+        self._active_view().sync(links)
+
+    def focus(self):
+        return self._active_view().focus()
+
+    def select(self, key, index=None):
+        self._active_view().select(key, index)
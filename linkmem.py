@@ -0,0 +1,454 @@
+"""Linkmem auf der Kommandozeile (ohne Tk).
+
+Beispiele:
+    python linkmem.py list
+    python linkmem.py list Recherche
+    python linkmem.py list Recherche --start 5000 --limit 50   (nur ein Ausschnitt)
+    python linkmem.py add Recherche https://example.org "Beispielseite"
+    python linkmem.py add Recherche - < links.txt      (eine URL pro Zeile, optional TAB Beschreibung)
+    python linkmem.py add Recherche https://docs.python.org --tags python,doku --collection Arbeit/Recherche
+    python linkmem.py list Recherche --filter "#python -#alt @Arbeit asyncio"   (Filtersyntax wie in der Oberfläche)
+    python linkmem.py search python site:docs.python.org
+    python linkmem.py export --all -o sicherung/ --format bookmarks
+    python linkmem.py import lesezeichen.html weitere/*.csv
+    python linkmem.py check --all --broken         (Linkprüfung, Ergebnisse mit Ablaufzeit gecacht)
+    python linkmem.py enrich Recherche             (Seitentitel und Favicons nachtragen)
+    python linkmem.py convert --all --to binary-gzip     (Projektdateien verlustfrei umwandeln, zurück mit --to json)
+    python linkmem.py maintain normalize --all --workers 8   (Wartung parallel über viele Projektdateien)
+    python linkmem.py batch befehle.txt                (ein Befehl pro Zeile, "-" = stdin)
+    python linkmem.py --trace trace.json import gross.html  (Messpunkte als Chrome-Trace)
+"""
+import argparse
+import os
+import shlex
+import sys
+import threading
+
+import instrumentation
+import linkmem_core
+from link_import import FORMAT_JSON, PARSERS
+from binary_format import FILE_FORMATS, convert_project_file
+from link_export import EXPORT_EXTENSIONS, WRITERS, export_format_for, export_links
+from link_filter import filter_predicate
+from link_model import parse_collection, parse_tags, set_link_labels
+from project_storage import JsonDirectoryStorage
+
+
+class CommandError(Exception):
+    """Fehler eines Befehls, der als Meldung (ohne Traceback) ausgegeben wird."""
+
+
+def _print_error(message):
+    print(f"Fehler: {message}", file=sys.stderr)
+
+
+# --- Befehle ---
+def cmd_list(storage, args):
+    if args.project is None:
+        for info in storage.list_project_infos():
+            link_count = "?" if info.link_count is None else info.link_count
+            print(f"{info.name}\t{link_count}")
+        return
+    if not storage.exists(args.project):
+        raise CommandError(f"Projekt '{args.project}' existiert nicht.")
+    if args.start or args.limit is not None:
+        stop = None if args.limit is None else args.start + args.limit
+        links = linkmem_core.read_clean_links(storage, args.project, args.start, stop)
+    else:
+        links = linkmem_core.iter_clean_links(storage, args.project)
+    if args.filter:
+        links = filter(filter_predicate(args.filter), links)
+    for link in links:
+        print(f"{link['url']}\t{link['desc']}")
+
+
+def _stdin_links(add_scheme):
+    for line in sys.stdin:
+        line = line.rstrip('\n')
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        url, _, desc = line.partition('\t')
+        yield linkmem_core.make_link(url, desc, add_scheme=add_scheme)
+
+
+def cmd_add(storage, args):
+    project_name = linkmem_core.sanitize_filename(args.project)
+    add_scheme = not args.keep_url
+    try:
+        if args.url == '-':
+            links = list(_stdin_links(add_scheme))
+        else:
+            links = [linkmem_core.make_link(args.url, args.desc or '', add_scheme=add_scheme)]
+    except ValueError as e:
+        raise CommandError(e)
+    if args.tags or args.collection:
+        labels = (parse_tags(args.tags or ''), parse_collection(args.collection or ''))
+        for link in links:
+            set_link_labels(link, *labels)
+    added, duplicates = linkmem_core.add_links(storage, project_name, links,
+                                               skip_duplicates=not args.allow_duplicates)
+    message = f"{added} Links zu '{project_name}' hinzugefügt"
+    if duplicates:
+        message += f", {duplicates} Duplikate übersprungen"
+    print(message + ".", file=sys.stderr)
+
+
+def cmd_search(storage, args):
+    index = storage.open_search_index()
+    try:
+        # JSON-Projekte: geänderte Projekte vorher nachindizieren (SQLite: entfällt)
+        index.sync_projects(storage, storage.list_project_infos())
+        results = index.search(' '.join(args.terms), project_name=args.project, limit=args.limit)
+    finally:
+        if index is not storage:
+            index.close()
+    for project_name, link in results:
+        print(f"{project_name}\t{link['url']}\t{link['desc']}")
+
+
+def _export_project(storage, project_name, filepath, file_format):
+    links = linkmem_core.iter_clean_links(storage, project_name)
+    if filepath == '-':
+        export_links(links, sys.stdout, file_format, title=project_name)
+        return
+    tmp_path = filepath + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        export_links(links, f, file_format, title=project_name)
+    os.replace(tmp_path, filepath)
+
+
+def cmd_export(storage, args):
+    project_names = storage.list_projects() if args.all else args.projects
+    if not project_names:
+        raise CommandError("Keine Projekte angegeben (Projektnamen oder --all).")
+    for project_name in project_names:
+        if not storage.exists(project_name):
+            raise CommandError(f"Projekt '{project_name}' existiert nicht.")
+    output = args.output
+    if len(project_names) > 1 or (output and output.endswith(('/', os.sep))) or (output and os.path.isdir(output)):
+        # Mehrere Projekte: eine Datei pro Projekt im Zielverzeichnis
+        if output == '-':
+            raise CommandError("Mehrere Projekte können nicht auf die Standardausgabe exportiert werden.")
+        directory = output or '.'
+        os.makedirs(directory, exist_ok=True)
+        file_format = args.format or FORMAT_JSON
+        for project_name in project_names:
+            filepath = os.path.join(directory, project_name + EXPORT_EXTENSIONS[file_format])
+            _export_project(storage, project_name, filepath, file_format)
+            print(f"{project_name} -> {filepath}", file=sys.stderr)
+        return
+    output = output or '-'
+    file_format = args.format or (FORMAT_JSON if output == '-' else export_format_for(output))
+    _export_project(storage, project_names[0], output, file_format)
+
+
+def cmd_import(storage, args):
+    failed = 0
+    for filepath in args.files:
+        if not os.path.isfile(filepath):
+            _print_error(f"Datei '{filepath}' nicht gefunden.")
+            failed += 1
+            continue
+        importer = linkmem_core.create_link_importer(storage, filepath, default_project=args.project,
+                                                     file_format=args.format)
+        importer.run()
+        for message in importer.poll():
+            if message[0] == 'error':
+                _print_error(f"Import von '{filepath}' fehlgeschlagen: {message[1]}")
+                failed += 1
+            elif message[0] == 'done':
+                imported, duplicates, invalid = message[1:]
+                print(f"{filepath}: {sum(imported.values())} Links in {len(imported)} Projekte importiert, "
+                      f"{duplicates} Duplikate, {invalid} ungültig.", file=sys.stderr)
+    if failed:
+        raise CommandError(f"{failed} von {len(args.files)} Dateien konnten nicht importiert werden.")
+
+
+def cmd_check(storage, args):
+    from link_checker import CHECK_CACHE_NAME, LinkCheckCache, check_links, is_broken, status_label
+    project_names = storage.list_projects() if args.all or not args.projects else args.projects
+    urls = []
+    for project_name in project_names:
+        if not storage.exists(project_name):
+            raise CommandError(f"Projekt '{project_name}' existiert nicht.")
+        urls.extend(link['url'] for link in linkmem_core.iter_clean_links(storage, project_name))
+    cache = LinkCheckCache(os.path.join(args.project_dir, CHECK_CACHE_NAME))
+    cache.load()
+    results = check_links(urls, cache, force=args.force, timeout=args.timeout)
+    broken = 0
+    for url, result in results.items():
+        if is_broken(result):
+            broken += 1
+        elif args.broken:
+            continue
+        line = f"{status_label(result)}\t{url}"
+        if result.redirect:
+            line += f"\t-> {result.redirect}"
+        print(line)
+    print(f"{len(results)} Links geprüft, {broken} fehlerhaft.", file=sys.stderr)
+
+
+def cmd_enrich(storage, args):
+    from link_model import LINK_ID_KEY
+    from link_metadata import METADATA_CACHE_NAME, MetadataCache, MetadataEnricher, metadata_changes, needs_metadata
+    project_names = storage.list_projects() if args.all or not args.projects else args.projects
+    cache = MetadataCache(os.path.join(args.project_dir, METADATA_CACHE_NAME))
+    for project_name in project_names:
+        if not storage.exists(project_name):
+            raise CommandError(f"Projekt '{project_name}' existiert nicht.")
+        links = {link[LINK_ID_KEY]: link for link in linkmem_core.iter_clean_links(storage, project_name)
+                 if isinstance(link.get(LINK_ID_KEY), str) and needs_metadata(link)}
+        enricher = MetadataEnricher([(link_id, link['url']) for link_id, link in links.items()], cache)
+        enricher.run()
+        changed = {}
+        for message in enricher.poll():
+            if message[0] == 'error':
+                raise CommandError(f"Projekt '{project_name}': {message[1]}")
+            if message[0] == 'batch':
+                for link_id, url, metadata in message[1]:
+                    link = links[link_id]
+                    changes = metadata_changes(link, metadata)
+                    if changes:
+                        link.update(changes)
+                        changed[link_id] = link
+        linkmem_core.update_links(storage, project_name, list(changed.values()))
+        print(f"{project_name}: {len(changed)} von {len(links)} Links ergänzt.", file=sys.stderr)
+
+
+def cmd_convert(storage, args):
+    if not isinstance(storage, JsonDirectoryStorage):
+        raise CommandError("Nur Projektdateien (Backend json) haben ein Dateiformat.")
+    project_names = storage.list_projects() if args.all else args.projects
+    if not project_names:
+        raise CommandError("Keine Projekte angegeben (Projektnamen oder --all).")
+    for project_name in project_names:
+        if not storage.exists(project_name):
+            raise CommandError(f"Projekt '{project_name}' existiert nicht.")
+    size = instrumentation.format_bytes
+    total_before = total_after = 0
+    failed = 0
+    for project_name in project_names:
+        try:
+            old_format, before, after = convert_project_file(storage.location(project_name), args.to)
+        except (OSError, ValueError) as e:
+            # Die Datei bleibt unverändert, die übrigen Projekte werden trotzdem umgewandelt
+            _print_error(f"{project_name}: {e}")
+            failed += 1
+            continue
+        total_before += before
+        total_after += after
+        print(f"{project_name}: {old_format} -> {args.to} ({size(before)} -> {size(after)})", file=sys.stderr)
+    if len(project_names) > 1:
+        print(f"{len(project_names) - failed} Projekte: {size(total_before)} -> {size(total_after)}", file=sys.stderr)
+    if failed:
+        raise CommandError(f"{failed} Projekte konnten nicht umgewandelt werden.")
+
+
+def cmd_maintain(storage, args):
+    # batch_ops zieht multiprocessing nach sich, das brauchen die übrigen Befehle nicht
+    from batch_ops import OP_EXPORT, BatchRunner, describe_totals
+    project_names = None if args.all else args.projects
+    if not project_names and not args.all:
+        raise CommandError("Keine Projekte angegeben (Projektnamen oder --all).")
+    for project_name in project_names or ():
+        if not storage.exists(project_name):
+            raise CommandError(f"Projekt '{project_name}' existiert nicht.")
+    options = {}
+    if args.operation == OP_EXPORT:
+        options = {'directory': args.output or '.', 'format': args.format or FORMAT_JSON}
+    runner = BatchRunner(storage, args.operation, project_names, options, workers=args.workers)
+    # run() im Hintergrund, damit der Fortschritt schon während des Laufs erscheint
+    thread = threading.Thread(target=runner.run, name="BatchRunner", daemon=True)
+    thread.start()
+    failed = 0
+    progress_shown = False
+
+    def end_progress_line():
+        nonlocal progress_shown
+        if progress_shown:
+            print(file=sys.stderr)
+            progress_shown = False
+
+    while True:
+        finished = not thread.is_alive()  # vor poll(), damit keine letzte Nachricht verloren geht
+        for message in runner.poll():
+            kind = message[0]
+            if kind == 'progress':
+                print(f"\r{message[1]}/{message[2]} Projekte", end='', file=sys.stderr)
+                progress_shown = True
+            elif kind == 'failed':
+                end_progress_line()
+                _print_error(f"{message[1]}: {message[2]}")
+            elif kind == 'error':
+                end_progress_line()
+                raise CommandError(message[1])
+            elif kind == 'done':
+                end_progress_line()
+                totals, failed = message[1:]
+                print(f"{args.operation}: {describe_totals(totals)}", file=sys.stderr)
+        if finished:
+            break
+        thread.join(0.2)
+    if failed:
+        raise CommandError(f"{failed} Projekte konnten nicht bearbeitet werden.")
+
+
+def cmd_batch(storage, args):
+    """Führt Befehle zeilenweise mit demselben geöffneten Speicher aus; Fehler brechen nicht ab.
+
+    --dir/--backend gelten für den ganzen Lauf und werden in den Zeilen ignoriert.
+    """
+    parser = build_parser()
+    failed = 0
+    source = sys.stdin if args.file == '-' else open(args.file, 'r', encoding='utf-8')
+    try:
+        for number, line in enumerate(source, 1):
+            tokens = shlex.split(line, comments=True)
+            if not tokens:
+                continue
+            if tokens[0] == 'batch':
+                _print_error(f"Zeile {number}: 'batch' kann nicht verschachtelt werden.")
+                failed += 1
+                continue
+            try:
+                command_args = parser.parse_args(tokens)
+                command_args.project_dir = args.project_dir
+            except SystemExit:
+                # argparse hat die Meldung bereits ausgegeben
+                _print_error(f"Zeile {number}: ungültiger Befehl.")
+                failed += 1
+                continue
+            if not run_command(storage, command_args, f"Zeile {number}: "):
+                failed += 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    if failed:
+        raise CommandError(f"{failed} Befehle sind fehlgeschlagen.")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="linkmem", description="Linkmem ohne Oberfläche: Links verwalten, suchen, im- und exportieren.")
+    parser.add_argument('--dir', help="Projektverzeichnis (Standard: wie die Oberfläche)")
+    parser.add_argument('--backend', choices=('json', 'sqlite'), help="Projektspeicher (Standard: wie die Oberfläche)")
+    parser.add_argument('--trace', metavar='DATEI', help="Messpunkte aufzeichnen, als Chrome-Trace speichern und zusammenfassen")
+    commands = parser.add_subparsers(dest='command', metavar='BEFEHL')
+    commands.required = True
+
+    p = commands.add_parser('list', help="Projekte auflisten oder die Links eines Projekts ausgeben")
+    p.add_argument('project', nargs='?')
+    p.add_argument('--start', type=int, default=0, help="erst ab diesem Eintrag ausgeben (0 = erster)")
+    p.add_argument('--limit', type=int, help="höchstens so viele Einträge lesen")
+    p.add_argument('--filter', help="nur passende Links: Wortanfänge, #tag, -#tag, #a|b, @Sammlung "
+                   "(beginnt der Filter mit '-': --filter=-#tag)")
+    p.set_defaults(func=cmd_list)
+
+    p = commands.add_parser('add', help="Link(s) zu einem Projekt hinzufügen (URL '-' liest von stdin)")
+    p.add_argument('project')
+    p.add_argument('url')
+    p.add_argument('desc', nargs='?')
+    p.add_argument('--allow-duplicates', action='store_true', help="auch bereits vorhandene URLs hinzufügen")
+    p.add_argument('--keep-url', action='store_true', help="kein http:// vor URLs ohne Protokoll setzen")
+    p.add_argument('--tags', help="Tags für die neuen Links, durch Kommas getrennt")
+    p.add_argument('--collection', help="Sammlung für die neuen Links, z.B. Arbeit/Recherche")
+    p.set_defaults(func=cmd_add)
+
+    p = commands.add_parser('search', help="alle Projekte durchsuchen (Wortanfänge, site:host)")
+    p.add_argument('terms', nargs='+')
+    p.add_argument('--project')
+    p.add_argument('--limit', type=int, default=100)
+    p.set_defaults(func=cmd_search)
+
+    p = commands.add_parser('export', help="Projekte exportieren")
+    p.add_argument('projects', nargs='*')
+    p.add_argument('--all', action='store_true', help="alle Projekte")
+    p.add_argument('-o', '--output', help="Datei, Verzeichnis (mehrere Projekte) oder '-' (Standard)")
+    p.add_argument('--format', choices=sorted(WRITERS))
+    p.set_defaults(func=cmd_export)
+
+    p = commands.add_parser('import', help="Lesezeichen, URL-Listen, CSV oder JSON importieren")
+    p.add_argument('files', nargs='+')
+    p.add_argument('--project', help="Zielprojekt für Einträge ohne Ordner (Standard: Dateiname)")
+    p.add_argument('--format', choices=sorted(PARSERS))
+    p.set_defaults(func=cmd_import)
+
+    p = commands.add_parser('check', help="Links auf Erreichbarkeit prüfen (ohne Angabe: alle Projekte)")
+    p.add_argument('projects', nargs='*')
+    p.add_argument('--all', action='store_true', help="alle Projekte")
+    p.add_argument('--force', action='store_true', help="auch Links mit noch gültigem Ergebnis neu prüfen")
+    p.add_argument('--broken', action='store_true', help="nur fehlerhafte Links ausgeben")
+    p.add_argument('--timeout', type=float, default=10.0, help="Zeitlimit pro Anfrage in Sekunden")
+    p.set_defaults(func=cmd_check)
+
+    p = commands.add_parser('enrich', help="Seitentitel und Favicons für Links ohne Beschreibung laden")
+    p.add_argument('projects', nargs='*')
+    p.add_argument('--all', action='store_true', help="alle Projekte")
+    p.set_defaults(func=cmd_enrich)
+
+    p = commands.add_parser('convert', help="Projektdateien verlustfrei in ein anderes Dateiformat umwandeln")
+    p.add_argument('projects', nargs='*')
+    p.add_argument('--all', action='store_true', help="alle Projekte")
+    p.add_argument('--to', choices=FILE_FORMATS, required=True,
+                   help="json (lesbar) oder binär mit Index, optional gzip-/zstd-komprimiert")
+    p.set_defaults(func=cmd_convert)
+
+    p = commands.add_parser('maintain', help="Wartung über viele Projekte, verteilt auf mehrere Prozesse")
+    p.add_argument('operation', choices=linkmem_core.MAINTENANCE_OPERATIONS,
+                   help="prüfen, bereinigen (wie beim Laden), URLs normalisieren, exportieren, Suchindex neu aufbauen")
+    p.add_argument('projects', nargs='*')
+    p.add_argument('--all', action='store_true', help="alle Projekte")
+    p.add_argument('--workers', type=int, help="Anzahl Prozesse (Standard: Anzahl Kerne)")
+    p.add_argument('-o', '--output', help="Zielverzeichnis für export (Standard: aktuelles Verzeichnis)")
+    p.add_argument('--format', choices=sorted(WRITERS), help="Format für export")
+    p.set_defaults(func=cmd_maintain)
+
+    p = commands.add_parser('batch', help="Befehle zeilenweise aus einer Datei ausführen ('-' = stdin)")
+    p.add_argument('file')
+    p.set_defaults(func=cmd_batch)
+    return parser
+
+
+def run_command(storage, args, prefix=""):
+    """Führt einen geparsten Befehl aus; gibt False zurück, wenn er fehlgeschlagen ist."""
+    try:
+        args.func(storage, args)
+    except CommandError as e:
+        _print_error(f"{prefix}{e}")
+        return False
+    except (OSError, ValueError) as e:
+        _print_error(f"{prefix}{e}")
+        return False
+    return True
+
+
+def write_trace(path):
+    tracer = instrumentation.tracer()
+    try:
+        count = tracer.export(path)
+    except OSError as e:
+        print(f"Fehler: Trace konnte nicht geschrieben werden: {e}", file=sys.stderr)
+        return
+    print(tracer.report(), file=sys.stderr)
+    print(f"Trace mit {count} Ereignissen geschrieben: {path}", file=sys.stderr)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.trace:
+        instrumentation.enable()
+    args.project_dir = linkmem_core.setup_project_directory(args.dir)
+    storage = linkmem_core.open_project_storage(args.project_dir, args.backend)
+    try:
+        ok = run_command(storage, args)
+    except BrokenPipeError:
+        # z.B. "linkmem list | head"
+        return 0
+    finally:
+        storage.close()
+        if args.trace:
+            write_trace(args.trace)
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
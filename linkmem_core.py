@@ -0,0 +1,218 @@
+import os
+import re
+import sys
+from urllib.parse import urlsplit, urlunsplit
+
+from binary_format import FILE_FORMAT_JSON
+from link_import import LinkImporter
+from link_model import LINK_ID_KEY, new_link_id
+from project_journal import put_op
+from project_loader import clean_link
+from project_storage import STORAGE_JSON, open_storage
+from url_index import DEFAULT_PORTS, canonical_url, url_hash
+
+# --- Kern ohne Oberfläche ---
+# Projektverzeichnis, Namens- und URL-Prüfung sowie Lesen und Schreiben von
+# Projekten. Wird von der Tk-Oberfläche (modern_link_manager) und der
+# Kommandozeile (linkmem) genutzt und importiert selbst kein tkinter.
+
+PROJECT_DIR_NAME = "LinkManager_Projects"
+# Speichern hängt nur die Änderungen an ein Journal an, statt die Datei neu zu schreiben
+USE_PROJECT_JOURNAL = False
+# Projektspeicher: STORAGE_JSON (eine Datei pro Projekt) oder STORAGE_SQLITE (eine Datenbank)
+STORAGE_BACKEND = STORAGE_JSON
+# Format der Projektdateien beim Speichern (nur STORAGE_JSON): FILE_FORMAT_JSON oder binär,
+# siehe binary_format ('binary', 'binary-gzip', 'binary-zstd'); gelesen werden alle
+PROJECT_FILE_FORMAT = FILE_FORMAT_JSON
+
+KNOWN_URL_SCHEMES = ("http://", "https://", "ftp://", "file://")
+DEFAULT_URL_SCHEME = "http://"
+DEFAULT_PROJECT_NAME = "Unbenanntes Projekt"
+
+# Wartungsvorgänge (ausgeführt von batch_ops; die Namen stehen hier, damit die
+# Kommandozeile sie kennt, ohne batch_ops samt multiprocessing zu importieren)
+OP_VALIDATE = 'validate'
+OP_CLEAN = 'clean'
+OP_NORMALIZE = 'normalize'
+OP_EXPORT = 'export'
+OP_REINDEX = 'reindex'
+MAINTENANCE_OPERATIONS = (OP_VALIDATE, OP_CLEAN, OP_NORMALIZE, OP_EXPORT, OP_REINDEX)
+
+
+def project_directory_path():
+    """Standardort des Projektverzeichnisses (Dokumente, sonst neben dem Programm)."""
+    docs_path = os.path.join(os.path.expanduser("~"), "Documents")
+    if os.path.exists(docs_path):
+        return os.path.join(docs_path, PROJECT_DIR_NAME)
+    # Für PyInstaller ist das komplexer, aber das Verzeichnis der ausführbaren Datei ist oft ok
+    try:
+        script_dir = os.path.dirname(os.path.realpath(sys.executable))
+    except Exception:
+        script_dir = os.getcwd()
+    return os.path.join(script_dir, PROJECT_DIR_NAME)
+
+
+def setup_project_directory(proj_dir=None, on_error=None):
+    """Legt das Projektverzeichnis bei Bedarf an und gibt es zurück.
+
+    Schlägt das fehl, wird `on_error(proj_dir, error)` aufgerufen (sonst eine
+    Warnung ausgegeben) und das aktuelle Verzeichnis verwendet.
+    """
+    proj_dir = proj_dir or project_directory_path()
+    if not os.path.exists(proj_dir):
+        try:
+            os.makedirs(proj_dir)
+            print(f"Info: Projektverzeichnis wurde erstellt: {proj_dir}", file=sys.stderr)
+        except OSError as e:
+            if on_error is not None:
+                on_error(proj_dir, e)
+            else:
+                print(f"Warnung: Konnte Projektverzeichnis nicht erstellen: {proj_dir} ({e})", file=sys.stderr)
+            proj_dir = "."
+    return proj_dir
+
+
+def sanitize_filename(name):
+    """Entfernt Zeichen, die in Dateinamen nicht erlaubt sind.
+
+    Punkte am Rand fallen ebenfalls weg, damit Namen wie ".." kein Verzeichnis
+    bezeichnen und keine versteckten Dateien entstehen.
+    """
+    name = re.sub(r'[<>:"/\\|?*]', '', name)
+    name = name.strip().strip('.').strip()
+    return name or DEFAULT_PROJECT_NAME
+
+
+def has_url_scheme(url):
+    return url.startswith(KNOWN_URL_SCHEMES) or re.match(r"^[a-zA-Z]+://", url) is not None
+
+
+def make_link(url, desc="", add_scheme=False):
+    """Prüft eine Eingabe wie der Link-Dialog und gibt {'url', 'desc'} zurück.
+
+    Eine leere URL löst ValueError aus; fehlt das Protokoll, wird mit
+    `add_scheme` DEFAULT_URL_SCHEME vorangestellt. Ohne Beschreibung gilt die URL.
+    """
+    url = url.strip()
+    desc = desc.strip()
+    if not url:
+        raise ValueError("Die URL darf nicht leer sein.")
+    if add_scheme and not has_url_scheme(url):
+        url = DEFAULT_URL_SCHEME + url
+    return {'url': url, 'desc': desc or url}
+
+
+def normalize_url(url):
+    """Aufrufbare Normalform einer gespeicherten URL (Wartung, siehe batch_ops).
+
+    Leerraum außen entfernt, fehlendes Protokoll ergänzt (nicht bei mailto: u.ä.),
+    Schema und Host in Kleinbuchstaben, Standardport entfernt. Pfad, Query und
+    Fragment bleiben, anders als bei url_index.canonical_url.
+    """
+    url = url.strip()
+    if not url:
+        return url
+    if not has_url_scheme(url) and not re.match(r"^[a-zA-Z][a-zA-Z0-9+.-]*:(?!\d)", url):
+        url = DEFAULT_URL_SCHEME + url
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if not parts.netloc or not parts.hostname:
+        return url
+    scheme = parts.scheme.lower()
+    host = parts.hostname
+    netloc = f"[{host}]" if ':' in host else host
+    if port is not None and DEFAULT_PORTS.get(scheme) != port:
+        netloc += f":{port}"
+    userinfo, at, _ = parts.netloc.rpartition('@')
+    if at:
+        netloc = f"{userinfo}@{netloc}"
+    return urlunsplit((scheme, netloc, parts.path, parts.query, parts.fragment))
+
+
+def open_project_storage(project_dir=None, backend=None, use_journal=None, file_format=None):
+    """Öffnet den Projektspeicher wie die Oberfläche (Standard: konfiguriertes Verzeichnis und Backend)."""
+    project_dir = setup_project_directory(project_dir)
+    return open_storage(backend or STORAGE_BACKEND, project_dir,
+                        use_journal=USE_PROJECT_JOURNAL if use_journal is None else use_journal,
+                        file_format=file_format or PROJECT_FILE_FORMAT)
+
+
+def iter_clean_links(storage, project_name):
+    """Die gültigen Links eines Projekts nacheinander (siehe project_loader.clean_link)."""
+    for i, item in enumerate(storage.iter_links(project_name)):
+        link = clean_link(item, i, project_name)
+        if link is not None:
+            yield link
+
+
+def read_clean_links(storage, project_name, start, stop=None):
+    """Die gültigen Links unter den Elementen [start:stop] (binäre Projektdateien lesen nur diesen Bereich)."""
+    links = []
+    for i, item in enumerate(storage.read_items(project_name, start, stop), start):
+        link = clean_link(item, i, project_name)
+        if link is not None:
+            links.append(link)
+    return links
+
+
+def load_links(storage, project_name):
+    """Alle gültigen Links eines Projekts als Liste."""
+    return list(iter_clean_links(storage, project_name))
+
+
+def add_links(storage, project_name, links, skip_duplicates=True):
+    """Hängt Links an ein (ggf. neues) Projekt an; gibt (hinzugefügt, übersprungene Duplikate) zurück.
+
+    Bestehende Projekte werden nicht neu geschrieben: die Links gehen als
+    Journal-Operationen an storage.save (siehe update_links).
+    """
+    exists = storage.exists(project_name)
+    seen = set()
+    if exists and skip_duplicates:
+        for item in storage.iter_links(project_name):
+            if isinstance(item, dict) and 'url' in item:
+                seen.add(url_hash(canonical_url(str(item['url']))))
+    new_links = []
+    duplicates = 0
+    for link in links:
+        if skip_duplicates:
+            digest = url_hash(canonical_url(link['url']))
+            if digest in seen:
+                duplicates += 1
+                continue
+            seen.add(digest)
+        link = dict(link)
+        link.setdefault(LINK_ID_KEY, new_link_id())
+        new_links.append(link)
+    if not exists:
+        storage.save(project_name, links=new_links)
+    else:
+        update_links(storage, project_name, new_links)
+    return len(new_links), duplicates
+
+
+def update_links(storage, project_name, links):
+    """Schreibt neue oder geänderte Links (mit ID) als Journal-Operationen in ein bestehendes Projekt.
+
+    Verdichtet wird erst, wenn das Journal zu groß wird (needs_compaction);
+    Laden, Suche und Wartung lesen das Journal ohnehin mit.
+    """
+    if not links:
+        return
+    if storage.save(project_name, None, [put_op(link) for link in links]):
+        storage.compact(project_name)
+
+
+def import_project_name(filepath):
+    """Zielprojekt für Einträge ohne Ordner: der Dateiname ohne Endung."""
+    return sanitize_filename(os.path.splitext(os.path.basename(filepath))[0])
+
+
+def create_link_importer(storage, filepath, default_project=None, file_format=None):
+    """LinkImporter mit der Namensgebung der Oberfläche: Lesezeichenordner werden zu
+    eigenen Projekten ("Ordner - Unterordner"), alles andere landet in `default_project`."""
+    return LinkImporter(storage, filepath, default_project or import_project_name(filepath),
+                        file_format=file_format)
@@ -0,0 +1,135 @@
+import collections
+import json
+import os
+import threading
+
+from instrumentation import span
+from project_journal import JOURNAL_SUFFIX, iter_project_items, snapshot_link_count
+
+# --- Projektkatalog ---
+
+CATALOG_FILE_NAME = ".linkmem_catalog"
+
+ProjectInfo = collections.namedtuple('ProjectInfo', ['name', 'link_count', 'modified'])
+
+
+def count_project_links(filepath):
+    """Zählt die gültigen Links einer Projektdatei (inkl. Journal), ohne sie ganz einzulesen."""
+    link_count = snapshot_link_count(filepath)  # binär ohne Journal: steht im Dateikopf
+    if link_count is not None:
+        return link_count
+    return sum(1 for item in iter_project_items(filepath) if isinstance(item, dict) and 'url' in item)
+
+
+class ProjectCatalog:
+    """Persistenter Katalog eines Projektverzeichnisses.
+
+    Pro Projektdatei werden mtime und Größe (auch die des Journals) zusammen
+    mit Linkanzahl und Änderungszeit in CATALOG_FILE_NAME gespeichert.
+    refresh() prüft per os.scandir nur die Dateistatistik und liest lediglich
+    neue oder geänderte Dateien, um die Links zu zählen.
+    """
+
+    def __init__(self, project_dir, extension=".json"):
+        self.project_dir = project_dir
+        self.extension = extension
+        self.path = os.path.join(project_dir, CATALOG_FILE_NAME)
+        self._lock = threading.Lock()
+        self._entries = None  # Dateiname -> [Signatur, Linkanzahl, geändert]
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            if not isinstance(entries, dict):
+                entries = {}
+        except (OSError, ValueError):
+            entries = {}
+        self._entries = entries
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            # Der Katalog ist nur ein Cache, beim nächsten Mal wird eben neu gezählt
+            print(f"Warnung: Projektkatalog konnte nicht gespeichert werden: {e}")
+
+    @staticmethod
+    def _signature(stat, journal):
+        return [stat.st_mtime_ns, stat.st_size,
+                journal.st_mtime_ns if journal else 0, journal.st_size if journal else 0]
+
+    def _infos(self):
+        infos = [ProjectInfo(os.path.splitext(filename)[0], entry[1], entry[2])
+                 for filename, entry in self._entries.items()]
+        infos.sort()
+        return infos
+
+    def snapshot(self):
+        """Stand der letzten Aktualisierung, ohne das Verzeichnis anzufassen."""
+        with self._lock:
+            self._load()
+            return self._infos()
+
+    def refresh(self):
+        """Gleicht den Katalog mit dem Verzeichnis ab und gibt alle ProjectInfos sortiert zurück."""
+        with span('list') as measure, self._lock:
+            self._load()
+            stats = {}
+            journals = {}
+            with os.scandir(self.project_dir) as it:
+                for entry in it:
+                    name = entry.name
+                    if name.endswith(self.extension):
+                        if entry.is_file():
+                            stats[name] = entry.stat()
+                    elif name.endswith(self.extension + JOURNAL_SUFFIX):
+                        journals[name[:-len(JOURNAL_SUFFIX)]] = entry.stat()
+
+            changed = False
+            counted = 0
+            for filename in list(self._entries):
+                if filename not in stats:
+                    del self._entries[filename]
+                    changed = True
+            for filename, stat in stats.items():
+                journal = journals.get(filename)
+                signature = self._signature(stat, journal)
+                entry = self._entries.get(filename)
+                if entry is not None and entry[0] == signature:
+                    continue
+                counted += 1
+                try:
+                    link_count = count_project_links(os.path.join(self.project_dir, filename))
+                except (OSError, ValueError):
+                    link_count = None  # unlesbare Datei, trotzdem auflisten
+                modified = max(stat.st_mtime, journal.st_mtime if journal else 0)
+                self._entries[filename] = [signature, link_count, modified]
+                changed = True
+            if changed:
+                self._save()
+            infos = self._infos()
+            measure.add(items=len(infos), counted=counted)
+            return infos
+
+    def record(self, filename, link_count):
+        """Übernimmt die bekannte Linkanzahl nach dem Speichern, damit nicht neu gezählt wird."""
+        with self._lock:
+            self._load()
+            filepath = os.path.join(self.project_dir, filename)
+            try:
+                stat = os.stat(filepath)
+            except OSError:
+                return
+            try:
+                journal = os.stat(filepath + JOURNAL_SUFFIX)
+            except OSError:
+                journal = None
+            self._entries[filename] = [self._signature(stat, journal), link_count,
+                                       max(stat.st_mtime, journal.st_mtime if journal else 0)]
+            self._save()
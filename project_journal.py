@@ -0,0 +1,256 @@
+import itertools
+import json
+import os
+
+from binary_format import (FILE_FORMAT_COMPRESSION, FILE_FORMAT_JSON, BinaryProjectReader, is_binary_project,
+                           write_binary_project)
+from instrumentation import annotate
+from json_stream import iter_json_array
+from link_model import LINK_ID_KEY
+
+# --- Journal-Projektformat ---
+# Neben <projekt>.json (kompakte Momentaufnahme) liegt <projekt>.json.journal,
+# ein reines Anhänge-Log mit einer JSON-Operation pro Zeile:
+#   {"op": "put", "link": {...}}   Link anlegen oder vollständig ersetzen (per ID)
+#   {"op": "del", "id": "..."}     Link löschen
+#   {"op": "reset"}                alles Vorherige (inkl. Momentaufnahme) verwerfen
+# Die Momentaufnahme ist JSON oder im binären Format (siehe binary_format),
+# beim Lesen wird das am Dateianfang erkannt.
+# Alle Operationen sind idempotent: das Journal erneut auf eine Momentaufnahme
+# anzuwenden, die es schon enthält, ändert nichts. Deshalb ist die Verdichtung
+# (Momentaufnahme neu schreiben, dann Journal löschen) absturzsicher.
+
+JOURNAL_SUFFIX = ".journal"
+# Verdichten, sobald das Journal diese Größe und diesen Anteil der Momentaufnahme übersteigt
+COMPACT_MIN_BYTES = 256 * 1024
+COMPACT_RATIO = 0.5
+# Blockgröße, in der append_journal rückwärts nach dem letzten Zeilenende sucht
+TAIL_SCAN_BYTES = 64 * 1024
+
+
+def journal_path_for(filepath):
+    return filepath + JOURNAL_SUFFIX
+
+
+def put_op(link):
+    return {'op': 'put', 'link': link}
+
+
+def delete_op(link_id):
+    return {'op': 'del', 'id': link_id}
+
+
+def reset_op():
+    return {'op': 'reset'}
+
+
+def read_journal(journal_path):
+    """Liest alle Operationen; eine unvollständige letzte Zeile (Absturz beim Schreiben) wird ignoriert."""
+    try:
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            lines = f.read().split('\n')
+    except FileNotFoundError:
+        return []
+    ops = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            op = json.loads(line)
+        except ValueError:
+            if number < len(lines) - 1:
+                print(f"Warnung: Beschädigte Journalzeile {number} in {journal_path} übersprungen.")
+            continue
+        if isinstance(op, dict) and op.get('op') in ('put', 'del', 'reset'):
+            ops.append(op)
+    return ops
+
+
+def merge_journal(snapshot_items, ops):
+    """Wendet Journal-Operationen auf die Elemente einer Momentaufnahme an (als Generator).
+
+    Links behalten ihre Position aus der Momentaufnahme; im Journal neu angelegte
+    Links folgen in der Reihenfolge ihres ersten Auftretens.
+    """
+    pending = {}   # ID -> letzter Stand (None = gelöscht)
+    use_snapshot = True
+    for op in ops:
+        kind = op['op']
+        if kind == 'reset':
+            pending = {}
+            use_snapshot = False
+        elif kind == 'put':
+            link = op.get('link')
+            if isinstance(link, dict) and isinstance(link.get(LINK_ID_KEY), str):
+                pending[link[LINK_ID_KEY]] = link
+        else:
+            pending[op.get('id')] = None
+
+    if use_snapshot:
+        for item in snapshot_items:
+            link_id = item.get(LINK_ID_KEY) if isinstance(item, dict) else None
+            if link_id in pending:
+                item = pending.pop(link_id)
+                if item is None:
+                    continue
+            yield item
+    for link in pending.values():
+        if link is not None:
+            yield link
+
+
+def _complete_length(f, end):
+    """Länge bis einschließlich des letzten Zeilenendes (0, wenn es keins gibt)."""
+    pos = end
+    while pos > 0:
+        size = min(TAIL_SCAN_BYTES, pos)
+        pos -= size
+        f.seek(pos)
+        newline = f.read(size).rfind(b'\n')
+        if newline >= 0:
+            return pos + newline + 1
+    return 0
+
+
+def append_journal(filepath, ops):
+    """Hängt Operationen an und wartet mit fsync, bis sie auf der Platte sind.
+
+    Endet das Journal nicht mit einem Zeilenende (Absturz mitten im Schreiben),
+    wird die unvollständige Zeile vorher abgeschnitten; sonst klebte die erste
+    neue Operation an ihr und ginge beim Lesen mit verloren.
+    """
+    if not ops:
+        return
+    data = ''.join(json.dumps(op, ensure_ascii=False) + '\n' for op in ops).encode('utf-8')
+    journal_path = journal_path_for(filepath)
+    try:
+        f = open(journal_path, 'r+b')
+    except FileNotFoundError:
+        f = open(journal_path, 'wb')
+    with f:
+        end = f.seek(0, os.SEEK_END)
+        if end:
+            f.seek(end - 1)
+            if f.read(1) != b'\n':
+                end = _complete_length(f, end)
+                f.truncate(end)
+                print(f"Warnung: Unvollständige letzte Journalzeile in {journal_path} entfernt.")
+            f.seek(end)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    annotate(bytes=len(data))
+
+
+def needs_compaction(filepath):
+    try:
+        journal_size = os.path.getsize(journal_path_for(filepath))
+    except OSError:
+        return False
+    try:
+        snapshot_size = os.path.getsize(filepath)
+    except OSError:
+        snapshot_size = 0
+    return journal_size >= COMPACT_MIN_BYTES and journal_size >= snapshot_size * COMPACT_RATIO
+
+
+def iter_snapshot_items(filepath, on_progress=None):
+    """Die Elemente der Momentaufnahme allein (JSON oder binär), `on_progress(bytes)` wie iter_json_array."""
+    if is_binary_project(filepath):
+        with BinaryProjectReader(filepath) as reader:
+            yield from reader.iter_items(on_progress=on_progress)
+        return
+    with open(filepath, 'rb') as f:
+        yield from iter_json_array(f, on_progress=on_progress)
+
+
+def iter_project_items(filepath, on_progress=None):
+    """Alle Elemente eines Projekts inkl. Journal, ohne die Datei komplett einzulesen."""
+    ops = read_journal(journal_path_for(filepath))
+    if any(op['op'] == 'reset' for op in ops) and not os.path.exists(filepath):
+        yield from merge_journal((), ops)
+        return
+    yield from merge_journal(iter_snapshot_items(filepath, on_progress=on_progress), ops)
+
+
+def check_item_range(start, stop=None):
+    """Prüft einen Bereich [start:stop] für read_items; negative Angaben (vom Ende her) gibt es nicht."""
+    if start < 0 or (stop is not None and stop < 0):
+        raise ValueError(f"Ungültiger Bereich [{start}:{'' if stop is None else stop}]: "
+                         "Anfang und Ende dürfen nicht negativ sein.")
+
+
+def read_project_range(filepath, start, stop=None):
+    """Elemente [start:stop] eines Projekts inkl. Journal.
+
+    Binäre Momentaufnahmen ohne Journal lesen dabei nur die betroffenen Blöcke,
+    sonst wird bis `stop` gestreamt. Beide Wege verhalten sich gleich
+    (siehe check_item_range).
+    """
+    check_item_range(start, stop)
+    if not os.path.exists(journal_path_for(filepath)) and is_binary_project(filepath):
+        with BinaryProjectReader(filepath) as reader:
+            return reader.read_range(start, stop)
+    return list(itertools.islice(iter_project_items(filepath), start, stop))
+
+
+def snapshot_link_count(filepath):
+    """Linkanzahl aus dem Kopf einer binären Momentaufnahme ohne Journal, sonst None."""
+    if os.path.exists(journal_path_for(filepath)) or not is_binary_project(filepath):
+        return None
+    with BinaryProjectReader(filepath) as reader:
+        return reader.link_count
+
+
+def write_snapshot(filepath, links, file_format=FILE_FORMAT_JSON):
+    """Schreibt eine Momentaufnahme atomar (temporäre Datei, fsync, os.replace).
+
+    `file_format` ist FILE_FORMAT_JSON oder eines der binären Formate; `links`
+    darf für die binären Formate auch ein Generator sein.
+    """
+    directory = os.path.dirname(filepath)
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = filepath + ".tmp"
+    if file_format == FILE_FORMAT_JSON:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(links if isinstance(links, list) else list(links), f, indent=4, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+            annotate(bytes=f.tell())
+    else:
+        with open(tmp_path, 'wb') as f:
+            annotate(bytes=write_binary_project(f, links, FILE_FORMAT_COMPRESSION[file_format]))
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, filepath)
+    _fsync_directory(directory)
+
+
+def _fsync_directory(directory):
+    # Macht das Umbenennen dauerhaft; unter Windows nicht möglich und nicht nötig
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def compact_project(filepath, file_format=FILE_FORMAT_JSON):
+    """Schreibt Momentaufnahme + Journal als neue Momentaufnahme und entfernt das Journal.
+
+    Gibt die Anzahl Links zurück. Muss mit demselben I/O-Schlüssel wie die
+    Speichervorgänge laufen, damit kein Anhängen dazwischenkommt.
+    """
+    journal_path = journal_path_for(filepath)
+    if not os.path.exists(journal_path):
+        return None
+    links = [item for item in iter_project_items(filepath) if isinstance(item, dict)]
+    write_snapshot(filepath, links, file_format)
+    os.remove(journal_path)
+    return len(links)
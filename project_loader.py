@@ -0,0 +1,107 @@
+import queue
+import threading
+
+from instrumentation import span
+from link_model import compact_link
+
+# --- Streamendes Laden von Projektdateien ---
+
+FIRST_BATCH_SIZE = 200   # erste Zeilen sollen sofort erscheinen
+BATCH_SIZE = 5000
+
+
+def clean_link(item, index, source=""):
+    """Prüft ein geladenes Element; gibt den Link-Datensatz oder None zurück."""
+    if isinstance(item, dict) and 'url' in item:
+        if 'desc' not in item:
+            item['desc'] = item.get('url', 'Keine Beschreibung')
+        return item
+    print(f"Warnung: Ungültiges Element in {source} bei Index {index} übersprungen: {item}")
+    return None
+
+
+class ProjectLoader:
+    """Liest ein Projekt in einem Worker-Thread und reicht die Links blockweise weiter.
+
+    Der UI-Thread holt die Ergebnisse mit poll() ab (z.B. aus root.after), der
+    Worker (run()) fasst Tk nie an. Nachrichten sind Tupel:
+    ('batch', links), ('progress', done, total),
+    ('done', link_count, skipped_count, journaled) und ('error', exception).
+    Die Links kommen als LinkRecord (siehe link_model), nicht als dict.
+    """
+
+    def __init__(self, storage, project_name, batch_size=BATCH_SIZE, first_batch_size=FIRST_BATCH_SIZE):
+        self.storage = storage
+        self.project_name = project_name
+        self.location = storage.location(project_name)
+        self.batch_size = batch_size
+        self.first_batch_size = first_batch_size
+        self._messages = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Startet einen eigenen Worker-Thread (alternativ run() z.B. über den IOScheduler ausführen)."""
+        self._thread = threading.Thread(target=self.run, name="ProjectLoader", daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def poll(self, max_messages=None):
+        """Holt alle (höchstens max_messages) anstehenden Nachrichten ab, ohne zu blockieren."""
+        messages = []
+        while max_messages is None or len(messages) < max_messages:
+            try:
+                messages.append(self._messages.get_nowait())
+            except queue.Empty:
+                break
+        return messages
+
+    def run(self):
+        if self._cancel.is_set():
+            return
+        try:
+            with span('load', project=self.project_name) as measure:
+                self._load(measure)
+        except Exception as e:
+            if not self._cancel.is_set():
+                self._messages.put(('error', e))
+
+    def _load(self, measure):
+        def on_progress(done, total):
+            self._messages.put(('progress', done, total))
+
+        count = skipped = 0
+        batch = []
+        limit = self.first_batch_size
+        journaled = self.storage.has_journal(self.project_name)
+        # Elemente streamen, ein vorhandenes Journal wird dabei eingespielt
+        for i, item in enumerate(self.storage.iter_links(self.project_name, on_progress=on_progress)):
+            if self._cancel.is_set():
+                return
+            link = clean_link(item, i, self.location)
+            if link is None:
+                skipped += 1
+                continue
+            batch.append(compact_link(link))
+            if len(batch) >= limit:
+                self._messages.put(('batch', batch))
+                count += len(batch)
+                batch = []
+                limit = self.batch_size
+        if self._cancel.is_set():
+            return
+        if batch:
+            self._messages.put(('batch', batch))
+            count += len(batch)
+        measure.add(items=count, skipped=skipped)
+        self._messages.put(('done', count, skipped, journaled))
@@ -0,0 +1,187 @@
+import itertools
+import os
+
+from binary_format import FILE_FORMAT_JSON
+from instrumentation import annotate, span
+from project_catalog import ProjectCatalog, ProjectInfo
+from project_journal import (append_journal, check_item_range, compact_project, iter_project_items,
+                             journal_path_for, needs_compaction, put_op, read_project_range, reset_op, write_snapshot)
+from search_index import SEARCH_INDEX_NAME, SearchIndex
+
+# --- Projektspeicher ---
+# Alle Methoden laufen im I/O-Thread (siehe io_scheduler) und fassen Tk nicht an.
+
+PROJECT_FILE_EXTENSION = ".json"
+
+STORAGE_JSON = "json"
+STORAGE_SQLITE = "sqlite"
+SQLITE_DB_NAME = "linkmem.sqlite3"
+
+
+class ProjectStorage:
+    """Schnittstelle eines Projektspeichers.
+
+    Projekte werden über ihren Namen angesprochen. `incremental` gibt an, ob
+    save() bevorzugt Deltas (ops) statt des vollständigen Stands bekommt.
+    """
+
+    incremental = False
+
+    def location(self, project_name):
+        """Anzeigbarer Ort des Projekts; dient auch als I/O-Schlüssel."""
+        raise NotImplementedError
+
+    def list_projects(self):
+        """Sortierte Namen aller Projekte."""
+        raise NotImplementedError
+
+    def list_project_infos(self):
+        """Sortierte ProjectInfos (Name, Linkanzahl, Änderungszeit) aller Projekte."""
+        return [ProjectInfo(name, None, None) for name in self.list_projects()]
+
+    def cached_project_infos(self):
+        """Zuletzt bekannter Stand von list_project_infos(), ohne Plattenzugriff (kann leer sein)."""
+        return []
+
+    def exists(self, project_name):
+        raise NotImplementedError
+
+    def modified(self, project_name):
+        """Änderungszeit wie in list_project_infos() (None, falls unbekannt)."""
+        return None
+
+    def open_search_index(self):
+        """Der projektübergreifende Suchindex zu diesem Speicher (siehe search_index)."""
+        raise NotImplementedError
+
+    def iter_links(self, project_name, on_progress=None):
+        """Alle gespeicherten Elemente in Reihenfolge (ungeprüft, siehe project_loader.clean_link).
+
+        `on_progress(done, total)` meldet den Fortschritt in beliebigen Einheiten.
+        """
+        raise NotImplementedError
+
+    def read_items(self, project_name, start, stop=None):
+        """Elemente [start:stop] wie iter_links, als Liste."""
+        check_item_range(start, stop)
+        return list(itertools.islice(self.iter_links(project_name), start, stop))
+
+    def has_journal(self, project_name):
+        return False
+
+    def save(self, project_name, links=None, ops=None):
+        """Speichert den vollständigen Stand (links) oder nur Änderungen (ops).
+
+        Gibt True zurück, wenn anschließend compact() laufen sollte.
+        """
+        raise NotImplementedError
+
+    def compact(self, project_name):
+        return None
+
+    def delete(self, project_name):
+        """Löscht ein Projekt; gibt False zurück, wenn es nicht existierte."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonDirectoryStorage(ProjectStorage):
+    """Eine <name>.json-Datei pro Projekt, optional mit Journal (siehe project_journal).
+
+    `file_format` bestimmt, wie Momentaufnahmen geschrieben werden (JSON oder
+    binär, siehe binary_format); gelesen wird jede Datei in ihrem Format.
+    """
+
+    def __init__(self, project_dir, use_journal=False, file_format=FILE_FORMAT_JSON):
+        self.project_dir = project_dir
+        self.incremental = use_journal
+        self.file_format = file_format
+        self.catalog = ProjectCatalog(project_dir, PROJECT_FILE_EXTENSION)
+
+    def location(self, project_name):
+        return os.path.join(self.project_dir, f"{project_name}{PROJECT_FILE_EXTENSION}")
+
+    def list_projects(self):
+        files = [f for f in os.listdir(self.project_dir) if f.endswith(PROJECT_FILE_EXTENSION)]
+        files.sort()
+        return [os.path.splitext(filename)[0] for filename in files]
+
+    def list_project_infos(self):
+        return self.catalog.refresh()
+
+    def cached_project_infos(self):
+        return self.catalog.snapshot()
+
+    def exists(self, project_name):
+        return os.path.exists(self.location(project_name))
+
+    def modified(self, project_name):
+        filepath = self.location(project_name)
+        try:
+            mtime = os.path.getmtime(filepath)
+        except OSError:
+            return None
+        try:
+            return max(mtime, os.path.getmtime(journal_path_for(filepath)))
+        except OSError:
+            return mtime
+
+    def open_search_index(self):
+        return SearchIndex(os.path.join(self.project_dir, SEARCH_INDEX_NAME))
+
+    def iter_links(self, project_name, on_progress=None):
+        filepath = self.location(project_name)
+        total_bytes = os.path.getsize(filepath)
+        annotate(bytes=total_bytes)
+        progress = None
+        if on_progress is not None:
+            progress = lambda bytes_read: on_progress(bytes_read, total_bytes)
+        return iter_project_items(filepath, on_progress=progress)
+
+    def read_items(self, project_name, start, stop=None):
+        return read_project_range(self.location(project_name), start, stop)
+
+    def has_journal(self, project_name):
+        return os.path.exists(journal_path_for(self.location(project_name)))
+
+    def save(self, project_name, links=None, ops=None):
+        # Existiert schon ein Journal, wird auch ein vollständiger Stand dort als
+        # reset + put angehängt, damit das alte Journal ihn beim Laden nicht überschreibt.
+        filepath = self.location(project_name)
+        with span('save', project=project_name) as measure:
+            if ops is None:
+                measure.add(items=len(links))
+                if not os.path.exists(journal_path_for(filepath)):
+                    write_snapshot(filepath, links, self.file_format)
+                    self.catalog.record(os.path.basename(filepath), len(links))
+                    return False
+                ops = [reset_op()] + [put_op(link) for link in links]
+            else:
+                measure.add(items=len(ops))
+            append_journal(filepath, ops)
+            return needs_compaction(filepath)
+
+    def compact(self, project_name):
+        return compact_project(self.location(project_name), self.file_format)
+
+    def delete(self, project_name):
+        filepath = self.location(project_name)
+        try:
+            os.remove(journal_path_for(filepath))
+        except FileNotFoundError:
+            pass
+        try:
+            os.remove(filepath)
+        except FileNotFoundError:
+            return False
+        return True
+
+
+def open_storage(backend, project_dir, use_journal=False, file_format=FILE_FORMAT_JSON):
+    """Erzeugt den konfigurierten Projektspeicher im Projektverzeichnis."""
+    if backend == STORAGE_SQLITE:
+        from sqlite_storage import SqliteStorage
+        return SqliteStorage(os.path.join(project_dir, SQLITE_DB_NAME))
+    return JsonDirectoryStorage(project_dir, use_journal=use_journal, file_format=file_format)
@@ -0,0 +1,253 @@
+import re
+import sqlite3
+import threading
+from urllib.parse import urlsplit
+
+from link_model import LINK_ID_KEY
+from project_loader import clean_link
+from url_index import canonical_url
+
+# --- Projektübergreifender Suchindex ---
+# Invertierter Index in einer eigenen SQLite-Datei neben den Projekten:
+#   docs      eine Zeile pro Link (Projekt, ID, Position, URL, Beschreibung,
+#             normalisierte URL für die Duplikaterkennung)
+#   postings  Token -> Dokument (Wörter aus Beschreibung und URL)
+#   hosts     Host und übergeordnete Domains -> Dokument (für "site:")
+#   indexed   Änderungszeit jedes Projekts beim letzten Indizieren
+# Ein Suchbegriff passt als Präfix eines Tokens; alle Begriffe müssen passen.
+
+SEARCH_INDEX_NAME = ".linkmem_search.sqlite3"
+# Bei Änderungen am Schema erhöhen: der Index wird dann verworfen und neu aufgebaut
+SCHEMA_VERSION = 2
+SITE_PREFIX = "site:"
+DEFAULT_LIMIT = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    doc INTEGER PRIMARY KEY,
+    project TEXT NOT NULL,
+    link_id TEXT,
+    position INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    desc TEXT NOT NULL,
+    canon TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS docs_by_link ON docs(project, link_id);
+CREATE INDEX IF NOT EXISTS docs_by_canon ON docs(canon);
+CREATE TABLE IF NOT EXISTS postings (
+    token TEXT NOT NULL,
+    doc INTEGER NOT NULL,
+    PRIMARY KEY (token, doc)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_by_doc ON postings(doc);
+CREATE TABLE IF NOT EXISTS hosts (
+    host TEXT NOT NULL,
+    doc INTEGER NOT NULL,
+    PRIMARY KEY (host, doc)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS hosts_by_doc ON hosts(doc);
+CREATE TABLE IF NOT EXISTS indexed (
+    project TEXT PRIMARY KEY,
+    modified REAL
+);
+"""
+
+_TOKEN_RE = re.compile(r"\w+")
+# Kommen in fast jeder URL vor und würden jede Suche verlangsamen
+_URL_NOISE = frozenset(("http", "https", "www", "html", "htm", "php"))
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+def link_tokens(url, desc):
+    tokens = set(tokenize(desc))
+    tokens.update(token for token in tokenize(url) if token not in _URL_NOISE)
+    return tokens
+
+
+def host_keys(url):
+    """Host der URL und alle übergeordneten Domains mit mindestens zwei Teilen."""
+    try:
+        host = urlsplit(url).hostname
+    except ValueError:
+        return []
+    if not host:
+        return []
+    parts = host.split('.')
+    if parts[0] == 'www' and len(parts) > 2:
+        parts = parts[1:]
+    return ['.'.join(parts[i:]) for i in range(max(len(parts) - 1, 1))]
+
+
+class SearchIndex:
+    """Suchindex über alle Projekte eines Speichers.
+
+    Alle Methoden laufen im I/O-Thread (eine Verbindung pro Thread). Aktualisiert
+    wird projektweise (sync_projects bei geänderter Änderungszeit) oder per
+    Speicher-Delta (index_saved_project), gesucht mit search().
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        conn = self._connection()
+        with conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                # Nur ein Cache: alte Tabellen verwerfen, sync_projects baut neu auf
+                for table in ('docs', 'postings', 'hosts', 'indexed'):
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.executescript(SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # --- Pflege ---
+    def _add_doc(self, conn, project_name, position, link):
+        url = str(link.get('url', ''))
+        desc = str(link.get('desc', ''))
+        link_id = link.get(LINK_ID_KEY)
+        doc = conn.execute("INSERT INTO docs(project, link_id, position, url, desc, canon) VALUES (?, ?, ?, ?, ?, ?)",
+                           (project_name, link_id if isinstance(link_id, str) else None, position, url, desc,
+                            canonical_url(url))).lastrowid
+        conn.executemany("INSERT OR IGNORE INTO postings(token, doc) VALUES (?, ?)",
+                         ((token, doc) for token in link_tokens(url, desc)))
+        conn.executemany("INSERT OR IGNORE INTO hosts(host, doc) VALUES (?, ?)",
+                         ((host, doc) for host in host_keys(url)))
+
+    def _remove_docs(self, conn, where, params):
+        docs = [doc for (doc,) in conn.execute(f"SELECT doc FROM docs WHERE {where}", params)]
+        for start in range(0, len(docs), 500):
+            chunk = docs[start:start + 500]
+            marks = ','.join('?' * len(chunk))
+            conn.execute(f"DELETE FROM postings WHERE doc IN ({marks})", chunk)
+            conn.execute(f"DELETE FROM hosts WHERE doc IN ({marks})", chunk)
+            conn.execute(f"DELETE FROM docs WHERE doc IN ({marks})", chunk)
+
+    def _set_modified(self, conn, project_name, modified):
+        conn.execute("INSERT OR REPLACE INTO indexed(project, modified) VALUES (?, ?)", (project_name, modified))
+
+    def index_project(self, project_name, items, modified):
+        """Indiziert ein Projekt komplett neu aus seinen gespeicherten Elementen."""
+        conn = self._connection()
+        with conn:
+            self._remove_docs(conn, "project = ?", (project_name,))
+            position = 0
+            for i, item in enumerate(items):
+                link = clean_link(item, i, project_name)
+                if link is None:
+                    continue
+                self._add_doc(conn, project_name, position, link)
+                position += 1
+            self._set_modified(conn, project_name, modified)
+
+    def index_saved_project(self, project_name, links=None, ops=None, modified=None):
+        """Übernimmt einen gerade gespeicherten Stand (vollständig oder als Journal-Operationen)."""
+        if ops is None:
+            self.index_project(project_name, links, modified)
+            return
+        conn = self._connection()
+        with conn:
+            next_position = conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM docs WHERE project = ?",
+                                         (project_name,)).fetchone()[0]
+            for op in ops:
+                kind = op['op']
+                if kind == 'reset':
+                    self._remove_docs(conn, "project = ?", (project_name,))
+                    next_position = 0
+                    continue
+                link_id = op['link'][LINK_ID_KEY] if kind == 'put' else op['id']
+                row = conn.execute("SELECT position FROM docs WHERE project = ? AND link_id = ?",
+                                   (project_name, link_id)).fetchone()
+                self._remove_docs(conn, "project = ? AND link_id = ?", (project_name, link_id))
+                if kind == 'put':
+                    if row is None:
+                        position, next_position = next_position, next_position + 1
+                    else:
+                        position = row[0]
+                    self._add_doc(conn, project_name, position, op['link'])
+            self._set_modified(conn, project_name, modified)
+
+    def remove_project(self, project_name):
+        conn = self._connection()
+        with conn:
+            self._remove_docs(conn, "project = ?", (project_name,))
+            conn.execute("DELETE FROM indexed WHERE project = ?", (project_name,))
+
+    def indexed_projects(self):
+        """Namen aller Projekte, die im Index stehen."""
+        return [name for (name,) in self._connection().execute("SELECT project FROM indexed")]
+
+    def sync_projects(self, storage, project_infos):
+        """Bringt den Index auf den Stand des Projektkatalogs; gibt die Zahl neu indizierter Projekte zurück."""
+        conn = self._connection()
+        indexed = dict(conn.execute("SELECT project, modified FROM indexed"))
+        current = set()
+        updated = 0
+        for info in project_infos:
+            current.add(info.name)
+            if info.modified is not None and indexed.get(info.name) == info.modified:
+                continue
+            try:
+                self.index_project(info.name, storage.iter_links(info.name), info.modified)
+            except (OSError, ValueError) as e:
+                print(f"Warnung: Projekt '{info.name}' konnte nicht indiziert werden: {e}")
+                continue
+            updated += 1
+        for project_name in indexed:
+            if project_name not in current:
+                self.remove_project(project_name)
+        return updated
+
+    # --- Suche ---
+    def find_url(self, canonical, exclude_project=None, limit=5):
+        """Links mit derselben normalisierten URL (siehe url_index.canonical_url) in anderen Projekten."""
+        rows = self._connection().execute(
+            "SELECT project, link_id, position, url, desc FROM docs WHERE canon = ? AND project IS NOT ? LIMIT ?",
+            (canonical, exclude_project, limit))
+        return [(project, {'url': url, 'desc': desc, LINK_ID_KEY: link_id, 'position': position})
+                for project, link_id, position, url, desc in rows]
+
+    def search(self, text, project_name=None, limit=DEFAULT_LIMIT):
+        """Liefert (Projekt, Link)-Paare; Links enthalten zusätzlich 'position'."""
+        subqueries = []
+        params = []
+        for term in text.lower().split():
+            if term.startswith(SITE_PREFIX) and len(term) > len(SITE_PREFIX):
+                host = term[len(SITE_PREFIX):]
+                if host.startswith('www.'):
+                    host = host[4:]
+                subqueries.append("SELECT doc FROM hosts WHERE host = ?")
+                params.append(host)
+                continue
+            for token in tokenize(term):
+                # Präfixsuche als Bereichsabfrage auf dem Primärschlüssel
+                subqueries.append("SELECT doc FROM postings WHERE token >= ? AND token < ?")
+                params += [token, token + '\uffff']
+        if not subqueries:
+            return []
+        sql = ("SELECT project, link_id, position, url, desc FROM docs WHERE doc IN ("
+               + " INTERSECT ".join(subqueries) + ")")
+        if project_name is not None:
+            sql += " AND project = ?"
+            params.append(project_name)
+        sql += " ORDER BY project, position LIMIT ?"
+        params.append(limit)
+        results = []
+        for project, link_id, position, url, desc in self._connection().execute(sql, params):
+            results.append((project, {'url': url, 'desc': desc, LINK_ID_KEY: link_id, 'position': position}))
+        return results
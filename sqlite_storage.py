@@ -0,0 +1,333 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from instrumentation import span
+from link_model import LINK_ID_KEY, new_link_id
+from project_journal import check_item_range, iter_project_items
+from project_loader import clean_link
+from project_catalog import ProjectInfo
+from project_storage import PROJECT_FILE_EXTENSION, ProjectStorage
+from url_index import canonical_url
+
+# --- SQLite-Projektspeicher ---
+# Eine Datenbankdatei für alle Projekte (WAL-Modus), Links als einzelne Zeilen,
+# Volltextsuche über Beschreibung und URL mit FTS5 (falls in sqlite3 verfügbar).
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS projects (
+    name TEXT PRIMARY KEY,
+    modified REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS links (
+    project TEXT NOT NULL REFERENCES projects(name) ON DELETE CASCADE,
+    id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    desc TEXT NOT NULL,
+    extra TEXT,
+    canon TEXT,
+    PRIMARY KEY (project, id)
+);
+CREATE INDEX IF NOT EXISTS links_by_position ON links(project, position);
+CREATE TABLE IF NOT EXISTS json_migration (
+    filename TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    links INTEGER NOT NULL
+);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS links_fts USING fts5(
+    desc, url, content='links', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS links_fts_insert AFTER INSERT ON links BEGIN
+    INSERT INTO links_fts(rowid, desc, url) VALUES (new.rowid, new.desc, new.url);
+END;
+CREATE TRIGGER IF NOT EXISTS links_fts_delete AFTER DELETE ON links BEGIN
+    INSERT INTO links_fts(links_fts, rowid, desc, url) VALUES ('delete', old.rowid, old.desc, old.url);
+END;
+CREATE TRIGGER IF NOT EXISTS links_fts_update AFTER UPDATE OF desc, url ON links BEGIN
+    INSERT INTO links_fts(links_fts, rowid, desc, url) VALUES ('delete', old.rowid, old.desc, old.url);
+    INSERT INTO links_fts(rowid, desc, url) VALUES (new.rowid, new.desc, new.url);
+END;
+"""
+
+_BASE_FIELDS = (LINK_ID_KEY, 'url', 'desc')
+INSERT_LINK = "INSERT INTO links(project, id, position, url, desc, extra, canon) VALUES (?, ?, ?, ?, ?, ?, ?)"
+PROGRESS_EVERY = 5000
+
+
+def _link_row(project_name, position, link):
+    extra = {k: v for k, v in link.items() if k not in _BASE_FIELDS}
+    url = str(link.get('url', ''))
+    return (project_name, link[LINK_ID_KEY], position, url, str(link.get('desc', '')),
+            json.dumps(extra, ensure_ascii=False) if extra else None, canonical_url(url))
+
+
+def _row_link(link_id, url, desc, extra):
+    link = {'url': url, 'desc': desc}
+    if extra:
+        link.update(json.loads(extra))
+    link[LINK_ID_KEY] = link_id
+    return link
+
+
+def _fts_query(text):
+    # Jedes Wort als Präfix-Suche, alle Wörter müssen vorkommen
+    terms = ['"' + term.replace('"', '""') + '"*' for term in text.split()]
+    return ' '.join(terms)
+
+
+class SqliteStorage(ProjectStorage):
+    """Alle Projekte in einer SQLite-Datenbank mit Zeilen-Updates und FTS5-Index."""
+
+    incremental = True
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()  # eine Verbindung pro Thread
+        self.has_fts = True
+        conn = self._connection()
+        with conn:
+            conn.executescript(SCHEMA)
+            self._add_canon_column(conn)
+            try:
+                conn.executescript(FTS_SCHEMA)
+            except sqlite3.OperationalError:
+                self.has_fts = False # sqlite3 ohne FTS5: Suche fällt auf LIKE zurück
+
+    def _add_canon_column(self, conn):
+        # Datenbanken von vor der Duplikaterkennung: normalisierte URLs nachtragen
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(links)")]
+        if 'canon' not in columns:
+            conn.execute("ALTER TABLE links ADD COLUMN canon TEXT")
+            rows = conn.execute("SELECT rowid, url FROM links").fetchall()
+            conn.executemany("UPDATE links SET canon = ? WHERE rowid = ?",
+                             ((canonical_url(url), rowid) for rowid, url in rows))
+        conn.execute("CREATE INDEX IF NOT EXISTS links_by_canon ON links(canon)")
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def location(self, project_name):
+        return f"{self.db_path}#{project_name}"
+
+    def list_projects(self):
+        rows = self._connection().execute("SELECT name FROM projects ORDER BY name").fetchall()
+        return [name for (name,) in rows]
+
+    def list_project_infos(self):
+        with span('list') as measure:
+            rows = self._connection().execute(
+                "SELECT p.name, COUNT(l.id), p.modified FROM projects p LEFT JOIN links l ON l.project = p.name "
+                "GROUP BY p.name ORDER BY p.name").fetchall()
+            measure.add(items=len(rows))
+            return [ProjectInfo(*row) for row in rows]
+
+    def exists(self, project_name):
+        row = self._connection().execute("SELECT 1 FROM projects WHERE name = ?", (project_name,)).fetchone()
+        return row is not None
+
+    def modified(self, project_name):
+        row = self._connection().execute("SELECT modified FROM projects WHERE name = ?", (project_name,)).fetchone()
+        return row[0] if row is not None else None
+
+    def link_count(self, project_name):
+        row = self._connection().execute("SELECT COUNT(*) FROM links WHERE project = ?", (project_name,)).fetchone()
+        return row[0]
+
+    def iter_links(self, project_name, on_progress=None):
+        conn = self._connection()
+        if not self.exists(project_name):
+            raise FileNotFoundError(self.location(project_name))
+        total = self.link_count(project_name) if on_progress is not None else 0
+        cursor = conn.execute(
+            "SELECT id, url, desc, extra FROM links WHERE project = ? ORDER BY position", (project_name,))
+        return self._iter_rows(cursor, total, on_progress)
+
+    def read_items(self, project_name, start, stop=None):
+        check_item_range(start, stop)
+        if not self.exists(project_name):
+            raise FileNotFoundError(self.location(project_name))
+        limit = -1 if stop is None else max(0, stop - start)
+        cursor = self._connection().execute(
+            "SELECT id, url, desc, extra FROM links WHERE project = ? ORDER BY position LIMIT ? OFFSET ?",
+            (project_name, limit, start))
+        return [_row_link(*row) for row in cursor]
+
+    def _iter_rows(self, cursor, total, on_progress):
+        done = 0
+        for row in cursor:
+            yield _row_link(*row)
+            done += 1
+            if on_progress is not None and done % PROGRESS_EVERY == 0:
+                on_progress(done, total)
+        if on_progress is not None:
+            on_progress(done, total)
+
+    def save(self, project_name, links=None, ops=None):
+        conn = self._connection()
+        with span('save', project=project_name) as measure, conn:
+            measure.add(items=len(links) if ops is None else len(ops))
+            conn.execute("INSERT INTO projects(name, modified) VALUES (?, ?) "
+                         "ON CONFLICT(name) DO UPDATE SET modified = excluded.modified",
+                         (project_name, time.time()))
+            if ops is None:
+                conn.execute("DELETE FROM links WHERE project = ?", (project_name,))
+                conn.executemany(INSERT_LINK, (_link_row(project_name, i, link) for i, link in enumerate(links)))
+            else:
+                self._apply_ops(conn, project_name, ops)
+        return False
+
+    def _apply_ops(self, conn, project_name, ops):
+        next_position = conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM links WHERE project = ?",
+                                     (project_name,)).fetchone()[0]
+        for op in ops:
+            kind = op['op']
+            if kind == 'put':
+                link = op['link']
+                row = _link_row(project_name, next_position, link)
+                cursor = conn.execute("UPDATE links SET url = ?, desc = ?, extra = ?, canon = ? WHERE project = ? AND id = ?",
+                                      (row[3], row[4], row[5], row[6], project_name, link[LINK_ID_KEY]))
+                if cursor.rowcount == 0:
+                    conn.execute(INSERT_LINK, row)
+                    next_position += 1
+            elif kind == 'del':
+                conn.execute("DELETE FROM links WHERE project = ? AND id = ?", (project_name, op['id']))
+            elif kind == 'reset':
+                conn.execute("DELETE FROM links WHERE project = ?", (project_name,))
+                next_position = 0
+
+    def compact(self, project_name):
+        # WAL gelegentlich in die Datenbank zurückschreiben
+        self._connection().execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def delete(self, project_name):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM links WHERE project = ?", (project_name,))
+            cursor = conn.execute("DELETE FROM projects WHERE name = ?", (project_name,))
+        return cursor.rowcount > 0
+
+    # --- Suchindex: FTS5-Tabelle wird per Trigger gepflegt, die Pflege-Aufrufe entfallen ---
+    def open_search_index(self):
+        return self
+
+    def sync_projects(self, storage, project_infos):
+        return 0
+
+    def index_saved_project(self, project_name, links=None, ops=None, modified=None):
+        pass
+
+    def remove_project(self, project_name):
+        pass
+
+    def find_url(self, canonical, exclude_project=None, limit=5):
+        rows = self._connection().execute(
+            "SELECT project, id, url, desc, extra FROM links WHERE canon = ? AND project IS NOT ? LIMIT ?",
+            (canonical, exclude_project, limit))
+        return [(row[0], _row_link(*row[1:])) for row in rows]
+
+    def search(self, text, project_name=None, limit=200):
+        """Volltextsuche über Beschreibung und URL; liefert (Projekt, Link)-Paare."""
+        conn = self._connection()
+        if not text.strip():
+            return []
+        if self.has_fts:
+            sql = ("SELECT l.project, l.id, l.url, l.desc, l.extra FROM links_fts "
+                   "JOIN links l ON l.rowid = links_fts.rowid WHERE links_fts MATCH ?")
+            params = [_fts_query(text)]
+        else:
+            sql = "SELECT l.project, l.id, l.url, l.desc, l.extra FROM links l WHERE 1"
+            params = []
+            for term in text.split():
+                sql += " AND (l.desc LIKE ? OR l.url LIKE ?)"
+                params += [f"%{term}%", f"%{term}%"]
+        if project_name is not None:
+            sql += " AND l.project = ?"
+            params.append(project_name)
+        if self.has_fts:
+            sql += " ORDER BY links_fts.rank"
+        sql += " LIMIT ?"
+        params.append(limit)
+        return [(row[0], _row_link(*row[1:])) for row in conn.execute(sql, params)]
+
+    # --- Migration aus dem JSON-Projektverzeichnis ---
+    def json_migration_complete(self):
+        row = self._connection().execute("SELECT value FROM meta WHERE key = 'json_migration'").fetchone()
+        return row is not None and row[0] == 'complete'
+
+    def migrate_json_directory(self, project_dir, on_progress=None):
+        """Importiert alle <name>.json-Projekte (inkl. Journal) in die Datenbank.
+
+        Jede Datei wird in einer eigenen Transaktion übernommen und in
+        json_migration vermerkt; ein abgebrochener Lauf setzt beim nächsten
+        Aufruf mit der ersten noch nicht importierten Datei fort. Projekte, die
+        es in der Datenbank schon unabhängig von der Migration gibt, werden
+        nicht überschrieben. Gibt (importiert, übersprungen, fehlgeschlagen) zurück.
+        """
+        conn = self._connection()
+        filenames = sorted(f for f in os.listdir(project_dir) if f.endswith(PROJECT_FILE_EXTENSION))
+        done = {name: (mtime, size) for name, mtime, size
+                in conn.execute("SELECT filename, mtime, size FROM json_migration")}
+        imported = skipped = failed = 0
+        for number, filename in enumerate(filenames, 1):
+            filepath = os.path.join(project_dir, filename)
+            project_name = os.path.splitext(filename)[0]
+            try:
+                stat = os.stat(filepath)
+                if filename in done or self.exists(project_name):
+                    skipped += 1
+                else:
+                    self._import_json_file(conn, filepath, filename, project_name, stat)
+                    imported += 1
+            except (OSError, ValueError) as e:
+                print(f"Warnung: Migration von {filepath} fehlgeschlagen: {e}")
+                failed += 1
+            if on_progress is not None:
+                on_progress(number, len(filenames))
+        if not failed:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES ('json_migration', 'complete')")
+        return imported, skipped, failed
+
+    def _import_json_file(self, conn, filepath, filename, project_name, stat):
+        seen = set()
+
+        def rows():
+            for i, item in enumerate(iter_project_items(filepath)):
+                link = clean_link(item, i, filepath)
+                if link is None:
+                    continue
+                link_id = link.get(LINK_ID_KEY)
+                if not isinstance(link_id, str) or not link_id or link_id in seen:
+                    link_id = link[LINK_ID_KEY] = new_link_id()
+                seen.add(link_id)
+                yield _link_row(project_name, len(seen) - 1, link)
+
+        with conn:
+            conn.execute("INSERT INTO projects(name, modified) VALUES (?, ?)", (project_name, stat.st_mtime))
+            conn.executemany(INSERT_LINK, rows())
+            conn.execute("INSERT OR REPLACE INTO json_migration(filename, mtime, size, links) VALUES (?, ?, ?, ?)",
+                         (filename, stat.st_mtime, stat.st_size, len(seen)))
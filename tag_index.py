@@ -0,0 +1,320 @@
+import re
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from link_model import COLLECTION_KEY, COLLECTION_SEPARATOR, LINK_ID_KEY, TAGS_KEY, normalize_tags, parse_collection, parse_tags
+
+# --- Tags und Sammlungen: Bitmap-Index ---
+# Jeder Link bekommt eine Bitnummer (Slot), jeder Tag und jede Sammlung eine
+# Bitmap als Python-int. UND, ODER und NICHT sind damit &, | und & ~ über ganze
+# Bitmaps, Facettenzahlen ein popcount der Schnittmenge, ohne die Links selbst
+# anzusehen. Sammlungen sind verschachtelt: ein Link in "Arbeit/Recherche"
+# zählt auch zu "Arbeit".
+#
+# Filtersyntax (im Filterfeld der Projektseite, neben gewöhnlichen Suchbegriffen):
+#   #tag          hat den Tag                 -#tag    hat ihn nicht
+#   #a|b          hat a oder b
+#   @Pfad         liegt in der Sammlung (oder darunter), -@Pfad  nicht
+#   @"Pfad mit Leerzeichen"
+
+TAG_PREFIX = '#'
+COLLECTION_PREFIX = '@'
+# Gelöschte Links hinterlassen freie Slots; ab so vielen (und mehr als belegten) wird neu nummeriert
+FREE_SLOT_LIMIT = 4096
+# Wartende Links werden in Blöcken dieser Größe eingetragen (zwischen zwei Blöcken wird die Frist geprüft)
+PENDING_BATCH = 4096
+
+_LABEL_TERM_RE = re.compile(r'(?:^|(?<=\s))(-?)([#@])("[^"]*"|\S+)')
+_NONZERO_RUN_RE = re.compile(rb'[^\x00]+')
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+
+try:
+    _popcount = int.bit_count  # ab Python 3.10
+except AttributeError:
+    def _popcount(bitmap):
+        return bin(bitmap).count('1')
+
+
+def label_keys(link):
+    """Indexschlüssel eines Links: '#tag' je Tag, '@Pfad' für die Sammlung und jede übergeordnete."""
+    tags = link.get(TAGS_KEY)
+    collection = link.get(COLLECTION_KEY)
+    if not tags and not collection:
+        return ()
+    keys = tuple([TAG_PREFIX + tag for tag in normalize_tags(tags)])
+    if collection and isinstance(collection, str):
+        keys += _collection_keys(collection)
+    return keys
+
+
+@lru_cache(maxsize=4096)
+def _collection_keys(collection):
+    path = parse_collection(collection)
+    if not path:
+        return ()
+    parts = path.split(COLLECTION_SEPARATOR)
+    return tuple(COLLECTION_PREFIX + COLLECTION_SEPARATOR.join(parts[:depth]) for depth in range(1, len(parts) + 1))
+
+
+def parse_label_query(text):
+    """Trennt Tag- und Sammlungsbedingungen vom übrigen Filtertext.
+
+    Gibt (Abfrage, Resttext) zurück. Die Abfrage ist ein Tupel von Klauseln
+    (negiert, Schlüssel); eine Klausel passt, wenn einer ihrer Schlüssel passt
+    (bzw. keiner, wenn negiert), und alle Klauseln müssen passen.
+    """
+    clauses = []
+
+    def take(match):
+        negated, prefix, value = match.groups()
+        value = value.strip('"')
+        if prefix == TAG_PREFIX:
+            keys = [TAG_PREFIX + tag for tag in parse_tags(value.replace('|', ','))]
+        else:
+            paths = (parse_collection(part.lstrip(COLLECTION_PREFIX)) for part in value.split('|'))
+            keys = [COLLECTION_PREFIX + path for path in paths if path]
+        if keys:
+            clauses.append((bool(negated), tuple(keys)))
+        return ' '
+
+    rest = _LABEL_TERM_RE.sub(take, text)
+    return tuple(clauses), rest
+
+
+def query_matches(query, keys):
+    """Passt ein Link mit den Schlüsseln `keys` (siehe label_keys) auf `query`?"""
+    return all(negated != any(key in keys for key in clause) for negated, clause in query)
+
+
+def label_term(key):
+    """Filterbegriff für einen Schlüssel ('#tag' bzw. '@Pfad', Pfade mit Leerzeichen in Anführungszeichen)."""
+    if key.startswith(COLLECTION_PREFIX) and re.search(r'\s', key):
+        return f'{COLLECTION_PREFIX}"{key[1:]}"'
+    return key
+
+
+def toggle_label_term(text, key):
+    """Nimmt den Filterbegriff für `key` in den Filtertext auf bzw. entfernt ihn wieder."""
+    term = label_term(key)
+    pattern = re.compile(r'(?:^|\s+)' + re.escape(term) + r'(?=\s|$)')
+    if pattern.search(text):
+        return pattern.sub('', text).strip()
+    return f"{text.rstrip()} {term}".lstrip()
+
+
+def describe_labels(link):
+    """Tags und Sammlung eines Links in Filtersyntax, z.B. '#python #doku @Arbeit/Recherche'."""
+    terms = [TAG_PREFIX + tag for tag in normalize_tags(link.get(TAGS_KEY))]
+    collection = link.get(COLLECTION_KEY)
+    if collection and isinstance(collection, str):
+        path = parse_collection(collection)
+        if path:
+            terms.append(label_term(COLLECTION_PREFIX + path))
+    return ' '.join(terms)
+
+
+def bitmap_from_slots(slots):
+    if not slots:
+        return 0
+    data = bytearray((max(slots) >> 3) + 1)
+    for slot in slots:
+        data[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(data, 'little')
+
+
+def slots_of(bitmap):
+    """Die gesetzten Bits einer Bitmap, aufsteigend (Nullbytes werden übersprungen)."""
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) >> 3, 'little')
+    slots = []
+    append = slots.append
+    for run in _NONZERO_RUN_RE.finditer(data):
+        base = run.start() << 3
+        for byte in run.group():
+            for bit in _BYTE_BITS[byte]:
+                append(base + bit)
+            base += 8
+    return slots
+
+
+class TagIndex:
+    """Bitmap-Index über die Tags und Sammlungen der Links eines Projekts.
+
+    Neue Links warten wie im LinkFilterIndex, bis index_pending() sie
+    blockweise einträgt; die Bitmaps entstehen erst, wenn nichts mehr wartet,
+    einmal pro Schlüssel. Eine einzelne Änderung kostet danach wenige
+    int-Operationen pro betroffenem Schlüssel. Abfragen liefern Bitmaps,
+    ids() macht daraus Link-IDs. Slots werden in der Reihenfolge des Hinzufügens
+    vergeben; `ordered` bleibt True, solange das der Listenreihenfolge entspricht
+    (der Aufrufer setzt es zurück, wenn ein Link nicht am Ende eingefügt wird).
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._bitmaps = {}    # Schlüssel -> Bitmap
+        self._link_keys = {}  # Link-ID -> Schlüssel beim Eintragen
+        self._slots = {}      # Link-ID -> Slot
+        self._slot_ids = []   # Slot -> Link-ID (None = frei)
+        self._free = 0
+        self._all = 0         # Bitmap aller eingetragenen Links
+        self._pending = OrderedDict()  # Link-ID -> Link, noch nicht eingetragen
+        self._staged = {}     # Schlüssel -> Slots, eingetragen, aber noch nicht in der Bitmap
+        self._staged_from = None
+        self.ordered = True
+
+    def __len__(self):
+        return len(self._slots) + len(self._pending)
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    # --- Pflege ---
+    def add(self, link):
+        link_id = link[LINK_ID_KEY]
+        if link_id in self._slots:
+            self.update(link)
+        else:
+            self._pending[link_id] = link
+
+    def update(self, link):
+        link_id = link[LINK_ID_KEY]
+        self._materialize()
+        old_keys = self._link_keys.get(link_id)
+        if old_keys is None:
+            self._pending[link_id] = link
+            return
+        keys = label_keys(link)
+        if keys == old_keys:
+            return
+        bit = 1 << self._slots[link_id]
+        for key in set(old_keys).difference(keys):
+            self._clear(key, bit)
+        for key in set(keys).difference(old_keys):
+            self._bitmaps[key] = self._bitmaps.get(key, 0) | bit
+        self._link_keys[link_id] = keys
+
+    def remove(self, link_id):
+        if self._pending.pop(link_id, None) is not None:
+            return
+        slot = self._slots.pop(link_id, None)
+        if slot is None:
+            return
+        self._materialize()
+        bit = 1 << slot
+        for key in self._link_keys.pop(link_id):
+            self._clear(key, bit)
+        self._all &= ~bit
+        self._slot_ids[slot] = None
+        self._free += 1
+        if self._free > FREE_SLOT_LIMIT and self._free > len(self._slots):
+            self._renumber()
+
+    def _clear(self, key, bit):
+        bitmap = self._bitmaps[key] & ~bit
+        if bitmap:
+            self._bitmaps[key] = bitmap
+        else:
+            del self._bitmaps[key]
+
+    def _renumber(self):
+        # Freie Slots entfernen: alle Links mit neuen, lückenlosen Nummern neu eintragen
+        link_keys = self._link_keys
+        ids = [link_id for link_id in self._slot_ids if link_id is not None]
+        pending = self._pending
+        ordered = self.ordered  # die Slots behalten ihre Reihenfolge, also auch deren Verhältnis zur Liste
+        self.reset()
+        self._enter([(link_id, link_keys[link_id]) for link_id in ids])
+        self._materialize()
+        self._pending = pending
+        self.ordered = ordered
+
+    def index_pending(self, deadline=None):
+        """Trägt wartende Links ein (bis `deadline`, perf_counter); True, wenn nichts mehr wartet."""
+        pending = self._pending
+        while pending:
+            batch = []
+            while pending and len(batch) < PENDING_BATCH:
+                link_id, link = pending.popitem(last=False)
+                batch.append((link_id, label_keys(link)))
+            self._enter(batch)
+            if pending and deadline is not None and time.perf_counter() >= deadline:
+                return False
+        self._materialize()
+        return True
+
+    def _enter(self, entries):
+        # Slots vergeben und pro Schlüssel sammeln; die Bitmaps baut _materialize()
+        slot = len(self._slot_ids)
+        if self._staged_from is None:
+            self._staged_from = slot
+        staged = self._staged
+        for link_id, keys in entries:
+            self._slots[link_id] = slot
+            self._slot_ids.append(link_id)
+            self._link_keys[link_id] = keys
+            for key in keys:
+                slots = staged.get(key)
+                if slots is None:
+                    staged[key] = [slot]
+                else:
+                    slots.append(slot)
+            slot += 1
+
+    def _materialize(self):
+        if self._staged_from is None:
+            return
+        first, end = self._staged_from, len(self._slot_ids)
+        self._all |= ((1 << (end - first)) - 1) << first
+        bitmaps = self._bitmaps
+        for key, slots in self._staged.items():
+            bitmaps[key] = bitmaps.get(key, 0) | bitmap_from_slots(slots)
+        self._staged = {}
+        self._staged_from = None
+
+    # --- Abfragen ---
+    def match(self, query):
+        """Bitmap der Links, auf die `query` (siehe parse_label_query) passt."""
+        self.index_pending()
+        result = self._all
+        bitmaps = self._bitmaps
+        for negated, keys in query:
+            bitmap = 0
+            for key in keys:
+                bitmap |= bitmaps.get(key, 0)
+            result = result & ~bitmap if negated else result & bitmap
+            if not result:
+                break
+        return result
+
+    def all_links(self):
+        self.index_pending()
+        return self._all
+
+    def ids(self, bitmap):
+        """Link-IDs einer Bitmap (in Slot-, nicht in Listenreihenfolge)."""
+        slot_ids = self._slot_ids
+        return [slot_ids[slot] for slot in slots_of(bitmap)]
+
+    def bitmap_of(self, link_ids):
+        self.index_pending()
+        slots = self._slots
+        return bitmap_from_slots([slots[link_id] for link_id in link_ids if link_id in slots])
+
+    def facets(self, bitmap=None):
+        """{Schlüssel: Anzahl} aller Tags und Sammlungen innerhalb von `bitmap` (None = alle Links)."""
+        self.index_pending()
+        if bitmap is None:
+            return {key: _popcount(value) for key, value in self._bitmaps.items()}
+        counts = {}
+        for key, value in self._bitmaps.items():
+            count = _popcount(value & bitmap)
+            if count:
+                counts[key] = count
+        return counts
+
+    @staticmethod
+    def count(bitmap):
+        return _popcount(bitmap)
@@ -0,0 +1,173 @@
+"""Linkprüfung gegen einen lokalen HTTP-Server (http.server auf 127.0.0.1).
+
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from link_checker import LinkCheckCache, LinkStatus, check_links, is_broken  # noqa: E402
+
+SLOW_SECONDS = 1.0
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _answer(self, status, headers=(), body=b''):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _handle(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.command, self.path))
+            server.hits[self.path] = hits = server.hits.get(self.path, 0) + 1
+        if self.path == '/ok':
+            self._answer(200, body=b'ok')
+        elif self.path == '/redirect':
+            self._answer(301, [('Location', '/ok')])
+        elif self.path == '/missing':
+            self._answer(404, body=b'nicht da')
+        elif self.path == '/no-head':
+            if self.command == 'HEAD':
+                self._answer(405, [('Allow', 'GET')])
+            else:
+                self._answer(200, body=b'nur GET')
+        elif self.path == '/busy':
+            # Erst beim zweiten Versuch erreichbar (Tests können den Zähler vorbelegen)
+            if hits <= 1:
+                self._answer(503, [('Retry-After', '0')])
+            else:
+                self._answer(200)
+        elif self.path == '/slow':
+            time.sleep(SLOW_SECONDS)
+            self._answer(200)
+        else:
+            self._answer(500)
+
+    do_HEAD = _handle
+    do_GET = _handle
+
+
+class LinkCheckerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = _Server(('127.0.0.1', 0), _Handler)
+        cls.server.lock = threading.Lock()
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.requests = []
+        self.server.hits = {}
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = LinkCheckCache(os.path.join(self.directory.name, 'cache.json'))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def check(self, *paths, **options):
+        options.setdefault('timeout', 5.0)
+        options.setdefault('backoff', 0.0)
+        results = check_links([self.base + path for path in paths], self.cache, **options)
+        return [results[self.base + path] for path in paths]
+
+    def test_ok(self):
+        result, = self.check('/ok')
+        self.assertEqual(result.status, 200)
+        self.assertIsNone(result.redirect)
+        self.assertFalse(is_broken(result))
+
+    def test_redirect(self):
+        result, = self.check('/redirect')
+        self.assertEqual(result.status, 200)
+        self.assertEqual(result.redirect, self.base + '/ok')
+        self.assertFalse(is_broken(result))
+
+    def test_not_found(self):
+        result, = self.check('/missing')
+        self.assertEqual(result.status, 404)
+        self.assertTrue(is_broken(result))
+
+    def test_head_rejected_falls_back_to_get(self):
+        result, = self.check('/no-head')
+        self.assertEqual(result.status, 200)
+        self.assertEqual(self.server.requests, [('HEAD', '/no-head'), ('GET', '/no-head')])
+
+    def test_retry_after(self):
+        # Retry-After: 0 ersetzt die (hier lange) Wartezeit zwischen den Versuchen
+        started = time.perf_counter()
+        result, = self.check('/busy', retries=2, backoff=30.0)
+        self.assertEqual(result.status, 200)
+        self.assertEqual(self.server.hits['/busy'], 2)
+        self.assertLess(time.perf_counter() - started, 10.0)
+
+    def test_retry_gives_up(self):
+        self.server.hits['/busy'] = -5  # bleibt für alle Versuche bei 503
+        result, = self.check('/busy', retries=1)
+        self.assertEqual(result.status, 503)
+        self.assertTrue(is_broken(result))
+
+    def test_timeout(self):
+        result, = self.check('/slow', timeout=SLOW_SECONDS / 4, retries=0)
+        self.assertIsNone(result.status)
+        self.assertEqual(result.error, "Zeitüberschreitung")
+        self.assertTrue(is_broken(result))
+
+    def test_cache_reused_within_ttl(self):
+        first, = self.check('/ok')
+        self.assertEqual(len(self.server.requests), 1)
+        second, = self.check('/ok')
+        self.assertEqual(second, first)
+        self.assertEqual(len(self.server.requests), 1)
+        # Gespeichert und neu geladen gilt der Eintrag weiterhin
+        self.cache.save()
+        self.cache = LinkCheckCache(self.cache.path)
+        self.cache.load()
+        self.check('/ok')
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_cache_expires(self):
+        url = self.base + '/ok'
+        self.cache.put(url, LinkStatus(200, None, 0.01, None, time.time() - 2))
+        self.cache.ok_ttl = 1
+        result, = self.check('/ok')
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertGreater(result.checked, time.time() - 60)
+
+    def test_force_ignores_cache(self):
+        self.check('/ok')
+        self.check('/ok', force=True)
+        self.assertEqual(len(self.server.requests), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+"""Massenimport: Projektnamen aus Lesezeichenordnern.
+
+    python -m pytest tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from link_import import LinkImporter  # noqa: E402
+from linkmem_core import DEFAULT_PROJECT_NAME  # noqa: E402
+from project_storage import JsonDirectoryStorage  # noqa: E402
+
+BOOKMARKS = """<!DOCTYPE NETSCAPE-Bookmark-file-1>
+<DL><p>
+<DT><H3>a/b</H3>
+<DL><p><DT><A HREF="https://example.org/1">eins</A></DL><p>
+<DT><H3>..</H3>
+<DL><p><DT><A HREF="https://example.org/2">zwei</A></DL><p>
+<DT><H3>Reisen</H3>
+<DL><p>
+<DT><H3>Asien?</H3>
+<DL><p><DT><A HREF="https://example.org/3">drei</A></DL><p>
+</DL><p>
+</DL><p>
+"""
+
+
+class FolderProjectNameTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.project_dir = os.path.join(self.directory.name, 'projekte')
+        os.makedirs(self.project_dir)
+        self.filepath = os.path.join(self.directory.name, 'lesezeichen.html')
+        with open(self.filepath, 'w', encoding='utf-8') as f:
+            f.write(BOOKMARKS)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_default_names_are_sanitized(self):
+        storage = JsonDirectoryStorage(self.project_dir)
+        importer = LinkImporter(storage, self.filepath, 'Import')
+        importer.run()
+        (kind, counts, duplicates, invalid), = importer.poll()
+        self.assertEqual(kind, 'done')
+        self.assertEqual(counts, {'ab': 1, DEFAULT_PROJECT_NAME: 1, 'Reisen - Asien': 1})
+        # Nichts außerhalb des Projektverzeichnisses angelegt
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ['lesezeichen.html', 'projekte'])
+        self.assertEqual(sorted(storage.list_projects()), sorted(counts))
+
+
+if __name__ == '__main__':
+    unittest.main()
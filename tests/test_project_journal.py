@@ -0,0 +1,67 @@
+"""Journal-Projektformat: Anhängen nach einem Absturz mitten im Schreiben.
+
+    python -m pytest tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from project_journal import (TAIL_SCAN_BYTES, delete_op, journal_path_for, put_op, read_journal,  # noqa: E402
+                             reset_op)
+from project_storage import JsonDirectoryStorage  # noqa: E402
+
+
+def _link(link_id):
+    return {'url': f"https://example.org/{link_id}", 'desc': link_id, 'id': link_id}
+
+
+class TornJournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.storage = JsonDirectoryStorage(self.directory.name, use_journal=True)
+        self.storage.save('p', links=[_link('a'), _link('b'), _link('c')])
+        self.storage.save('p', ops=[put_op(_link('x'))])  # Journal anlegen
+        self.journal = journal_path_for(self.storage.location('p'))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def tear(self, text='{"op": "put", "link": {"id": "d"'):
+        with open(self.journal, 'a', encoding='utf-8') as f:
+            f.write(text)
+
+    def ids(self):
+        return [link['id'] for link in self.storage.iter_links('p')]
+
+    def test_append_after_torn_tail(self):
+        self.tear()
+        self.storage.save('p', ops=[delete_op('a')])
+        self.assertEqual(self.ids(), ['b', 'c', 'x'])
+        with open(self.journal, 'rb') as f:
+            self.assertTrue(f.read().endswith(b'\n'))
+        self.assertEqual(len(read_journal(self.journal)), 2)
+
+    def test_reset_after_torn_tail(self):
+        # Ein verlorenes reset brächte gelöschte Links zurück
+        self.tear()
+        self.storage.save('p', ops=[reset_op(), put_op(_link('b'))])
+        self.assertEqual(self.ids(), ['b'])
+
+    def test_torn_tail_longer_than_scan_block(self):
+        self.tear('{"op": "put", "link": {"id": "d", "desc": "' + 'y' * (3 * TAIL_SCAN_BYTES))
+        self.storage.save('p', ops=[delete_op('b')])
+        self.assertEqual(self.ids(), ['a', 'c', 'x'])
+
+    def test_journal_only_torn_line(self):
+        os.remove(self.journal)
+        self.tear()
+        self.storage.save('p', ops=[delete_op('c')])
+        self.assertEqual(self.ids(), ['a', 'b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+"""Duplikate zusammenführen über alle Projekte.
+
+    python -m pytest tests
+"""
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from project_storage import JsonDirectoryStorage  # noqa: E402
+from url_index import merge_duplicate_links  # noqa: E402
+
+
+class MergeDuplicatesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.storage = JsonDirectoryStorage(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, project_name, items):
+        with open(self.storage.location(project_name), 'w', encoding='utf-8') as f:
+            json.dump(items, f)
+
+    def read(self, project_name):
+        with open(self.storage.location(project_name), encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_invalid_items_are_kept(self):
+        self.write('p', [
+            {'url': 'https://example.org/', 'desc': 'https://example.org/', 'id': 'a'},
+            "kein Link",
+            {'desc': 'ohne URL'},
+            {'url': 'https://EXAMPLE.org', 'desc': 'Beispiel', 'id': 'b'},
+        ])
+        self.write('q', [{'url': 'https://example.org/', 'desc': 'x', 'id': 'c'}])
+
+        changed, removed, cross_project, invalid = merge_duplicate_links(self.storage)
+
+        self.assertEqual((changed, removed, cross_project, invalid), (1, 1, 1, 2))
+        self.assertEqual(self.read('p'), [
+            {'url': 'https://example.org/', 'desc': 'Beispiel', 'id': 'a'},
+            "kein Link",
+            {'desc': 'ohne URL'},
+        ])
+        self.assertEqual(len(self.read('q')), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import hashlib
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from link_model import LINK_ID_KEY
+from project_loader import clean_link
+
+# --- URL-Normalisierung und Duplikat-Index ---
+
+# Parameter, die nur der Nachverfolgung dienen und die Seite nicht ändern
+TRACKING_PARAMS = frozenset((
+    'fbclid', 'gclid', 'dclid', 'gbraid', 'wbraid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', '_hsenc', '_hsmi', 'mkt_tok', 'ref_src',
+))
+TRACKING_PREFIXES = ('utm_',)
+DEFAULT_PORTS = {'http': 80, 'https': 443, 'ftp': 21}
+
+
+def canonical_url(url):
+    """Vergleichsschlüssel einer URL für die Duplikaterkennung.
+
+    http und https gelten als gleich, Host in Kleinbuchstaben ohne "www." und
+    Standardport, Pfad ohne abschließenden Schrägstrich, Query-Parameter
+    sortiert und ohne Tracking-Parameter. Der Schlüssel ist keine aufrufbare URL.
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    if not parts.netloc:
+        return url if not scheme else scheme + url[len(scheme):]
+    host = parts.hostname or ''
+    if host.startswith('www.'):
+        host = host[4:]
+    if port is not None and DEFAULT_PORTS.get(scheme) != port:
+        host = f"{host}:{port}"
+    if scheme in ('http', 'https'):
+        scheme = 'http'
+    path = parts.path.rstrip('/')
+    params = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+              if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)]
+    key = f"{scheme}://{host}{path}"
+    if params:
+        key += '?' + urlencode(sorted(params))
+    if parts.fragment:
+        key += '#' + parts.fragment
+    return key
+
+
+def url_hash(canonical):
+    """Kurzer Hash eines Schlüssels (spart Speicher bei sehr vielen Links)."""
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=8).digest()
+
+
+class UrlIndex:
+    """Hash-Index normalisierte URL -> Link-IDs für das geöffnete Projekt."""
+
+    def __init__(self, links=None):
+        self.reset(links or [])
+
+    def reset(self, links):
+        self._ids = {}   # Schlüssel -> [Link-IDs]
+        self._keys = {}  # Link-ID -> Schlüssel
+        self.add_many(links)
+
+    def add(self, link):
+        link_id = link[LINK_ID_KEY]
+        key = canonical_url(str(link.get('url', '')))
+        self._keys[link_id] = key
+        self._ids.setdefault(key, []).append(link_id)
+
+    def add_many(self, links):
+        for link in links:
+            self.add(link)
+
+    def update(self, link):
+        self.remove(link[LINK_ID_KEY])
+        self.add(link)
+
+    def remove(self, link_id):
+        key = self._keys.pop(link_id, None)
+        if key is None:
+            return
+        ids = self._ids[key]
+        ids.remove(link_id)
+        if not ids:
+            del self._ids[key]
+
+    def find(self, url, exclude_id=None):
+        """IDs der Links mit derselben normalisierten URL (ohne `exclude_id`)."""
+        ids = self._ids.get(canonical_url(url), ())
+        return [link_id for link_id in ids if link_id != exclude_id]
+
+    def duplicate_groups(self):
+        return [ids for ids in self._ids.values() if len(ids) > 1]
+
+
+def merge_duplicate_links(storage, on_progress=None):
+    """Führt doppelte Links innerhalb jedes Projekts zusammen (ein Durchgang über alle Projekte).
+
+    Pro Projekt bleibt das erste Vorkommen einer normalisierten URL stehen;
+    hat es nur die URL als Beschreibung, übernimmt es die eines späteren
+    Duplikats. Nur Projekte mit Duplikaten werden neu geschrieben. Duplikate
+    über Projektgrenzen hinweg werden nur gezählt, da beide Projekte den Link
+    bewusst enthalten können. Ungültige Elemente bleiben unverändert an ihrer
+    Stelle stehen. Gibt (geänderte Projekte, entfernte Links,
+    projektübergreifende Duplikate, ungültige Elemente) zurück.
+    """
+    owners = {}  # URL-Hash -> erstes Projekt
+    cross_project = set()
+    changed = removed = invalid = 0
+    project_names = storage.list_projects()
+    for number, project_name in enumerate(project_names, 1):
+        kept = []
+        first_links = {}
+        dropped = 0
+        for i, item in enumerate(storage.iter_links(project_name)):
+            link = clean_link(item, i, project_name)
+            if link is None:
+                # Nicht stillschweigend verwerfen: beim Neuschreiben mitnehmen
+                kept.append(item)
+                invalid += 1
+                continue
+            url = str(link['url'])
+            digest = url_hash(canonical_url(url))
+            first = first_links.get(digest)
+            if first is None:
+                first_links[digest] = link
+                kept.append(link)
+                owner = owners.setdefault(digest, project_name)
+                if owner != project_name:
+                    cross_project.add(digest)
+                continue
+            if first.get('desc') in ('', first.get('url')) and link.get('desc') not in ('', url):
+                first['desc'] = link['desc']
+            dropped += 1
+        if dropped:
+            if storage.save(project_name, links=kept):
+                storage.compact(project_name)
+            changed += 1
+            removed += dropped
+        if on_progress is not None:
+            on_progress(number, len(project_names))
+    return changed, removed, len(cross_project), invalid